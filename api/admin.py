@@ -1,8 +1,9 @@
 """ api/admin.py """
 
 from django.contrib import admin
-from .models import Project, Survey, RiskNote
+from .models import Project, ProjectSyncRun, Survey, RiskNote
 
 admin.site.register(Project)
 admin.site.register(Survey)
 admin.site.register(RiskNote)
+admin.site.register(ProjectSyncRun)
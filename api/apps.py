@@ -7,3 +7,7 @@ class ApiConfig(AppConfig):
     """Class for ApiConfig"""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from api import signals
@@ -0,0 +1,150 @@
+""" api/authentication.py """
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from jwt import ExpiredSignatureError, InvalidTokenError
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.settings import api_settings
+
+from api.middleware.access_token_middleware import get_token_claims
+from api.models import Account
+
+class TokenExpired(exceptions.AuthenticationFailed):
+    """Raised when the access token of a request has expired"""
+    default_detail = {"error": "Token has expired"}
+
+class InvalidToken(exceptions.AuthenticationFailed):
+    """Raised when the access token of a request is malformed or has no user id"""
+    default_detail = {"error": "Invalid token"}
+
+class AccountNotFound(exceptions.NotFound):
+    """Raised when the access token of a request belongs to no account"""
+    default_detail = {"error": "Account not found"}
+
+class AuthorizationRequired(exceptions.NotAuthenticated):
+    """Raised when a view that acts on behalf of an account gets a request without a token"""
+    default_detail = {"error": "Authorization header is required"}
+
+def get_account_cache_key(user_id):
+    """Helper function to build the account cache key of a user id"""
+    return f"account:{user_id}"
+
+def get_account(user_id):
+    """
+    Helper function to resolve the Account of a user id.
+
+    With ACCOUNT_CACHE_TTL set, the primary key of the account is cached per
+    process and the account is built without a query. Only the id and user_id
+    are loaded; other fields are fetched from the database on first access.
+
+    Raises:
+        Account.DoesNotExist: If there is no account with the user id.
+    """
+    if settings.ACCOUNT_CACHE_TTL <= 0:
+        return Account.objects.get(user_id=user_id)
+
+    cache = caches[settings.ACCOUNT_CACHE_ALIAS]
+    key = get_account_cache_key(user_id)
+    pk = cache.get(key)
+    if pk is None:
+        pk = Account.objects.values_list('pk', flat=True).get(user_id=user_id)
+        cache.set(key, pk, settings.ACCOUNT_CACHE_TTL)
+    return Account.from_db(Account.objects.db, ['id', 'user_id'], [pk, user_id])
+
+def forget_account(user_id):
+    """Helper function to drop the cached primary key of an account, e.g. after it is deleted"""
+    caches[settings.ACCOUNT_CACHE_ALIAS].delete(get_account_cache_key(user_id))
+
+def get_request_account(request):
+    """
+    Helper function to get the Account that signed a request, or None.
+
+    The access token is checked even when the request was authenticated
+    otherwise, e.g. with force_authenticate in tests, so a bad token is
+    never ignored.
+
+    Raises:
+        TokenExpired, InvalidToken, AccountNotFound: If the request is signed with
+            a bad token and authenticated lazily, see AccountAuthenticationMixin.
+    """
+    user = getattr(request, 'user', None)
+    authenticator = getattr(request, 'successful_authenticator', None)
+    if not isinstance(authenticator, AccessTokenAuthentication):
+        authenticated = AccessTokenAuthentication().authenticate(request)
+        if authenticated is not None:
+            user = authenticated[0]
+    return user if isinstance(user, Account) else None
+
+class AccessTokenAuthentication(BaseAuthentication):
+    """
+    Class for authenticating requests with the access tokens issued by SignIn.
+    On success `request.user` is the Account and `request.auth` the token claims.
+    Requests without a bearer token are left to the other authentication classes.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        try:
+            claims = get_token_claims(request)
+        except ExpiredSignatureError as exc:
+            raise TokenExpired() from exc
+        except InvalidTokenError as exc:
+            raise InvalidToken() from exc
+        if claims is None:
+            return None
+
+        user_id = claims.get('user_id')
+        if not user_id:
+            raise InvalidToken()
+        try:
+            account = get_account(user_id)
+        except Account.DoesNotExist as exc:
+            raise AccountNotFound() from exc
+        return (account, claims)
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+class AccountAuthenticationMixin:
+    """
+    Mixin for views that act on behalf of the Account signing the request.
+
+    The access token is only checked when the view reads the account with
+    get_account, so token errors surface there and the other methods of the
+    view are not affected by a stale or malformed token. Every view answers
+    a missing or bad token with 401 and a token of no account with 404.
+    """
+    authentication_classes = [
+        AccessTokenAuthentication,
+        *api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ]
+
+    def perform_authentication(self, request):
+        """Method for deferring authentication to the first read of request.user"""
+
+    def get_account(self):
+        """
+        Method for getting the Account signing the request.
+
+        Raises:
+            AuthorizationRequired: If the request has no access token.
+            TokenExpired, InvalidToken, AccountNotFound: If the access token is bad.
+        """
+        account = get_request_account(self.request)
+        if account is None:
+            raise AuthorizationRequired()
+        return account
+
+    def handle_exception(self, exc):
+        """
+        Method for answering writes on behalf of an account deleted since its
+        primary key was cached, possibly by another process, with 404
+        """
+        if isinstance(exc, IntegrityError):
+            account = get_request_account(self.request)
+            if account is not None and not Account.objects.filter(pk=account.pk).exists():
+                forget_account(account.user_id)
+                exc = AccountNotFound()
+        return super().handle_exception(exc)
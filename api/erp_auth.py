@@ -0,0 +1,142 @@
+""" api/erp_auth.py """
+
+import threading
+import time
+import requests
+from django.conf import settings
+from django.core.cache import caches
+
+from api.http_client import get_session
+
+def request_erp_access_token(resource):
+    """
+    Helper function to request a client credentials token for ERP from Azure AD.
+
+    Returns:
+        tuple: The access token and the number of seconds it is valid for.
+    """
+    token_url = f"https://login.microsoftonline.com/{settings.ERP_TENANT_ID}/oauth2/token"
+    payload = {
+        'client_id': settings.ERP_CLIENT_ID,
+        'client_secret': settings.ERP_CLIENT_SECRET,
+        'grant_type': 'client_credentials',
+        'resource': resource,
+    }
+    try:
+        token_response = get_session().post(token_url, data=payload)
+        token_response.raise_for_status()
+        token_data = token_response.json()
+    except requests.RequestException as e:
+        raise requests.RequestException(f"Authentication failed: {str(e)}") from e
+    return token_data.get('access_token'), int(token_data.get('expires_in', 0))
+
+class ErpTokenProvider:
+    """
+    Class for sharing ERP access tokens between threads and, through a Django
+    cache, between processes. Processes only share tokens if the cache backend
+    does, like the database cache of the 'erp_tokens' alias; a LocMemCache
+    keeps them per process. A token is reused until `refresh_margin` seconds
+    before it expires. When it needs refreshing, one caller requests a new
+    token while the others wait for it.
+    """
+
+    def __init__(self, cache_alias=None, refresh_margin=300, lock_timeout=10):
+        self.cache_alias = cache_alias
+        self.refresh_margin = refresh_margin
+        self.lock_timeout = lock_timeout
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        """The shared cache for tokens, or None to keep them in this process only"""
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get_token(self, resource):
+        """
+        Method for getting a valid access token for an ERP resource.
+
+        Raises:
+            requests.RequestException: If a new token cannot be requested.
+        """
+        token = self.get_cached_token(resource)
+        if token:
+            return token
+
+        with self.get_resource_lock(resource):
+            # Another thread may have refreshed the token while this one waited
+            token = self.get_cached_token(resource)
+            if token:
+                return token
+            return self.refresh_token(resource)
+
+    def get_cached_token(self, resource):
+        """Method for getting an unexpired token from this process or the shared cache"""
+        entry = self._tokens.get(resource)
+        if not self.is_fresh(entry) and self.cache is not None:
+            entry = self.cache.get(self.get_cache_key(resource))
+            if entry is not None:
+                self._tokens[resource] = entry
+        return entry[0] if self.is_fresh(entry) else None
+
+    def is_fresh(self, entry):
+        """Method for checking that a (token, expiry time) entry does not need refreshing yet"""
+        return entry is not None and entry[1] - self.refresh_margin > time.time()
+
+    def refresh_token(self, resource):
+        """
+        Method for requesting a new token and sharing it. With a shared cache,
+        only one process requests the token; the others wait up to
+        `lock_timeout` seconds for it before requesting their own.
+        """
+        cache = self.cache
+        lock_key = f"{self.get_cache_key(resource)}:lock"
+        locked = cache is not None and cache.add(lock_key, True, self.lock_timeout)
+        if cache is not None and not locked:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.1)
+                token = self.get_cached_token(resource)
+                if token:
+                    return token
+
+        try:
+            token, expires_in = request_erp_access_token(resource)
+            entry = (token, time.time() + expires_in)
+            self._tokens[resource] = entry
+            if cache is not None and expires_in > self.refresh_margin:
+                cache.set(
+                    self.get_cache_key(resource), entry, expires_in - self.refresh_margin
+                )
+            return token
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+    def get_resource_lock(self, resource):
+        """Method for getting the lock that serializes token refreshes of a resource"""
+        with self._lock:
+            return self._locks.setdefault(resource, threading.Lock())
+
+    def get_cache_key(self, resource):
+        """Method for building the shared cache key of a resource"""
+        return f"erp-token:{resource}"
+
+    def clear(self):
+        """Method for forgetting the tokens kept in this process"""
+        self._tokens.clear()
+
+_TOKEN_PROVIDER = None
+_TOKEN_PROVIDER_LOCK = threading.Lock()
+
+def get_erp_token_provider():
+    """Helper function to get the process-wide ERP token provider"""
+    global _TOKEN_PROVIDER # pylint: disable=global-statement
+    with _TOKEN_PROVIDER_LOCK:
+        if _TOKEN_PROVIDER is None:
+            _TOKEN_PROVIDER = ErpTokenProvider(
+                cache_alias=settings.ERP_TOKEN_CACHE_ALIAS,
+                refresh_margin=settings.ERP_TOKEN_REFRESH_MARGIN
+            )
+        return _TOKEN_PROVIDER
@@ -0,0 +1,67 @@
+""" api/http_client.py """
+
+import threading
+from urllib.parse import urlsplit
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class PooledSession(requests.Session):
+    """
+    Session for outbound HTTP calls that keeps connections alive in a pool and
+    applies a default timeout per host when the caller does not pass one.
+    """
+    def __init__(self, default_timeout, host_timeouts=None):
+        super().__init__()
+        self.default_timeout = default_timeout
+        self.host_timeouts = host_timeouts or {}
+
+    def get_timeout(self, url):
+        """Method for looking up the timeout of the host in a URL"""
+        return self.host_timeouts.get(urlsplit(url).hostname, self.default_timeout)
+
+    def request(self, method, url, *args, **kwargs): # pylint: disable=arguments-differ
+        kwargs.setdefault('timeout', self.get_timeout(url))
+        return super().request(method, url, *args, **kwargs)
+
+def create_session():
+    """
+    Helper function to create a session configured from settings.
+
+    Failed requests are retried with exponential backoff on connection errors
+    and on 429 and 5xx responses, waiting for Retry-After when the server sends
+    it. Once the retries run out the last response is returned as is, so callers
+    still see the error through raise_for_status().
+    """
+    retry = Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session = PooledSession(settings.HTTP_DEFAULT_TIMEOUT, settings.HTTP_HOST_TIMEOUTS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session():
+    """Helper function to get the process-wide session shared by all threads"""
+    global _SESSION # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = create_session()
+        return _SESSION
@@ -0,0 +1,210 @@
+""" api/images.py """
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from PIL import Image, ImageOps
+
+# Pillow format name and content type of each variant format
+VARIANT_FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'webp': ('WEBP', 'image/webp'),
+}
+
+# File extensions accepted for uploaded images
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+
+# Magic bytes at the start of each accepted image format, and the extensions of the format
+IMAGE_SIGNATURES = {
+    'jpeg': ((b'\xff\xd8\xff',), ('.jpg', '.jpeg')),
+    'png': ((b'\x89PNG\r\n\x1a\n',), ('.png',)),
+    'gif': ((b'GIF87a', b'GIF89a'), ('.gif',)),
+}
+
+# Errors Pillow raises for truncated, corrupt or oversized images
+PILLOW_ERRORS = (OSError, SyntaxError, ValueError, Image.DecompressionBombError)
+
+# Keys of Image.info that hold metadata, such as the camera and location of a photo
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+# Image modes that Image.quantize accepts
+QUANTIZABLE_MODES = ('L', 'RGB', 'RGBA')
+
+# Color space of the pixel values in each image mode, which an ICC profile must match
+MODE_COLOR_SPACES = {
+    '1': 'GRAY',
+    'L': 'GRAY',
+    'LA': 'GRAY',
+    'P': 'RGB',
+    'RGB': 'RGB',
+    'RGBA': 'RGB',
+    'CMYK': 'CMYK',
+}
+
+class InvalidImageError(Exception):
+    """Raised when the content of an uploaded file is not a valid image"""
+
+def is_image_file_name(file_name):
+    """Helper function to check that a file name has an image extension"""
+    return os.path.splitext(file_name)[1].lower() in IMAGE_EXTENSIONS
+
+def get_variant_blob_name(blob_name, width, image_format):
+    """Helper function to derive the blob name of a resized or converted image variant"""
+    size = f"w{width}" if width else "full"
+    return f"variants/{blob_name}/{size}.{image_format}"
+
+def render_variant(image_data, width, image_format, quality):
+    """
+    Helper function to render an image variant. The image is scaled down to the
+    given width, keeping its aspect ratio, and encoded in the given format.
+    Images are never scaled up.
+
+    Raises:
+        InvalidImageError: If the image cannot be decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            # Apply the camera orientation before the EXIF data is dropped
+            image = ImageOps.exif_transpose(image)
+            if width and image.width > width:
+                height = max(round(image.height * width / image.width), 1)
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            if image_format == 'jpeg' and image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            output = io.BytesIO()
+            image.save(output, format=VARIANT_FORMATS[image_format][0], quality=quality)
+            return output.getvalue()
+    except PILLOW_ERRORS as e:
+        raise InvalidImageError(f"Corrupt image content: {e}") from e
+
+def detect_image_format(image_data):
+    """Helper function to identify an image format from its magic bytes"""
+    for image_format, (signatures, _) in IMAGE_SIGNATURES.items():
+        if image_data.startswith(signatures):
+            return image_format
+    return None
+
+def has_image_metadata(image):
+    """Helper function to check whether an opened image carries EXIF, XMP or text metadata"""
+    # Reading the text chunks of a PNG also reads the chunks stored after the image data
+    return (
+        bool(getattr(image, 'text', None))
+        or any(key in image.info for key in METADATA_KEYS)
+    )
+
+def process_image(image_data, file_name, max_dimension, quality):
+    """
+    Prepare an uploaded image for storage.
+
+    The content must be a JPEG, PNG or GIF image matching the file extension.
+    JPEG and PNG images are rotated upright, stripped of EXIF and other metadata,
+    scaled to fit within `max_dimension` and recompressed; JPEGs at `quality`.
+    Images without metadata that need no scaling keep their original bytes when
+    recompressing would not make them smaller. GIFs are only validated, since
+    re-encoding would drop their animation.
+
+    Returns:
+        bytes: The image to store.
+
+    Raises:
+        InvalidImageError: If the content is not an image of the expected format.
+    """
+    image_format = detect_image_format(image_data)
+    if image_format is None:
+        raise InvalidImageError("Unrecognized image content")
+    if not file_name.lower().endswith(IMAGE_SIGNATURES[image_format][1]):
+        raise InvalidImageError(f"Content is {image_format}, which does not match the file name")
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            if image_format == 'gif':
+                image.verify()
+                return image_data
+
+            icc_profile = image.info.get('icc_profile')
+            source_mode = image.mode
+            has_metadata = has_image_metadata(image)
+            original_size = image.size
+            # Screenshots and graphics with few colors stay small as palette images
+            few_colors = image_format == 'png' and image.getcolors(256) is not None
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            if few_colors and image.mode in QUANTIZABLE_MODES:
+                image = image.quantize(256)
+            if image_format == 'jpeg' and image.mode != 'RGB':
+                image = image.convert('RGB')
+            # The profile of e.g. a CMYK photo no longer describes the converted pixels
+            if MODE_COLOR_SPACES.get(image.mode) != MODE_COLOR_SPACES.get(source_mode):
+                icc_profile = None
+
+            output = io.BytesIO()
+            if image_format == 'jpeg':
+                image.save(
+                    output,
+                    format='JPEG',
+                    quality=quality,
+                    optimize=True,
+                    progressive=True,
+                    icc_profile=icc_profile
+                )
+            else:
+                image.save(output, format='PNG', optimize=True, icc_profile=icc_profile)
+
+            # With nothing to strip or scale, the image is only rewritten if that saves space
+            if (
+                not has_metadata
+                and image.size == original_size
+                and output.tell() >= len(image_data)
+            ):
+                return image_data
+            return output.getvalue()
+    except PILLOW_ERRORS as e:
+        raise InvalidImageError(f"Corrupt image content: {e}") from e
+
+_IMAGE_POOL = None
+_IMAGE_POOL_LOCK = threading.Lock()
+
+def get_image_pool():
+    """
+    Helper function to get the process-wide pool for image processing. Pillow
+    releases the GIL while decoding, resizing and encoding, so threads run the
+    work in parallel while bounding the CPU used by concurrent uploads.
+    """
+    global _IMAGE_POOL # pylint: disable=global-statement
+    with _IMAGE_POOL_LOCK:
+        if _IMAGE_POOL is None:
+            _IMAGE_POOL = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_PROCESSING_MAX_WORKERS,
+                thread_name_prefix='image-processing'
+            )
+        return _IMAGE_POOL
+
+def process_images(images):
+    """
+    Helper function to process (image data, file name) pairs in the image pool.
+    Returns the processed images in input order.
+
+    Raises:
+        InvalidImageError: For the first image, in input order, that is not valid.
+            The message names the file.
+    """
+    futures = [
+        get_image_pool().submit(
+            process_image,
+            image_data,
+            file_name,
+            settings.IMAGE_MAX_DIMENSION,
+            settings.IMAGE_UPLOAD_QUALITY
+        )
+        for image_data, file_name in images
+    ]
+    processed = []
+    for (_, file_name), future in zip(images, futures):
+        try:
+            processed.append(future.result())
+        except InvalidImageError as e:
+            raise InvalidImageError(f"Invalid image content for {file_name}.") from e
+    return processed
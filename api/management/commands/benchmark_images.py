@@ -0,0 +1,118 @@
+""" api/management/commands/benchmark_images.py """
+
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from api.images import IMAGE_EXTENSIONS, process_image
+
+def create_sample_photos(count, width):
+    """
+    Helper function to create camera-like JPEGs and screenshot-like PNGs.
+    Returns a list of (image data, file name) pairs.
+    """
+    height = width * 3 // 4
+    samples = []
+    for index in range(count):
+        # Sensor noise over a gradient compresses about as badly as a real photo
+        photo = Image.merge('RGB', [
+            Image.linear_gradient('L').resize((width, height)),
+            Image.effect_noise((width, height), 30 + index),
+            Image.radial_gradient('L').resize((width, height)),
+        ])
+        output = io.BytesIO()
+        photo.save(output, format='JPEG', quality=95)
+        samples.append((output.getvalue(), f'photo_{index}.jpg'))
+
+        screenshot = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(screenshot)
+        for line in range(0, height, 24):
+            draw.text((16, line), f'Risk note {index}.{line} ' * 8, fill='black')
+        output = io.BytesIO()
+        screenshot.save(output, format='PNG')
+        samples.append((output.getvalue(), f'screenshot_{index}.png'))
+    return samples
+
+def load_photos(directory):
+    """Helper function to read the images in a directory as (image data, file name) pairs"""
+    return [
+        (path.read_bytes(), path.name)
+        for path in sorted(Path(directory).iterdir())
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    ]
+
+class Command(BaseCommand):
+    """Custom Django management command to benchmark the processing of uploaded images"""
+    help = (
+        'Benchmark validation and recompression of uploaded images. '
+        'Flags: --directory, --count, --width, --workers'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory',
+            help='Benchmark the images in this directory instead of generated samples'
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=4,
+            help='Number of generated photos and screenshots'
+        )
+        parser.add_argument(
+            '--width',
+            type=int,
+            default=4000,
+            help='Width of the generated images'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.IMAGE_PROCESSING_MAX_WORKERS,
+            help='Number of threads in the image pool'
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['directory']:
+            images = load_photos(kwargs['directory'])
+        else:
+            images = create_sample_photos(kwargs['count'], kwargs['width'])
+
+        if not images:
+            self.stdout.write(self.style.ERROR('No images to benchmark'))
+            return
+
+        def process(image):
+            return process_image(
+                image[0], image[1], settings.IMAGE_MAX_DIMENSION, settings.IMAGE_UPLOAD_QUALITY
+            )
+
+        start = time.perf_counter()
+        processed = [process(image) for image in images]
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=kwargs['workers']) as executor:
+            list(executor.map(process, images))
+        pooled_time = time.perf_counter() - start
+
+        input_size = sum(len(image_data) for image_data, _ in images)
+        output_size = sum(len(image_data) for image_data in processed)
+        for (image_data, file_name), processed_data in zip(images, processed):
+            self.stdout.write(
+                f'{file_name}: {len(image_data) / 1024:.0f} KiB -> '
+                f'{len(processed_data) / 1024:.0f} KiB'
+            )
+        self.stdout.write(
+            f'Total: {input_size / 1024 / 1024:.1f} MiB -> {output_size / 1024 / 1024:.1f} MiB '
+            f'({100 * (1 - output_size / input_size):.0f}% smaller)'
+        )
+        self.stdout.write(
+            f'Serial: {serial_time:.2f} s, '
+            f'{kwargs["workers"]} workers: {pooled_time:.2f} s '
+            f'({serial_time / pooled_time:.1f}x)'
+        )
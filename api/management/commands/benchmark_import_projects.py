@@ -0,0 +1,91 @@
+""" api/management/commands/benchmark_import_projects.py """
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.management.commands.import_projects import upsert_projects
+from api.models import Project
+
+def create_sample_projects(count, changed_every=0):
+    """
+    Helper function to create the field values of ERP projects, keyed by project id.
+    With `changed_every`, every nth project gets a new name.
+    """
+    return {
+        f'{index:06d}-00-00': {
+            'data_area_id': f'area{index % 5}',
+            'project_name': (
+                f'Project {index} renamed'
+                if changed_every and index % changed_every == 0
+                else f'Project {index}'
+            ),
+            'dimension_display_value': f'Dimension {index}',
+            'worker_responsible_personnel_number': f'{index:05d}',
+            'customer_account': f'Cust{index % 100}',
+        }
+        for index in range(count)
+    }
+
+def import_row_by_row(project_values):
+    """Helper function to import projects with one update_or_create per project"""
+    for project_id, values in project_values.items():
+        Project.objects.update_or_create(project_id=project_id, defaults=values)
+
+def import_in_bulk(project_values):
+    """Helper function to import projects with upsert_projects"""
+    upsert_projects(project_values, settings.ERP_IMPORT_BATCH_SIZE)
+
+class Command(BaseCommand):
+    """Custom Django management command to benchmark the project import"""
+    help = (
+        'Benchmark importing projects row by row against the bulk upsert. '
+        'Changes are rolled back. Flags: --count, --changed-every'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=10000,
+            help='Number of projects to import'
+        )
+        parser.add_argument(
+            '--changed-every',
+            type=int,
+            default=100,
+            help='Rename every nth project when syncing existing projects'
+        )
+
+    def handle(self, *args, **kwargs):
+        initial = create_sample_projects(kwargs['count'])
+        changed = create_sample_projects(kwargs['count'], kwargs['changed_every'])
+
+        for name, import_function in (
+            ('Row by row', import_row_by_row),
+            ('Bulk', import_in_bulk),
+        ):
+            with transaction.atomic():
+                create_time, create_queries = self.measure(import_function, initial)
+                sync_time, sync_queries = self.measure(import_function, changed)
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f'{name}: create {create_time:.2f} s ({create_queries} queries), '
+                f'sync {sync_time:.2f} s ({sync_queries} queries)'
+            )
+
+    def measure(self, import_function, project_values):
+        """Run an import and return its duration and number of queries"""
+        query_count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            import_function(project_values)
+            duration = time.perf_counter() - start
+        return duration, query_count
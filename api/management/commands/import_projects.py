@@ -1,55 +1,374 @@
 """ api/management/commands/import_projects.py """
 
+import argparse
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
 import requests
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from api.models import Project
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from api.erp_auth import get_erp_token_provider
+from api.http_client import get_session
+from api.models import Project, ProjectSyncRun, get_project_fingerprint
+
+# Project model fields and the ERP fields they are imported from
+PROJECT_FIELDS = {
+    'data_area_id': 'dataAreaId',
+    'project_name': 'ProjectName',
+    'dimension_display_value': 'DimensionDisplayValue',
+    'worker_responsible_personnel_number': 'WorkerResponsiblePersonnelNumber',
+    'customer_account': 'CustomerAccount',
+}
+
+# Temporary table of the project ids listed by ERP during a full import
+STAGING_TABLE = 'import_project_ids'
+
+# PostgreSQL advisory lock held by the instance that is importing projects
+SYNC_LOCK_ID = 7_173_200_001
+
+# Units of the --every option, in seconds
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60}
 
 def get_erp_access_token(resource):
     """
     Helper method to get an access token from Azure AD.
+    The token is reused until shortly before it expires.
+    """
+    return get_erp_token_provider().get_token(resource)
+
+def get_erp_headers(erp_access_token):
+    """
+    Helper method to get the headers of ERP-interface requests.
     """
-    token_url = f"https://login.microsoftonline.com/{settings.ERP_TENANT_ID}/oauth2/token"
-    payload = {
-        'client_id': settings.ERP_CLIENT_ID,
-        'client_secret': settings.ERP_CLIENT_SECRET,
-        'grant_type': 'client_credentials',
-        'resource': resource,
+    return {
+        'Authorization': f'Bearer {erp_access_token}',
+        'Content-Type': 'application/json',
+        'Prefer': f'odata.maxpagesize={settings.ERP_PAGE_SIZE}',
     }
+
+def fetch_data_area_ids(erp_access_token, resource):
+    """
+    Helper method to fetch the ids of the companies (data areas) in ERP-interface.
+    ERP_DATA_AREA_IDS is used instead when it is set.
+    """
+    if settings.ERP_DATA_AREA_IDS:
+        return list(settings.ERP_DATA_AREA_IDS)
+
+    companies_url = f"{resource}/data/LegalEntities?$select=LegalEntityId"
     try:
-        token_response = requests.post(token_url, data=payload, timeout=30)
-        token_response.raise_for_status()
-        return token_response.json().get('access_token')
+        companies_response = get_session().get(
+            companies_url, headers=get_erp_headers(erp_access_token)
+        )
+        companies_response.raise_for_status()
+        companies = companies_response.json().get('value', [])
     except requests.RequestException as e:
-        raise requests.RequestException(f"Authentication failed: {str(e)}") from e
+        raise requests.RequestException(f"Failed to fetch companies: {str(e)}") from e
+    return [company['LegalEntityId'].lower() for company in companies]
+
+def parse_since(value):
+    """
+    Helper method to parse the --since option, a date or a date and time.
+    Times without a timezone are in the current timezone.
+    """
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise argparse.ArgumentTypeError(f"Invalid date or date and time: {value}")
+        since = datetime.combine(date, dt_time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+def parse_interval(value):
+    """
+    Helper method to parse the --every option, a number of seconds, minutes or hours
+    such as 90s, 15m or 1h. A number without a unit is in seconds.
+    """
+    match = re.fullmatch(r'(\d+)([smh]?)', value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise argparse.ArgumentTypeError(f"Invalid interval: {value}")
+    return int(match.group(1)) * INTERVAL_UNITS[match.group(2) or 's']
 
-def fetch_projects_from_erp(erp_access_token, resource):
+@contextmanager
+def sync_lock():
+    """
+    Helper method to hold the advisory lock of the project import on PostgreSQL.
+    Yields whether the lock was acquired; when it was not, another instance is importing.
+    """
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [SYNC_LOCK_ID])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [SYNC_LOCK_ID])
+
+def fetch_projects_from_erp(erp_access_token, resource, data_area_id=None, since=None):
     """
     Helper method to fetch project data from ERP-interface.
+
+    Yields the projects one page at a time, following the `@odata.nextLink`
+    of each page, so only one page of the catalogue is in memory at a time.
+    The page size is requested with ERP_PAGE_SIZE, and a failed page is
+    requested again up to ERP_PARTITION_RETRIES times. With `data_area_id`,
+    only the projects of that company are fetched. With `since`, only the
+    projects modified after it are fetched, using ERP_MODIFIED_FIELD.
     """
+    company_filter = f" and dataAreaId eq '{data_area_id}'" if data_area_id else ""
+    if since:
+        since_utc = since.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        company_filter += f" and {settings.ERP_MODIFIED_FIELD} gt {since_utc}"
     projects_url = (
         f"{resource}/data/Projects?cross-company=true"
         f"&$filter=ProjectStage eq Microsoft.Dynamics.DataEntities.ProjStatus'InProcess'"
+        f"{company_filter}"
         f"&$select=ProjectID,dataAreaId,ProjectName,"
         f"DimensionDisplayValue,WorkerResponsiblePersonnelNumber,"
         f"CustomerAccount"
     )
 
-    headers = {
-        'Authorization': f'Bearer {erp_access_token}',
-        'Content-Type': 'application/json',
-    }
+    headers = get_erp_headers(erp_access_token)
+
+    while projects_url:
+        projects_data = fetch_projects_page(projects_url, headers)
+        yield projects_data.get('value', [])
+        projects_url = projects_data.get('@odata.nextLink')
+
+def fetch_projects_page(projects_url, headers):
+    """
+    Helper method to fetch one page of projects, retrying it up to
+    ERP_PARTITION_RETRIES times. Returns the JSON data of the page.
+    """
+    attempts = 1
+    while True:
+        try:
+            projects_response = get_session().get(projects_url, headers=headers)
+            projects_response.raise_for_status()
+            return projects_response.json()
+        except requests.RequestException as e:
+            if attempts > settings.ERP_PARTITION_RETRIES:
+                raise requests.RequestException(f"Failed to fetch projects: {str(e)}") from e
+            time.sleep(settings.HTTP_BACKOFF_FACTOR * 2 ** (attempts - 1))
+            attempts += 1
+
+class PageQueue:
+    """
+    Class for handing pages of projects from the fetching threads to the importing
+    thread. At most `maxsize` pages wait in the queue, so the fetching threads
+    wait for the import instead of buffering whole companies. Once the queue is
+    closed, pages are dropped and the fetching threads stop.
+    """
+    def __init__(self, maxsize):
+        self.pages = queue.Queue(maxsize=maxsize)
+        self.closed = threading.Event()
+
+    def put(self, item):
+        """Method for adding an item, returns False when the queue has been closed"""
+        while not self.closed.is_set():
+            try:
+                self.pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """Method for taking the oldest item, waiting for one if needed"""
+        return self.pages.get()
+
+    def close(self):
+        """Method for stopping the fetching threads"""
+        self.closed.set()
+
+def fetch_partition(erp_access_token, resource, data_area_id, since, page_queue):
+    """
+    Helper method to fetch the projects of one company into `page_queue` page
+    by page, as (data_area_id, page) items followed by (data_area_id, None).
 
+    Returns:
+        tuple: The number of projects and the duration in seconds.
+    """
+    start = time.perf_counter()
+    project_count = 0
     try:
-        projects_response = requests.get(projects_url, headers=headers, timeout=30)
-        projects_response.raise_for_status()
-        return projects_response.json()
-    except requests.RequestException as e:
-        raise requests.RequestException(f"Failed to fetch projects: {str(e)}") from e
+        for page in fetch_projects_from_erp(erp_access_token, resource, data_area_id, since):
+            if not page_queue.put((data_area_id, page)):
+                break
+            project_count += len(page)
+    finally:
+        page_queue.put((data_area_id, None))
+    return project_count, time.perf_counter() - start
+
+def diff_projects(project_values):
+    """
+    Helper method to compare projects from ERP with the stored projects.
+
+    `project_values` maps project ids to the values of PROJECT_FIELDS. Only the
+    ids and fingerprints of the stored projects are loaded, in one query, and a
+    project is changed when the fingerprint of its ERP values differs.
+
+    Returns:
+        tuple: The new projects, the changed projects and the number of unchanged projects.
+    """
+    stored_projects = {
+        project_id: (pk, fingerprint)
+        for project_id, pk, fingerprint in Project.objects.filter(
+            project_id__in=list(project_values)
+        ).values_list('project_id', 'pk', 'fingerprint')
+    }
+
+    new_projects = []
+    changed_projects = []
+    for project_id, values in project_values.items():
+        fingerprint = get_project_fingerprint(values)
+        stored_project = stored_projects.get(project_id)
+        if stored_project is None:
+            new_projects.append(
+                Project(project_id=project_id, fingerprint=fingerprint, **values)
+            )
+        elif stored_project[1] != fingerprint:
+            changed_projects.append(
+                Project(
+                    pk=stored_project[0],
+                    project_id=project_id,
+                    fingerprint=fingerprint,
+                    **values
+                )
+            )
+
+    unchanged_count = len(project_values) - len(new_projects) - len(changed_projects)
+    return new_projects, changed_projects, unchanged_count
+
+def write_projects(new_projects, changed_projects, batch_size):
+    """
+    Helper method to write new and changed projects in batches of `batch_size`.
+    """
+    fields = [*PROJECT_FIELDS, 'fingerprint']
+
+    # On PostgreSQL, a project created by a concurrent import is updated instead of failing
+    conflict_options = {}
+    if connection.features.supports_update_conflicts_with_target:
+        conflict_options = {
+            'update_conflicts': True,
+            'unique_fields': ['project_id'],
+            'update_fields': fields,
+        }
+    Project.objects.bulk_create(new_projects, batch_size=batch_size, **conflict_options)
+    Project.objects.bulk_update(changed_projects, fields, batch_size=batch_size)
+
+def create_staging_table():
+    """
+    Helper method to create the temporary table of the project ids listed by ERP.
+    The table is dropped when the import transaction ends.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE} "
+            "(project_id varchar(100) PRIMARY KEY) ON COMMIT DROP"
+        )
+
+def stage_project_ids(project_ids):
+    """
+    Helper method to add project ids listed by ERP to the staging table, in one statement.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {STAGING_TABLE} (project_id) SELECT unnest(%s::varchar[]) "
+            "ON CONFLICT DO NOTHING",
+            [list(project_ids)]
+        )
+
+def get_obsolete_projects_filter(data_area_ids=None):
+    """
+    Helper method to build the WHERE clause, and its parameters, that selects the
+    active projects that are not in the staging table. With `data_area_ids`, only
+    projects of those companies are selected, since other companies were not fetched.
+    """
+    where = f"is_active AND project_id NOT IN (SELECT project_id FROM {STAGING_TABLE})"
+    if not data_area_ids:
+        return where, []
+    return (
+        f"{where} AND LOWER(data_area_id) = ANY(%s)",
+        [[data_area_id.lower() for data_area_id in data_area_ids]]
+    )
+
+def archive_obsolete_projects(archived_at, data_area_ids=None):
+    """
+    Helper method to archive the active projects that are not in the staging table,
+    limited to the companies in `data_area_ids` when given.
+    Returns the number of archived projects.
+    """
+    where, params = get_obsolete_projects_filter(data_area_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {connection.ops.quote_name(Project._meta.db_table)} "
+            f"SET is_active = false, archived_at = %s WHERE {where}",
+            [archived_at, *params]
+        )
+        return cursor.rowcount
+
+def restore_listed_projects():
+    """
+    Helper method to restore the archived projects that are in the staging table again.
+    Returns the number of restored projects.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {connection.ops.quote_name(Project._meta.db_table)} "
+            "SET is_active = true, archived_at = NULL "
+            f"WHERE NOT is_active AND project_id IN (SELECT project_id FROM {STAGING_TABLE})"
+        )
+        return cursor.rowcount
+
+def iter_obsolete_project_ids(data_area_ids=None):
+    """
+    Helper method to stream the ids of the active projects that are not in the staging
+    table, limited to the companies in `data_area_ids` when given.
+    """
+    where, params = get_obsolete_projects_filter(data_area_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT project_id FROM {connection.ops.quote_name(Project._meta.db_table)} "
+            f"WHERE {where} ORDER BY project_id",
+            params
+        )
+        while rows := cursor.fetchmany(settings.ERP_IMPORT_BATCH_SIZE):
+            for (project_id,) in rows:
+                yield project_id
+
+def upsert_projects(project_values, batch_size):
+    """
+    Helper method to write projects in bulk. Only new and changed projects are written.
+
+    Returns:
+        tuple: The created projects, and the numbers of updated and unchanged projects.
+    """
+    new_projects, changed_projects, unchanged_count = diff_projects(project_values)
+    write_projects(new_projects, changed_projects, batch_size)
+    return new_projects, len(changed_projects), unchanged_count
 
 class Command(BaseCommand):
     """Custom Django management command to import projects from Telinekataja ERP interface"""
-    help = 'Import projects from Telinekataja ERP interface. Flags: --sandbox'
+    help = (
+        'Import projects from Telinekataja ERP interface. '
+        'Flags: --sandbox, --concurrency, --since, --dry-run, --every'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -57,8 +376,36 @@ class Command(BaseCommand):
             action='store_true',
             help='Use the sandbox environment'
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.ERP_FETCH_CONCURRENCY,
+            help='Number of companies to fetch projects from in parallel'
+        )
+        parser.add_argument(
+            '--since',
+            type=parse_since,
+            help=(
+                'Only fetch projects modified in ERP after this date or date and time. '
+                'Such runs neither archive nor restore projects; an archived project that '
+                'ERP lists again unmodified is only restored by a run without --since'
+            )
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the created, updated and obsolete projects without saving them'
+        )
+        parser.add_argument(
+            '--every',
+            type=parse_interval,
+            help='Keep running and import projects at this interval, e.g. 15m'
+        )
 
     def handle(self, *args, **kwargs):
+        if kwargs['every'] and kwargs['since']:
+            raise CommandError('--since cannot be used with --every')
+
         # Determine environment (production or sandbox)
         environment = 'sandbox' if kwargs['sandbox'] else 'production'
         resource = (
@@ -68,30 +415,240 @@ class Command(BaseCommand):
         )
         self.stdout.write(f'Using {environment} ERP')
 
+        if not kwargs['every']:
+            self.sync(resource, kwargs)
+            return
+
+        self.stdout.write(f'Importing projects every {kwargs["every"]} seconds')
+        try:
+            self.run_every(kwargs['every'], resource, kwargs)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped importing projects')
+
+    def run_every(self, interval, resource, options):
+        """
+        Import projects every `interval` seconds, counted from the start of each run.
+        A failed run is reported and the next run goes ahead as scheduled.
+        """
+        while True:
+            started = time.monotonic()
+            try:
+                self.sync(resource, options)
+            except Exception as e: # pylint: disable=broad-exception-caught
+                self.stdout.write(self.style.ERROR(f'Error importing projects: {str(e)}'))
+            time.sleep(max(interval - (time.monotonic() - started), 0))
+            # Drop connections that broke or expired while waiting
+            close_old_connections()
+
+    def sync(self, resource, options):
+        """
+        Import projects while holding the sync lock, and record the run in the
+        sync history. The run is skipped when another instance is importing.
+        """
+        with sync_lock() as acquired:
+            if not acquired:
+                ProjectSyncRun.objects.create(
+                    status=ProjectSyncRun.STATUS_SKIPPED,
+                    dry_run=options['dry_run'],
+                    finished_at=timezone.now(),
+                    duration=timedelta(0)
+                )
+                self.stdout.write(self.style.WARNING(
+                    'Another instance is importing projects, skipping this run'
+                ))
+                return
+
+            run = ProjectSyncRun.objects.create(dry_run=options['dry_run'])
+            start = time.monotonic()
+            counts = Counter()
+            try:
+                counts = self.run_import(resource, options)
+                run.status = ProjectSyncRun.STATUS_SUCCEEDED
+            except requests.RequestException as e:
+                run.status = ProjectSyncRun.STATUS_FAILED
+                run.error = str(e)
+            except Exception as e:
+                run.status = ProjectSyncRun.STATUS_FAILED
+                run.error = str(e)
+                raise
+            finally:
+                run.finished_at = timezone.now()
+                run.duration = timedelta(seconds=time.monotonic() - start)
+                run.fetched_count = counts['total']
+                run.created_count = counts['created']
+                run.updated_count = counts['updated']
+                run.unchanged_count = counts['unchanged']
+                run.archived_count = counts['archived']
+                run.save()
+
+    def run_import(self, resource, options):
+        """
+        Fetch the projects from ERP and import them. Returns the counts of the import.
+
+        Raises:
+            requests.RequestException: If the projects cannot be fetched.
+        """
         # Step 1: Get access token
         try:
             access_token = get_erp_access_token(resource)
         except requests.RequestException as e:
             self.stdout.write(self.style.ERROR(f'Error getting access token: {str(e)}'))
-            return
+            raise
+
+        since = options['since']
+        if since and not settings.ERP_MODIFIED_FIELD:
+            self.stdout.write(self.style.WARNING(
+                'ERP_MODIFIED_FIELD is not set, fetching all projects instead of --since'
+            ))
+            since = None
 
-        # Step 2: Fetch projects using the access token
+        # Step 2: Fetch projects of each company using the access token, importing
+        # them as the companies complete. A failed company rolls back the whole import.
         try:
             self.stdout.write('Fetching projects...')
-            projects_data = fetch_projects_from_erp(access_token, resource)
-            projects = projects_data.get('value', [])
-            self.import_projects(projects)
-            self.stdout.write(self.style.SUCCESS('Projects updated successfully'))
+            data_area_ids = fetch_data_area_ids(access_token, resource)
+            with transaction.atomic():
+                counts = self.import_projects(
+                    self.fetch_partitions(
+                        access_token, resource, data_area_ids, options['concurrency'], since
+                    ),
+                    dry_run=options['dry_run'],
+                    full_sync=since is None,
+                    data_area_ids=data_area_ids
+                )
         except requests.RequestException as e:
             self.stdout.write(self.style.ERROR(f'Error fetching projects: {str(e)}'))
+            raise
 
-    def import_projects(self, projects):
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Dry run, no projects were saved'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Projects updated successfully'))
+        return counts
+
+    def fetch_partitions(self, access_token, resource, data_area_ids, concurrency, since=None):
         """
-        Import projects from JSON data
+        Fetch the projects of each company in parallel, with at most `concurrency`
+        requests in flight. Yields the pages of all companies as they arrive, so
+        memory is bounded by a few pages rather than by the largest company.
+        Without companies, all projects are fetched in one cross-company query.
+        """
+        if not data_area_ids:
+            yield from fetch_projects_from_erp(access_token, resource, since=since)
+            return
+
+        concurrency = max(concurrency, 1)
+        self.stdout.write(
+            f'Fetching {len(data_area_ids)} companies with {concurrency} parallel requests'
+        )
+        start = time.perf_counter()
+        page_queue = PageQueue(maxsize=concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {
+                data_area_id: executor.submit(
+                    fetch_partition, access_token, resource, data_area_id, since, page_queue
+                )
+                for data_area_id in dict.fromkeys(data_area_ids)
+            }
+            remaining = len(futures)
+            while remaining:
+                data_area_id, page = page_queue.get()
+                if page is not None:
+                    yield page
+                    continue
+                # The company is done; a failed fetch raises here
+                project_count, duration = futures[data_area_id].result()
+                self.stdout.write(
+                    f'Fetched {project_count} projects of {data_area_id} in {duration:.2f} s'
+                )
+                remaining -= 1
+        finally:
+            page_queue.close()
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.stdout.write(f'Fetched all companies in {time.perf_counter() - start:.2f} s')
+
+    def import_projects(self, pages, dry_run=False, full_sync=True, data_area_ids=None):
+        """
+        Import projects from pages of JSON data.
+        With `dry_run`, the created, updated and obsolete project ids are
+        reported instead of saved. Obsolete projects are only archived, and
+        listed archived projects only restored, in a `full_sync`, which has
+        fetched every project of the companies in `data_area_ids`, or of all
+        companies when it is empty.
         """
-        self.stdout.write(f'Going through {len(projects)} projects...')
         self.stdout.write('Importing projects with id format x*-xx-xx')
-        created_count = 0
+        counts = Counter()
+        if full_sync:
+            create_staging_table()
+        for projects in pages:
+            self.stdout.write(f'Going through {len(projects)} projects...')
+            counts['total'] += len(projects)
+            project_values = self.get_project_values(projects)
+            counts['listed'] += len(project_values)
+            if full_sync:
+                stage_project_ids(project_values)
+
+            new_projects, changed_projects, unchanged_count = diff_projects(project_values)
+            counts['created'] += len(new_projects)
+            counts['updated'] += len(changed_projects)
+            counts['unchanged'] += unchanged_count
+            if dry_run:
+                for project in new_projects:
+                    self.stdout.write(f'created {project.project_id}')
+                for project in changed_projects:
+                    self.stdout.write(f'updated {project.project_id}')
+                continue
+
+            write_projects(new_projects, changed_projects, settings.ERP_IMPORT_BATCH_SIZE)
+            for project in new_projects:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Created project {project.project_name} with ID {project.project_id}'
+                    )
+                )
+
+        self.stdout.write(f'Went through {counts["total"]} projects')
+        self.stdout.write(self.style.SUCCESS(f'Created {counts["created"]} new projects'))
+        self.stdout.write(self.style.SUCCESS(f'Updated {counts["updated"]} projects'))
+        self.stdout.write(f'{counts["unchanged"]} projects were unchanged')
+        if full_sync:
+            self.archive_projects(counts, dry_run, data_area_ids)
+        self.stdout.write(f'Total projects in database: {Project.objects.count()}')
+        return counts
+
+    def archive_projects(self, counts, dry_run, data_area_ids=None):
+        """
+        Archive the projects that ERP no longer lists, and restore the archived
+        projects that it lists again. Projects are archived instead of deleted,
+        since deleting would cascade to their surveys. Only projects of the
+        fetched companies are archived, and nothing is archived when ERP listed
+        no projects at all, which is more likely a failed query than an empty ERP.
+        """
+        if not counts['listed']:
+            self.stdout.write(self.style.WARNING(
+                'ERP listed no projects, skipping archiving obsolete projects'
+            ))
+            return
+
+        if dry_run:
+            for project_id in iter_obsolete_project_ids(data_area_ids):
+                counts['archived'] += 1
+                self.stdout.write(f'obsolete {project_id}')
+            self.stdout.write(self.style.WARNING(f'Found {counts["archived"]} obsolete projects'))
+            return
+
+        counts['restored'] = restore_listed_projects()
+        counts['archived'] = archive_obsolete_projects(timezone.now(), data_area_ids)
+        self.stdout.write(self.style.SUCCESS(f'Restored {counts["restored"]} archived projects'))
+        self.stdout.write(self.style.WARNING(f'Archived {counts["archived"]} obsolete projects'))
+
+    def get_project_values(self, projects):
+        """
+        Get the field values of the importable projects in a page, keyed by project id.
+        A project listed more than once keeps its last values.
+        """
+        project_values = {}
         for item in projects:
             if not isinstance(item, dict):
                 self.stdout.write(self.style.ERROR(f'Invalid item format: {item}'))
@@ -104,52 +661,8 @@ class Command(BaseCommand):
 
             # Only import projects with two hyphens
             if project_id.count('-') == 2:
-                # If a project with the given project_id exists:
-                # -> update fields with the values in defaults.
-                # If no project with the given project_id exists:
-                # -> create new project with values in defaults.
-                project, created = Project.objects.update_or_create(
-                    project_id=project_id,
-                    defaults={
-                        'data_area_id': item.get('dataAreaId', ''),
-                        'project_name': item.get('ProjectName', ''),
-                        'dimension_display_value': item.get('DimensionDisplayValue', ''),
-                        'worker_responsible_personnel_number': item.get(
-                            'WorkerResponsiblePersonnelNumber', ''),
-                        'customer_account': item.get(
-                            'CustomerAccount', '')
-                    }
-                )
-                if created:
-                    created_count += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'Created project {project.project_name} with ID {project.project_id}'
-                        )
-                    )
-
-        # Retrieve all existing projects from the database
-        existing_projects = Project.objects.all()
-
-        # Create a set of ProjectIds from the given projects list
-        given_project_ids = {
-            item.get("ProjectID")
-            for item in projects
-            if isinstance(item, dict) and item.get("ProjectID")
-        }
-
-        # Delete projects that are not in the given projects list
-        deleted_count = 0
-        for project in existing_projects:
-            if project.project_id not in given_project_ids:
-                # project.delete()
-                deleted_count += 1 # pragma: no cover
-                # self.stdout.write(
-                #     self.style.SUCCESS(
-                #         f'Deleted project with ID {project.project_id}'
-                #     )
-                # )
-
-        self.stdout.write(self.style.SUCCESS(f'Created {created_count} new projects'))
-        self.stdout.write(self.style.WARNING(f'Found {deleted_count} obsolete projects'))
-        self.stdout.write(f'Total projects in database: {Project.objects.count()}')
+                project_values[project_id] = {
+                    field: item.get(erp_field, '')
+                    for field, erp_field in PROJECT_FIELDS.items()
+                }
+        return project_values
@@ -1,34 +1,127 @@
 """ api/middleware/MicrosoftTokenMiddleware.py """
 
+import threading
+import time
+from collections import OrderedDict
 import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
 from django.http import JsonResponse
 from django.conf import settings
 
+class VerifiedTokenCache:
+    """
+    Class for a bounded LRU cache of verified access tokens and their claims.
+    Entries are dropped once the `exp` claim of the token has passed.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """Method for getting the claims of a verified token, or None"""
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            expires_at = claims.get('exp')
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def set(self, token, claims):
+        """Method for caching the claims of a verified token"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Method for emptying the cache"""
+        with self._lock:
+            self._entries.clear()
+
+verified_tokens = VerifiedTokenCache(settings.ACCESS_TOKEN_CACHE_MAX_SIZE)
+
+def get_token_from_header(request):
+    """Helper function for extracting the access token from the authorization header"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+def verify_token(token):
+    """
+    Helper function for verifying an access token.
+
+    Returns:
+        dict: The claims of the token.
+
+    Raises:
+        ExpiredSignatureError: If the token has expired.
+        InvalidTokenError: If the token is invalid.
+    """
+    claims = verified_tokens.get(token)
+    if claims is None:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        verified_tokens.set(token, claims)
+    return claims
+
+def get_token_claims(request):
+    """
+    Helper function for getting the claims of the access token of a request.
+    Uses the claims attached by AccessTokenMiddleware, and verifies the token
+    when the middleware has not.
+
+    Returns:
+        dict: The claims, or None if the request has no access token.
+
+    Raises:
+        ExpiredSignatureError: If the token has expired.
+        InvalidTokenError: If the token is invalid.
+    """
+    claims = getattr(request, 'tts_claims', None)
+    if claims is not None:
+        return claims
+    token = get_token_from_header(request)
+    if not token:
+        return None
+    return verify_token(token)
+
 class AccessTokenMiddleware:
     """Middleware for ensuring that the requests sent to the backend come from authorized users"""
 
     def __init__(self, get_response):
         self.get_response = get_response
-        self.jwt_secret_key = settings.SECRET_KEY
 
     def __call__(self, request):
         """This method activates each time the middleware is called"""
+        request.tts_claims = None
 
         # Allow admin panel and the sign-in endpoint without a token
         if request.path.startswith('/admin/') or request.path == '/api/signin/':
             return self.get_response(request)
 
+        # Verify the token once and attach its claims for the views
+        token = self.get_token_from_header(request)
+        if token:
+            request.tts_claims = self.validate_token(token)
+
         # Check that POST, PUT, PATCH and DELETE requests come from authorized users
         if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
-            token = self.get_token_from_header(request)
             if not token:
                 return JsonResponse(
                     {'error': 'Authentication credentials were not provided'},
                     status=401
                 )
 
-            if not self.validate_token(token):
+            if request.tts_claims is None:
                 return JsonResponse({'error': 'Invalid or expired token'}, status=401)
 
         # Proceed with the request if token is valid
@@ -36,20 +129,14 @@ class AccessTokenMiddleware:
 
     def get_token_from_header(self, request):
         """Method for extracting the access token from the authorization header"""
-
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            return auth_header.split(' ')[1]
-        return None
+        return get_token_from_header(request)
 
     def validate_token(self, token):
-        """Method for validating the access token"""
+        """Method for validating the access token. Returns its claims, or None if not valid"""
 
         try:
-            # Decode the token using the secret key
-            jwt.decode(token, self.jwt_secret_key, algorithms=["HS256"])
-            return True
+            return verify_token(token)
         except ExpiredSignatureError:
-            return False  # Token is expired
+            return None  # Token is expired
         except InvalidTokenError:
-            return False  # Token is invalid
+            return None  # Token is invalid
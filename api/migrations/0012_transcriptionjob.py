@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:35
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_risknote_language_risknote_translations_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptionJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('recognition_language', models.TextField(blank=True)),
+                ('target_languages', models.JSONField(blank=True, default=list)),
+                ('transcription', models.TextField(blank=True)),
+                ('translations', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('returnvalue', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_transcriptionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionjob',
+            name='audio_digest',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
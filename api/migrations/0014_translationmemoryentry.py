@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_transcriptionjob_audio_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemoryEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_language', models.CharField(max_length=20)),
+                ('target_language', models.CharField(max_length=20)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('translation', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_language', 'target_language', 'text_hash'), name='unique_translation_memory_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:23
+
+import hashlib
+import json
+from django.db import migrations, models
+
+IMPORTED_FIELDS = (
+    'data_area_id',
+    'project_name',
+    'dimension_display_value',
+    'worker_responsible_personnel_number',
+    'customer_account',
+)
+
+# Migration changes
+def set_fingerprints(apps, schema_editor):
+    Project = apps.get_model('api', 'Project')
+    projects = list(Project.objects.only('id', *IMPORTED_FIELDS))
+    for project in projects:
+        data = json.dumps([getattr(project, field) for field in IMPORTED_FIELDS])
+        project.fingerprint = hashlib.sha256(data.encode('utf-8')).hexdigest()
+    Project.objects.bulk_update(projects, ['fingerprint'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_imageupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(
+            set_fingerprints,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_project_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_active', 'id'], name='project_active_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_project_archival'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='running', max_length=20)),
+                ('dry_run', models.BooleanField(default=False)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('fetched_count', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('updated_count', models.PositiveIntegerField(default=0)),
+                ('unchanged_count', models.PositiveIntegerField(default=0)),
+                ('archived_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+        ),
+    ]
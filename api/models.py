@@ -1,6 +1,8 @@
 """ api/models.py """
 
 from uuid import uuid4
+import hashlib
+import json
 import random
 import string
 from django.db import models
@@ -19,6 +21,11 @@ def generate_uuid():
     """Method to generate a unique user id"""
     return uuid4().hex
 
+def get_project_fingerprint(values):
+    """Method to hash the values of the fields of a project that are imported from ERP"""
+    data = json.dumps([values[field] for field in Project.IMPORTED_FIELDS])
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
 class Account(models.Model):
     """Class for Account model"""
     username = models.CharField(max_length=150)
@@ -29,6 +36,10 @@ class Account(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Accounts are the request.user of requests signed with an access token
+    is_authenticated = True
+    is_anonymous = False
+    is_staff = False
 
     def __str__(self):
         return f"{self.username} ({self.user_id}) {self.id}"
@@ -41,10 +52,38 @@ class Project(models.Model):
     dimension_display_value = models.CharField(max_length=255)
     worker_responsible_personnel_number = models.CharField(max_length=100)
     customer_account = models.CharField(max_length=100)
+    # Hash of the imported fields, so unchanged projects are skipped on import
+    fingerprint = models.CharField(max_length=64, blank=True, default='')
+    # Projects no longer listed by ERP are archived instead of deleted, keeping their surveys
+    is_active = models.BooleanField(default=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    IMPORTED_FIELDS = (
+        'data_area_id',
+        'project_name',
+        'dimension_display_value',
+        'worker_responsible_personnel_number',
+        'customer_account',
+    )
+
+    class Meta:
+        indexes = [
+            # Active projects in primary key order, as listed by ProjectList
+            models.Index(fields=['is_active', 'id'], name='project_active_idx'),
+        ]
 
     def __str__(self):
         return str(self.project_name)
 
+    def save(self, *args, **kwargs):
+        self.fingerprint = get_project_fingerprint(
+            {field: getattr(self, field) for field in self.IMPORTED_FIELDS}
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'fingerprint'}
+        super().save(*args, **kwargs)
+
 class Survey(models.Model):
     """Class for Survey model"""
     project = models.ForeignKey(Project, related_name="surveys", on_delete=models.CASCADE)
@@ -102,3 +141,101 @@ class RiskNote(models.Model):
 
     def __str__(self):
         return f"{self.note} ({self.created_at})"
+
+class TranscriptionJob(models.Model):
+    """Class for TranscriptionJob model"""
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    file_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    recognition_language = models.TextField(blank=True)
+    target_languages = models.JSONField(default=list, blank=True)
+    audio_digest = models.CharField(max_length=64, blank=True)
+    transcription = models.TextField(blank=True)
+    translations = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    returnvalue = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+class ImageUpload(models.Model):
+    """Class for ImageUpload model, an image the client uploads directly to blob storage"""
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    file_name = models.CharField(max_length=255)
+    blob_name = models.CharField(max_length=1024, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    size = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.blob_name} ({self.status})"
+
+class TranslationMemoryEntry(models.Model):
+    """Class for a remembered translation of a text to one target language"""
+    source_language = models.CharField(max_length=20)
+    target_language = models.CharField(max_length=20)
+    text_hash = models.CharField(max_length=64)
+    text = models.TextField()
+    translation = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_language', 'target_language', 'text_hash'],
+                name='unique_translation_memory_entry'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.source_language}->{self.target_language}: {self.text}"
+
+class ProjectSyncRun(models.Model):
+    """Class for ProjectSyncRun model, one run of the project import from ERP"""
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_SKIPPED, 'Skipped'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    dry_run = models.BooleanField(default=False)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    fetched_count = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    archived_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.started_at} ({self.status})"
@@ -0,0 +1,54 @@
+""" api/pagination.py """
+
+from rest_framework.pagination import CursorPagination
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Base class for keyset (cursor) pagination of the list endpoints.
+
+    Pagination is opt-in: it is applied only when the client sends a
+    `cursor` or `page_size` query parameter, so existing clients that
+    expect the whole list keep receiving it unchanged.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_requested(self, request):
+        """Method to check if the client asked for a paginated response"""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_paginated_data(self, data, key='results'):
+        """Method to wrap a page of serialized data with the cursor links"""
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            key: data,
+        }
+
+class ProjectCursorPagination(KeysetCursorPagination):
+    """Cursor pagination for projects, which are ordered by primary key"""
+    ordering = ('id',)
+
+class SurveyCursorPagination(KeysetCursorPagination):
+    """Cursor pagination for surveys, newest first"""
+    ordering = ('-created_at', '-id')
+
+class RiskNoteCursorPagination(KeysetCursorPagination):
+    """Cursor pagination for risk notes, in the order they were written"""
+    ordering = ('created_at', 'id')
+
+class FilledSurveyCursorPagination(KeysetCursorPagination):
+    """Cursor pagination for filled surveys, most recently filled first"""
+    ordering = ('-filled_at', '-id')
+
+class AccountSurveyCursorPagination(KeysetCursorPagination):
+    """Cursor pagination for the accounts that have filled a survey"""
+    ordering = ('filled_at', 'id')
@@ -3,7 +3,7 @@
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import serializers
-from .models import Project, RiskNote, Survey, Account, AccountSurvey
+from .models import Project, RiskNote, Survey, Account, AccountSurvey, TranscriptionJob
 
 User = get_user_model()
 
@@ -125,7 +125,12 @@ class ProjectListSerializer(serializers.HyperlinkedModelSerializer):
                   'customer_account', 'last_survey_date']
 
     def get_last_survey_date(self, obj):
-        """Method to get the last survey date"""
+        """
+        Method to get the last survey date. Uses the value annotated by
+        ProjectList when present, otherwise queries the project's surveys.
+        """
+        if hasattr(obj, 'last_survey_created_at'):
+            return obj.last_survey_created_at
         last_survey = obj.surveys.order_by('-created_at').first()
         if last_survey:
             return last_survey.created_at
@@ -144,6 +149,18 @@ class AudioUploadSerializer(serializers.Serializer): # pylint: disable=abstract-
     """Serializer for audio file upload."""
     audio = serializers.FileField(required=True)
 
+class TranscriptionJobSerializer(serializers.ModelSerializer):
+    """Class for TranscriptionJobSerializer"""
+    job_id = serializers.ReadOnlyField(source='id')
+
+    class Meta:
+        model = TranscriptionJob
+        fields = [
+            'job_id', 'file_name', 'status', 'recognition_language', 'target_languages',
+            'transcription', 'translations', 'error', 'returnvalue',
+            'created_at', 'completed_at'
+        ]
+
 class AccountSerializer(serializers.ModelSerializer):
     """Class for AccountSerializer"""
     class Meta:
@@ -0,0 +1,12 @@
+""" api/signals.py """
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from api.authentication import forget_account
+from api.models import Account
+
+@receiver(post_delete, sender=Account)
+def forget_deleted_account(sender, instance, **kwargs): # pylint: disable=unused-argument
+    """Signal handler to drop the cached primary key of a deleted account"""
+    forget_account(instance.user_id)
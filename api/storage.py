@@ -0,0 +1,102 @@
+""" api/storage.py """
+
+import os
+import threading
+import uuid
+from urllib.parse import quote
+import requests
+from azure.core.pipeline.transport import RequestsTransport # pylint: disable=no-name-in-module
+from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def get_account_url():
+    """Helper function to build the URL of the Azure Storage account"""
+    return f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
+
+# Prefix of the blobs of uploaded images
+IMAGE_BLOB_PREFIX = 'images/'
+
+# Longest part of the client's file name, without the extension, kept in a blob name
+MAX_BLOB_FILE_NAME_LENGTH = 100
+
+def get_image_blob_name(file_name):
+    """Helper function to generate a unique blob name for an uploaded image"""
+    name, extension = os.path.splitext(os.path.basename(file_name))
+    return f"{IMAGE_BLOB_PREFIX}{uuid.uuid4()}_{name[:MAX_BLOB_FILE_NAME_LENGTH]}{extension}"
+
+def get_blob_url(blob_name):
+    """
+    Helper function to build the URL of a blob in the image container. The blob
+    name is percent-encoded, so characters such as '#' and '?' stay in the path.
+    """
+    return f"{get_account_url()}/{settings.AZURE_CONTAINER_NAME}/{quote(blob_name)}"
+
+def generate_upload_url(blob_name, expires_at):
+    """
+    Helper function to build a URL the client can upload one blob to directly.
+    The URL carries a SAS token that only allows creating that blob over HTTPS
+    until `expires_at`, so an existing blob cannot be overwritten with it.
+    """
+    sas_token = generate_blob_sas(
+        account_name=settings.AZURE_STORAGE_ACCOUNT_NAME,
+        container_name=settings.AZURE_CONTAINER_NAME,
+        blob_name=blob_name,
+        account_key=settings.AZURE_STORAGE_ACCOUNT_KEY,
+        permission=BlobSasPermissions(create=True),
+        expiry=expires_at,
+        protocol='https'
+    )
+    return f"{get_blob_url(blob_name)}?{sas_token}"
+
+def create_container_client():
+    """
+    Helper function to create a client for the image container.
+
+    The client uses its own connection pool sized for concurrent image requests.
+    Retries are left to the SDK pipeline, so the pool adapter does not retry.
+    Uploads larger than AZURE_BLOB_MAX_SINGLE_PUT_SIZE are split into blocks.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_maxsize=settings.AZURE_BLOB_POOL_MAXSIZE,
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    transport = RequestsTransport(
+        session=session,
+        session_owner=False,
+        connection_timeout=settings.AZURE_BLOB_CONNECTION_TIMEOUT,
+        read_timeout=settings.AZURE_BLOB_READ_TIMEOUT
+    )
+    blob_service_client = BlobServiceClient(
+        account_url=get_account_url(),
+        credential=settings.AZURE_STORAGE_ACCOUNT_KEY,
+        transport=transport,
+        max_single_put_size=settings.AZURE_BLOB_MAX_SINGLE_PUT_SIZE,
+        max_block_size=settings.AZURE_BLOB_MAX_BLOCK_SIZE
+    )
+    return blob_service_client.get_container_client(settings.AZURE_CONTAINER_NAME)
+
+_CONTAINER_CLIENT = None
+_CONTAINER_CLIENT_LOCK = threading.Lock()
+
+def get_container_client():
+    """
+    Helper function to get the process-wide container client shared by all threads.
+    It is built by the factory in AZURE_BLOB_CONTAINER_CLIENT_FACTORY on first use.
+    """
+    global _CONTAINER_CLIENT # pylint: disable=global-statement
+    with _CONTAINER_CLIENT_LOCK:
+        if _CONTAINER_CLIENT is None:
+            _CONTAINER_CLIENT = import_string(settings.AZURE_BLOB_CONTAINER_CLIENT_FACTORY)()
+        return _CONTAINER_CLIENT
+
+def reset_container_client():
+    """Helper function to drop the shared container client, e.g. after a settings change"""
+    global _CONTAINER_CLIENT # pylint: disable=global-statement
+    with _CONTAINER_CLIENT_LOCK:
+        _CONTAINER_CLIENT = None
@@ -4,10 +4,21 @@ from io import BytesIO
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from api.erp_auth import get_erp_token_provider
+from api.middleware.access_token_middleware import verified_tokens
 from api.models import Project, Survey, RiskNote, Account
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Fixture to start every test with empty caches"""
+    for cache in caches.all():
+        cache.clear()
+    verified_tokens.clear()
+    get_erp_token_provider().clear()
+
 @pytest.fixture(name='client')
 def client_fixture():
     """Fixture to create an APIClient object"""
@@ -0,0 +1,23 @@
+""" Test cases for the benchmark_images management command """
+from io import StringIO
+from django.core.management import call_command
+from PIL import Image
+
+def test_benchmark_generated_images():
+    """ Test that the benchmark reports sizes and timings for generated samples """
+    out = StringIO()
+    call_command('benchmark_images', count=1, width=400, workers=2, stdout=out)
+    output = out.getvalue()
+    assert 'photo_0.jpg' in output
+    assert 'screenshot_0.png' in output
+    assert 'Total:' in output
+    assert '2 workers' in output
+
+def test_benchmark_directory(tmp_path):
+    """ Test that the benchmark reads the images of a directory """
+    Image.new('RGB', (300, 200)).save(tmp_path / 'site.jpg', format='JPEG')
+    (tmp_path / 'notes.txt').write_text('not an image')
+    out = StringIO()
+    call_command('benchmark_images', directory=str(tmp_path), stdout=out)
+    assert 'site.jpg' in out.getvalue()
+    assert 'notes.txt' not in out.getvalue()
@@ -1,18 +1,34 @@
 """ Test cases for the import_projects management command """
+import argparse
+from io import StringIO
 from unittest.mock import patch, MagicMock
 import requests
 
 from django.conf import settings
 from django.core.management import call_command
-from django.test import TestCase
-
-from api.management.commands.import_projects import get_erp_access_token, fetch_projects_from_erp
-from api.models import Project
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.management.commands.import_projects import (
+    SYNC_LOCK_ID,
+    Command,
+    diff_projects,
+    get_erp_access_token,
+    fetch_data_area_ids,
+    PageQueue,
+    fetch_partition,
+    fetch_projects_from_erp,
+    parse_interval,
+    parse_since,
+    upsert_projects
+)
+from api.models import Project, ProjectSyncRun
 
 class GetErpAccessTokenTestCase(TestCase):
     """ Test the get_erp_access_token helper function """
 
-    @patch('api.management.commands.import_projects.requests.post')
+    @patch('requests.Session.post')
     def test_get_erp_access_token_success(self, mock_post):
         """ Test the case where the access token is successfully retrieved """
         # Mock the response to return a successful token
@@ -31,11 +47,10 @@ class GetErpAccessTokenTestCase(TestCase):
                 'client_secret': settings.ERP_CLIENT_SECRET,
                 'grant_type': 'client_credentials',
                 'resource': resource,
-            },
-            timeout=30
+            }
         )
 
-    @patch('api.management.commands.import_projects.requests.post')
+    @patch('requests.Session.post')
     def test_get_erp_access_token_failure(self, mock_post):
         """ Test the case where getting the access token fails """
         # Mock the response to raise an exception
@@ -52,14 +67,13 @@ class GetErpAccessTokenTestCase(TestCase):
                 'client_secret': settings.ERP_CLIENT_SECRET,
                 'grant_type': 'client_credentials',
                 'resource': resource,
-            },
-            timeout=30
+            }
         )
 
 class FetchProjectsFromErpTestCase(TestCase):
     """ Test the fetch_projects_from_erp helper function """
 
-    @patch('api.management.commands.import_projects.requests.get')
+    @patch('requests.Session.get')
     def test_fetch_projects_from_erp_success(self, mock_get):
         """ Test the case where projects are successfully fetched """
         # Mock the response to return project data
@@ -81,9 +95,10 @@ class FetchProjectsFromErpTestCase(TestCase):
 
         resource = 'fake_resource'
         access_token = 'fake_access_token'
-        projects = fetch_projects_from_erp(access_token, resource)
-        self.assertEqual(len(projects['value']), 1)
-        self.assertEqual(projects['value'][0]['ProjectID'], '123-45-67')
+        pages = list(fetch_projects_from_erp(access_token, resource))
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(len(pages[0]), 1)
+        self.assertEqual(pages[0][0]['ProjectID'], '123-45-67')
         mock_get.assert_called_once_with(
             f"{resource}/data/Projects?cross-company=true"
             f"&$filter=ProjectStage eq Microsoft.Dynamics.DataEntities.ProjStatus'InProcess'"
@@ -93,11 +108,58 @@ class FetchProjectsFromErpTestCase(TestCase):
             headers={
                 'Authorization': f'Bearer {access_token}',
                 'Content-Type': 'application/json',
-            },
-            timeout=30
+                'Prefer': f'odata.maxpagesize={settings.ERP_PAGE_SIZE}',
+            }
+        )
+
+    @patch('requests.Session.get')
+    def test_fetch_projects_from_erp_follows_next_link(self, mock_get):
+        """ Test that the pages of the ERP response are fetched one at a time """
+        first_page = MagicMock()
+        first_page.json.return_value = {
+            'value': [{'ProjectID': '123-45-67'}],
+            '@odata.nextLink': 'fake_resource/data/Projects?$skiptoken=1'
+        }
+        second_page = MagicMock()
+        second_page.json.return_value = {'value': [{'ProjectID': '234-56-78'}]}
+        mock_get.side_effect = [first_page, second_page]
+
+        pages = fetch_projects_from_erp('fake_access_token', 'fake_resource')
+        self.assertEqual(next(pages), [{'ProjectID': '123-45-67'}])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(next(pages), [{'ProjectID': '234-56-78'}])
+        self.assertEqual(
+            mock_get.call_args.args[0], 'fake_resource/data/Projects?$skiptoken=1'
+        )
+        self.assertEqual(list(pages), [])
+
+    @override_settings(ERP_PARTITION_RETRIES=1)
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_fetch_projects_from_erp_retries_page(self, mock_get, mock_sleep):
+        """ Test that a failed page is requested again, without fetching earlier pages """
+        first_page = MagicMock()
+        first_page.json.return_value = {
+            'value': [{'ProjectID': '123-45-67'}],
+            '@odata.nextLink': 'fake_resource/data/Projects?$skiptoken=1'
+        }
+        second_page = MagicMock()
+        second_page.json.return_value = {'value': [{'ProjectID': '234-56-78'}]}
+        mock_get.side_effect = [
+            first_page, requests.RequestException("Read timed out"), second_page
+        ]
+
+        pages = list(fetch_projects_from_erp('fake_access_token', 'fake_resource'))
+
+        self.assertEqual(pages, [[{'ProjectID': '123-45-67'}], [{'ProjectID': '234-56-78'}]])
+        self.assertEqual(
+            [call.args[0] for call in mock_get.call_args_list][1:],
+            ['fake_resource/data/Projects?$skiptoken=1'] * 2
         )
+        mock_sleep.assert_called_once()
 
-    @patch('api.management.commands.import_projects.requests.get')
+    @override_settings(ERP_PARTITION_RETRIES=0)
+    @patch('requests.Session.get')
     def test_fetch_projects_from_erp_failure(self, mock_get):
         """ Test the case where fetching projects fails """
         # Mock the response to raise an exception
@@ -106,7 +168,7 @@ class FetchProjectsFromErpTestCase(TestCase):
         resource = 'fake_resource'
         access_token = 'fake_access_token'
         with self.assertRaises(requests.RequestException) as context:
-            fetch_projects_from_erp(access_token, resource)
+            list(fetch_projects_from_erp(access_token, resource))
         self.assertIn("Failed to fetch projects", str(context.exception))
         mock_get.assert_called_once_with(
             f"{resource}/data/Projects?cross-company=true"
@@ -117,10 +179,115 @@ class FetchProjectsFromErpTestCase(TestCase):
             headers={
                 'Authorization': f'Bearer {access_token}',
                 'Content-Type': 'application/json',
-            },
-            timeout=30
+                'Prefer': f'odata.maxpagesize={settings.ERP_PAGE_SIZE}',
+            }
+        )
+
+class FetchPartitionsTestCase(TestCase):
+    """ Test fetching the projects of each company """
+
+    @patch('requests.Session.get')
+    def test_fetch_data_area_ids(self, mock_get):
+        """ Test that the companies are fetched from ERP """
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            'value': [{'LegalEntityId': 'FI01'}, {'LegalEntityId': 'SE01'}]
+        }
+        mock_get.return_value = mock_response
+
+        self.assertEqual(fetch_data_area_ids('fake_token', 'fake_resource'), ['fi01', 'se01'])
+        self.assertEqual(
+            mock_get.call_args.args[0], 'fake_resource/data/LegalEntities?$select=LegalEntityId'
+        )
+
+    @override_settings(ERP_DATA_AREA_IDS=['fi01'])
+    @patch('requests.Session.get')
+    def test_configured_data_area_ids(self, mock_get):
+        """ Test that configured companies are not fetched """
+        self.assertEqual(fetch_data_area_ids('fake_token', 'fake_resource'), ['fi01'])
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
+    def test_fetch_projects_of_company(self, mock_get):
+        """ Test that the projects of one company are filtered by dataAreaId """
+        mock_response = MagicMock()
+        mock_response.json.return_value = {'value': []}
+        mock_get.return_value = mock_response
+
+        list(fetch_projects_from_erp('fake_token', 'fake_resource', 'fi01'))
+        self.assertIn(
+            "ProjStatus'InProcess' and dataAreaId eq 'fi01'&$select=", mock_get.call_args.args[0]
+        )
+
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_fetch_partition(self, mock_fetch_projects):
+        """ Test that a company is handed over page by page, followed by its end """
+        mock_fetch_projects.return_value = iter(
+            [[{'ProjectID': '123-45-67'}], [{'ProjectID': '234-56-78'}]]
         )
+        page_queue = PageQueue(maxsize=3)
+
+        project_count, _ = fetch_partition('fake_token', 'fake_resource', 'fi01', None, page_queue)
 
+        self.assertEqual(project_count, 2)
+        self.assertEqual(
+            [page_queue.get() for _ in range(3)],
+            [
+                ('fi01', [{'ProjectID': '123-45-67'}]),
+                ('fi01', [{'ProjectID': '234-56-78'}]),
+                ('fi01', None),
+            ]
+        )
+
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_fetch_partition_stops_when_closed(self, mock_fetch_projects):
+        """ Test that a company stops fetching once the import has given up on it """
+        mock_fetch_projects.return_value = iter([[{'ProjectID': '123-45-67'}]] * 3)
+        page_queue = PageQueue(maxsize=1)
+        page_queue.close()
+
+        project_count, _ = fetch_partition('fake_token', 'fake_resource', 'fi01', None, page_queue)
+
+        self.assertEqual(project_count, 0)
+        self.assertEqual(len(list(mock_fetch_projects.return_value)), 2)
+
+    @override_settings(ERP_DATA_AREA_IDS=['fi01', 'se01'])
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_import_companies_in_parallel(self, mock_fetch_projects, mock_get_token):
+        """ Test that the projects of all companies are imported, with timings """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.side_effect = lambda token, resource, data_area_id, since: iter([[{
+            'ProjectID': f'{data_area_id}-00-01',
+            'dataAreaId': data_area_id,
+        }]])
+        out = StringIO()
+
+        call_command('import_projects', concurrency=2, stdout=out)
+
+        self.assertEqual(
+            set(Project.objects.values_list('project_id', flat=True)),
+            {'fi01-00-01', 'se01-00-01'}
+        )
+        self.assertIn('Fetching 2 companies with 2 parallel requests', out.getvalue())
+        self.assertIn('Fetched 1 projects of fi01', out.getvalue())
+
+    @patch('api.management.commands.import_projects.fetch_data_area_ids', return_value=[])
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_import_without_companies(self, mock_fetch_projects, mock_get_token, _):
+        """ Test that all projects are fetched in one query when there are no companies """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.return_value = iter([[{'ProjectID': '123-45-67'}]])
+
+        call_command('import_projects', stdout=StringIO())
+
+        mock_fetch_projects.assert_called_once_with(
+            'fake_access_token', settings.ERP_RESOURCE, since=None
+        )
+        self.assertTrue(Project.objects.filter(project_id='123-45-67').exists())
+
+@override_settings(ERP_DATA_AREA_IDS=['area1'], ERP_PARTITION_RETRIES=0)
 class ImportProjectsTestCase(TestCase):
     """ Test the import_projects management command """
 
@@ -132,8 +299,8 @@ class ImportProjectsTestCase(TestCase):
         mock_get_token.return_value = 'fake_access_token'
 
         # Mock the projects data
-        mock_projects_data = {
-            'value': [
+        mock_projects_data = [
+            [
                 {
                     'ProjectID': '123-45-67',
                     'dataAreaId': 'area1',
@@ -151,7 +318,7 @@ class ImportProjectsTestCase(TestCase):
                     'CustomerAccount': 'Cust2'
                 }
             ]
-        }
+        ]
         mock_fetch_projects.return_value = mock_projects_data
 
         # Call the management command
@@ -181,11 +348,11 @@ class ImportProjectsTestCase(TestCase):
         mock_get_token.return_value = 'fake_access_token'
 
         # Mock the projects data with an invalid item format
-        mock_projects_data = {
-            'value': [
+        mock_projects_data = [
+            [
                 'invalid_item'
             ]
-        }
+        ]
         mock_fetch_projects.return_value = mock_projects_data
 
         # Call the management command
@@ -202,8 +369,8 @@ class ImportProjectsTestCase(TestCase):
         mock_get_token.return_value = 'fake_access_token'
 
         # Mock the projects data with a missing ProjectID
-        mock_projects_data = {
-            'value': [
+        mock_projects_data = [
+            [
                 {
                     'dataAreaId': 'area1',
                     'ProjectName': 'Project 1',
@@ -212,7 +379,7 @@ class ImportProjectsTestCase(TestCase):
                     'CustomerAccount': 'Cust1'
                 }
             ]
-        }
+        ]
         mock_fetch_projects.return_value = mock_projects_data
 
         # Call the management command
@@ -249,3 +416,319 @@ class ImportProjectsTestCase(TestCase):
 
         # Check that no projects were imported
         self.assertEqual(Project.objects.count(), 0)
+
+def make_erp_project(project_id, name):
+    """ Helper function to create an ERP project row """
+    return {
+        'ProjectID': project_id,
+        'dataAreaId': 'area1',
+        'ProjectName': name,
+        'DimensionDisplayValue': 'Dimension',
+        'WorkerResponsiblePersonnelNumber': '12345',
+        'CustomerAccount': 'Cust1'
+    }
+
+@override_settings(ERP_DATA_AREA_IDS=['area1'], ERP_PARTITION_RETRIES=0)
+class BulkImportProjectsTestCase(TestCase):
+    """ Test the bulk upsert of the import_projects management command """
+
+    def setUp(self):
+        """ Create an existing project that the ERP has renamed and one it has not """
+        for project_id, name in (('100-00-01', 'Old name'), ('100-00-02', 'Same name')):
+            Project.objects.create(
+                project_id=project_id,
+                data_area_id='area1',
+                project_name=name,
+                dimension_display_value='Dimension',
+                worker_responsible_personnel_number='12345',
+                customer_account='Cust1'
+            )
+
+    def test_import_counts(self):
+        """ Test that only new and changed projects are written, across pages """
+        pages = [
+            [make_erp_project('100-00-01', 'New name'), make_erp_project('100-00-02', 'Same name')],
+            [make_erp_project('100-00-03', 'Created'), make_erp_project('100-00-03', 'Created 2')],
+        ]
+        out = StringIO()
+        counts = Command(stdout=out).import_projects(pages)
+
+        self.assertEqual(counts['created'], 1)
+        self.assertEqual(counts['updated'], 1)
+        self.assertEqual(counts['unchanged'], 1)
+        self.assertEqual(Project.objects.get(project_id='100-00-01').project_name, 'New name')
+        self.assertEqual(Project.objects.get(project_id='100-00-03').project_name, 'Created 2')
+        self.assertIn('Updated 1 projects', out.getvalue())
+
+    def test_unchanged_page_makes_no_writes(self):
+        """ Test that a page without changes only reads the existing projects """
+        page = [
+            make_erp_project('100-00-01', 'Old name'),
+            make_erp_project('100-00-02', 'Same name'),
+        ]
+        with self.assertNumQueries(1):
+            new_projects, updated_count, unchanged_count = upsert_projects(
+                Command(stdout=StringIO()).get_project_values(page), batch_size=100
+            )
+        self.assertEqual((new_projects, updated_count, unchanged_count), ([], 0, 2))
+
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_failed_page_rolls_back_import(self, mock_fetch_projects, mock_get_token):
+        """ Test that projects of earlier pages are not kept when a later page fails """
+        mock_get_token.return_value = 'fake_access_token'
+
+        def pages(*_):
+            yield [make_erp_project('100-00-03', 'Created')]
+            raise requests.RequestException("Failed to fetch projects")
+        mock_fetch_projects.side_effect = pages
+
+        call_command('import_projects', stdout=StringIO())
+
+        self.assertFalse(Project.objects.filter(project_id='100-00-03').exists())
+
+@override_settings(ERP_DATA_AREA_IDS=['area1'], ERP_PARTITION_RETRIES=0)
+class DeltaSyncTestCase(TestCase):
+    """ Test the fingerprints, --since and --dry-run of the import_projects command """
+
+    def setUp(self):
+        """ Create a project that ERP has renamed and one that ERP no longer lists """
+        for project_id in ('100-00-01', '100-00-09'):
+            Project.objects.create(
+                project_id=project_id,
+                data_area_id='area1',
+                project_name='Old name',
+                dimension_display_value='Dimension',
+                worker_responsible_personnel_number='12345',
+                customer_account='Cust1'
+            )
+
+    def test_fingerprint_follows_imported_fields(self):
+        """ Test that saving a project keeps its fingerprint up to date """
+        project = Project.objects.get(project_id='100-00-01')
+        fingerprint = project.fingerprint
+        project.project_name = 'Edited name'
+        project.save(update_fields=['project_name'])
+
+        project.refresh_from_db()
+        self.assertNotEqual(project.fingerprint, fingerprint)
+        self.assertEqual(
+            diff_projects(Command(stdout=StringIO()).get_project_values(
+                [make_erp_project('100-00-01', 'Edited name')]
+            ))[2],
+            1
+        )
+
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_dry_run(self, mock_fetch_projects, mock_get_token):
+        """ Test that a dry run reports the differences without saving them """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.return_value = iter([[
+            make_erp_project('100-00-01', 'New name'),
+            make_erp_project('100-00-02', 'Created'),
+        ]])
+        out = StringIO()
+
+        call_command('import_projects', dry_run=True, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertIn('created 100-00-02', lines)
+        self.assertIn('updated 100-00-01', lines)
+        self.assertIn('obsolete 100-00-09', lines)
+        self.assertEqual(Project.objects.count(), 2)
+        self.assertEqual(Project.objects.get(project_id='100-00-01').project_name, 'Old name')
+
+    @override_settings(ERP_MODIFIED_FIELD='ModifiedDateTime')
+    @patch('requests.Session.get')
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    def test_since(self, mock_get_token, mock_get):
+        """ Test that --since filters the projects by their modified time """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_response = MagicMock()
+        mock_response.json.return_value = {'value': [make_erp_project('100-00-01', 'New name')]}
+        mock_get.return_value = mock_response
+        out = StringIO()
+
+        call_command('import_projects', '--since=2024-05-01T12:00:00+03:00', stdout=out)
+
+        self.assertIn(
+            " and ModifiedDateTime gt 2024-05-01T09:00:00Z&", mock_get.call_args.args[0]
+        )
+        self.assertEqual(Project.objects.get(project_id='100-00-01').project_name, 'New name')
+        # A partial fetch says nothing about obsolete projects
+        self.assertNotIn('obsolete', out.getvalue())
+
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_since_without_modified_field(self, mock_fetch_projects, mock_get_token):
+        """ Test that all projects are fetched when ERP has no modified field configured """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.return_value = iter([[]])
+        out = StringIO()
+
+        call_command('import_projects', '--since=2024-05-01', stdout=out)
+
+        self.assertEqual(mock_fetch_projects.call_args.args[3], None)
+        self.assertIn('ERP_MODIFIED_FIELD is not set', out.getvalue())
+
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_archive_and_restore(self, mock_fetch_projects, mock_get_token):
+        """ Test that unlisted projects are archived, and restored when listed again """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.return_value = iter([[make_erp_project('100-00-01', 'Old name')]])
+        out = StringIO()
+
+        call_command('import_projects', stdout=out)
+
+        archived = Project.objects.get(project_id='100-00-09')
+        self.assertFalse(archived.is_active)
+        self.assertIsNotNone(archived.archived_at)
+        self.assertTrue(Project.objects.get(project_id='100-00-01').is_active)
+        self.assertIn('Archived 1 obsolete projects', out.getvalue())
+
+        mock_fetch_projects.return_value = iter([[
+            make_erp_project('100-00-01', 'Old name'),
+            make_erp_project('100-00-09', 'Old name'),
+        ]])
+        out = StringIO()
+        call_command('import_projects', stdout=out)
+
+        restored = Project.objects.get(project_id='100-00-09')
+        self.assertTrue(restored.is_active)
+        self.assertIsNone(restored.archived_at)
+        self.assertIn('Restored 1 archived projects', out.getvalue())
+        self.assertIn('Archived 0 obsolete projects', out.getvalue())
+
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_archive_only_fetched_companies(self, mock_fetch_projects, mock_get_token):
+        """ Test that projects of companies that were not fetched are not archived """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.return_value = iter([[make_erp_project('100-00-01', 'Old name')]])
+        Project.objects.create(
+            project_id='200-00-01',
+            data_area_id='area2',
+            project_name='Other company',
+            dimension_display_value='Dimension',
+            worker_responsible_personnel_number='12345',
+            customer_account='Cust1'
+        )
+        out = StringIO()
+
+        call_command('import_projects', stdout=out)
+
+        self.assertFalse(Project.objects.get(project_id='100-00-09').is_active)
+        self.assertTrue(Project.objects.get(project_id='200-00-01').is_active)
+        self.assertIn('Archived 1 obsolete projects', out.getvalue())
+
+    @patch('api.management.commands.import_projects.get_erp_access_token')
+    @patch('api.management.commands.import_projects.fetch_projects_from_erp')
+    def test_empty_fetch_archives_nothing(self, mock_fetch_projects, mock_get_token):
+        """ Test that a full sync that lists no projects does not archive every project """
+        mock_get_token.return_value = 'fake_access_token'
+        mock_fetch_projects.return_value = iter([[]])
+        out = StringIO()
+
+        call_command('import_projects', stdout=out)
+
+        self.assertEqual(Project.objects.filter(is_active=True).count(), 2)
+        self.assertIn('ERP listed no projects', out.getvalue())
+
+    def test_parse_since(self):
+        """ Test that --since accepts dates and dates with times """
+        self.assertEqual(parse_since('2024-05-01').date().isoformat(), '2024-05-01')
+        self.assertEqual(parse_since('2024-05-01T12:00:00Z').hour, 12)
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_since('yesterday')
+
+@override_settings(ERP_DATA_AREA_IDS=['area1'], ERP_PARTITION_RETRIES=0)
+@patch('api.management.commands.import_projects.get_erp_access_token', return_value='fake_token')
+@patch('api.management.commands.import_projects.fetch_projects_from_erp')
+class ScheduledSyncTestCase(TestCase):
+    """ Test the sync history, locking and --every of the import_projects command """
+
+    def test_sync_history(self, mock_fetch_projects, _):
+        """ Test that a run is recorded with its duration and counts """
+        mock_fetch_projects.return_value = iter([[
+            make_erp_project('100-00-01', 'Created'),
+            make_erp_project('100-00-02', 'Created'),
+        ]])
+
+        call_command('import_projects', stdout=StringIO())
+
+        run = ProjectSyncRun.objects.get()
+        self.assertEqual(run.status, ProjectSyncRun.STATUS_SUCCEEDED)
+        self.assertEqual(run.fetched_count, 2)
+        self.assertEqual(run.created_count, 2)
+        self.assertEqual(run.archived_count, 0)
+        self.assertIsNotNone(run.finished_at)
+        self.assertGreaterEqual(run.duration.total_seconds(), 0)
+
+    def test_failed_sync_history(self, mock_fetch_projects, _):
+        """ Test that a failed run is recorded with its error """
+        mock_fetch_projects.side_effect = requests.RequestException("Read timed out")
+
+        call_command('import_projects', stdout=StringIO())
+
+        run = ProjectSyncRun.objects.get()
+        self.assertEqual(run.status, ProjectSyncRun.STATUS_FAILED)
+        self.assertIn("Read timed out", run.error)
+
+    def test_skips_run_while_another_instance_imports(self, mock_fetch_projects, _):
+        """ Test that a run is skipped while another connection holds the sync lock """
+        other_connection = connection.copy()
+        try:
+            with other_connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", [SYNC_LOCK_ID])
+            out = StringIO()
+
+            call_command('import_projects', stdout=out)
+        finally:
+            other_connection.close()
+
+        mock_fetch_projects.assert_not_called()
+        self.assertEqual(ProjectSyncRun.objects.get().status, ProjectSyncRun.STATUS_SKIPPED)
+        self.assertIn('skipping this run', out.getvalue())
+
+    @patch('api.management.commands.import_projects.close_old_connections')
+    @patch('time.sleep')
+    def test_every(self, mock_sleep, _, mock_fetch_projects, __):
+        """ Test that --every imports again after waiting for the interval """
+        mock_fetch_projects.side_effect = lambda *_: iter([[]])
+        mock_sleep.side_effect = [None, KeyboardInterrupt]
+        out = StringIO()
+
+        call_command('import_projects', '--every=15m', stdout=out)
+
+        self.assertEqual(ProjectSyncRun.objects.count(), 2)
+        self.assertLessEqual(mock_sleep.call_args.args[0], 900)
+        self.assertGreater(mock_sleep.call_args.args[0], 890)
+        self.assertIn('Importing projects every 900 seconds', out.getvalue())
+        self.assertIn('Stopped importing projects', out.getvalue())
+
+    def test_every_with_since(self, *_):
+        """ Test that --every and --since cannot be combined """
+        with self.assertRaises(CommandError):
+            call_command('import_projects', '--every=15m', '--since=2024-05-01')
+
+    def test_parse_interval(self, *_):
+        """ Test that intervals are read in seconds, minutes and hours """
+        self.assertEqual(parse_interval('90'), 90)
+        self.assertEqual(parse_interval('15m'), 900)
+        self.assertEqual(parse_interval('1h'), 3600)
+        for value in ('0m', '15 minutes', '-1m'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_interval(value)
+
+class BenchmarkImportProjectsTestCase(TestCase):
+    """ Test the benchmark_import_projects management command """
+
+    def test_benchmark(self):
+        """ Test that both import paths are measured and rolled back """
+        out = StringIO()
+        call_command('benchmark_import_projects', count=20, changed_every=5, stdout=out)
+        self.assertIn('Row by row: create', out.getvalue())
+        self.assertIn('Bulk: create', out.getvalue())
+        self.assertEqual(Project.objects.count(), 0)
@@ -0,0 +1,136 @@
+""" api/tests/unit/test_authentication.py """
+
+import jwt
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import (
+    AccessTokenAuthentication,
+    AccountNotFound,
+    get_account_cache_key
+)
+from api.models import Account
+
+pytestmark = pytest.mark.django_db
+
+def make_request(user_id=None, token=None):
+    """Helper function to build a DRF request signed with an access token"""
+    if token is None and user_id is not None:
+        token = jwt.encode({'user_id': user_id}, settings.SECRET_KEY, algorithm='HS256')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+    return Request(APIRequestFactory().get('/api/filled-surveys/', **headers))
+
+class TestAccessTokenAuthentication:
+    """Tests for AccessTokenAuthentication"""
+
+    def test_no_token(self):
+        """Test that requests without a token are left unauthenticated"""
+        assert AccessTokenAuthentication().authenticate(make_request()) is None
+
+    def test_valid_token(self):
+        """Test that the account and the claims of the token are returned"""
+        account = Account.objects.create(user_id='abc', username='tester')
+
+        user, claims = AccessTokenAuthentication().authenticate(make_request('abc'))
+
+        assert user == account
+        assert user.is_authenticated
+        assert claims == {'user_id': 'abc'}
+
+    def test_account_is_cached(self, django_assert_num_queries):
+        """Test that the account lookup is cached per user id"""
+        account = Account.objects.create(user_id='abc', username='tester')
+        authentication = AccessTokenAuthentication()
+        authentication.authenticate(make_request('abc'))
+
+        with django_assert_num_queries(0):
+            user, _ = authentication.authenticate(make_request('abc'))
+        assert user.pk == account.pk
+
+    def test_deleted_account_is_not_cached(self):
+        """Test that deleting an account drops its cached primary key"""
+        account = Account.objects.create(user_id='abc', username='tester')
+        AccessTokenAuthentication().authenticate(make_request('abc'))
+
+        account.delete()
+
+        assert caches[settings.ACCOUNT_CACHE_ALIAS].get(get_account_cache_key('abc')) is None
+        with pytest.raises(AccountNotFound):
+            AccessTokenAuthentication().authenticate(make_request('abc'))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_write_for_account_deleted_elsewhere(self, client, create_project):
+        """Test that a write for an account still cached by another process is a 404"""
+        account = Account.objects.create(user_id='abc', username='tester')
+        account_pk = account.pk
+        account.delete()
+        # Another process cached the account before it was deleted
+        caches[settings.ACCOUNT_CACHE_ALIAS].set(get_account_cache_key('abc'), account_pk)
+        token = jwt.encode({'user_id': 'abc'}, settings.SECRET_KEY, algorithm='HS256')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = client.post(
+            reverse('survey-list', kwargs={'project_pk': create_project.id}),
+            {'description': 'New Description', 'task': ['Task'], 'scaffold_type': ['Type']},
+            format='json'
+        )
+
+        assert response.status_code == 404
+        assert response.data == {'error': 'Account not found'}
+        assert caches[settings.ACCOUNT_CACHE_ALIAS].get(get_account_cache_key('abc')) is None
+
+    @override_settings(ACCOUNT_CACHE_TTL=0)
+    def test_account_cache_disabled(self, django_assert_num_queries):
+        """Test that the account is queried on every request without the cache"""
+        Account.objects.create(user_id='abc', username='tester')
+        authentication = AccessTokenAuthentication()
+        authentication.authenticate(make_request('abc'))
+
+        with django_assert_num_queries(1):
+            user, _ = authentication.authenticate(make_request('abc'))
+        assert user.username == 'tester'
+
+    def test_invalid_token(self):
+        """Test that an invalid token fails authentication"""
+        with pytest.raises(exceptions.AuthenticationFailed):
+            AccessTokenAuthentication().authenticate(make_request(token='invalid.token'))
+
+    def test_token_without_user_id(self):
+        """Test that a token without a user id fails authentication"""
+        token = jwt.encode({'username': 'tester'}, settings.SECRET_KEY, algorithm='HS256')
+        with pytest.raises(exceptions.AuthenticationFailed):
+            AccessTokenAuthentication().authenticate(make_request(token=token))
+
+    def test_account_not_found(self):
+        """Test that a token for a missing account fails authentication"""
+        with pytest.raises(AccountNotFound):
+            AccessTokenAuthentication().authenticate(make_request('missing'))
+
+    def test_public_views_ignore_bad_tokens(self, client, create_project):
+        """Test that views that need no account answer requests with stale or malformed tokens"""
+        stale_token = jwt.encode({'user_id': 'deleted'}, settings.SECRET_KEY, algorithm='HS256')
+        for token in (stale_token, 'invalid.token'):
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            response = client.get(reverse('project-list'))
+            assert response.status_code == 200
+            assert [project['id'] for project in response.data] == [create_project.id]
+
+            response = client.get(
+                reverse('survey-list', kwargs={'project_pk': create_project.id})
+            )
+            assert response.status_code == 200
+
+    def test_signin_with_stale_token(self, client):
+        """Test that a client holding a token of a deleted account can sign in again"""
+        stale_token = jwt.encode({'user_id': 'deleted'}, settings.SECRET_KEY, algorithm='HS256')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {stale_token}')
+
+        response = client.post(reverse('signin'), {'username': 'tester'}, format='json')
+        assert response.status_code == 201
@@ -0,0 +1,112 @@
+""" api/tests/unit/test_erp_auth.py """
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+import requests
+
+from api.erp_auth import ErpTokenProvider, get_erp_token_provider
+
+def make_token_response(token, expires_in=3599):
+    """Helper function to mock an Azure AD token response"""
+    response = MagicMock()
+    response.json.return_value = {'access_token': token, 'expires_in': str(expires_in)}
+    return response
+
+@patch('requests.Session.post')
+def test_token_is_reused(mock_post):
+    """Test that a token is requested once and reused until it needs refreshing"""
+    mock_post.return_value = make_token_response('token-1')
+    provider = ErpTokenProvider(refresh_margin=300)
+
+    assert provider.get_token('https://erp') == 'token-1'
+    assert provider.get_token('https://erp') == 'token-1'
+    assert mock_post.call_count == 1
+
+@patch('requests.Session.post')
+def test_token_is_refreshed_before_expiry(mock_post):
+    """Test that a token within the refresh margin of its expiry is replaced"""
+    mock_post.side_effect = [
+        make_token_response('token-1', expires_in=200),
+        make_token_response('token-2'),
+    ]
+    provider = ErpTokenProvider(refresh_margin=300)
+
+    assert provider.get_token('https://erp') == 'token-1'
+    assert provider.get_token('https://erp') == 'token-2'
+
+@patch('requests.Session.post')
+def test_tokens_are_kept_per_resource(mock_post):
+    """Test that each ERP resource has its own token"""
+    mock_post.side_effect = [make_token_response('prod'), make_token_response('sandbox')]
+    provider = ErpTokenProvider()
+
+    assert provider.get_token('https://erp') == 'prod'
+    assert provider.get_token('https://erp-sandbox') == 'sandbox'
+    assert provider.get_token('https://erp') == 'prod'
+
+@patch('requests.Session.post')
+def test_concurrent_callers_share_one_refresh(mock_post):
+    """Test that threads needing a token at the same time wait for a single request"""
+    def slow_token_response(*_, **__):
+        time.sleep(0.2)
+        return make_token_response('token-1')
+    mock_post.side_effect = slow_token_response
+    provider = ErpTokenProvider()
+    tokens = []
+
+    threads = [
+        threading.Thread(target=lambda: tokens.append(provider.get_token('https://erp')))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ['token-1'] * 8
+    assert mock_post.call_count == 1
+
+@patch('requests.Session.post')
+def test_token_is_shared_through_cache(mock_post):
+    """Test that processes sharing a cache reuse one token"""
+    mock_post.return_value = make_token_response('token-1')
+
+    assert ErpTokenProvider(cache_alias='default').get_token('https://erp') == 'token-1'
+    assert ErpTokenProvider(cache_alias='default').get_token('https://erp') == 'token-1'
+    assert mock_post.call_count == 1
+
+@patch('requests.Session.post')
+def test_waits_for_token_requested_by_another_process(mock_post):
+    """Test that a process waits for the token while another process holds the refresh lock"""
+    provider = ErpTokenProvider(cache_alias='default', lock_timeout=2)
+    provider.cache.add(f"{provider.get_cache_key('https://erp')}:lock", True, 2)
+
+    other_process = ErpTokenProvider(cache_alias='default')
+    timer = threading.Timer(0.2, lambda: other_process.cache.set(
+        other_process.get_cache_key('https://erp'), ('token-1', time.time() + 3599)
+    ))
+    timer.start()
+
+    assert provider.get_token('https://erp') == 'token-1'
+    mock_post.assert_not_called()
+
+@patch('requests.Session.post')
+def test_failed_request(mock_post):
+    """Test that a failed token request is reported and not cached"""
+    mock_post.side_effect = [
+        requests.RequestException('Connection refused'),
+        make_token_response('token-1'),
+    ]
+    provider = ErpTokenProvider(cache_alias='default')
+
+    with pytest.raises(requests.RequestException, match='Authentication failed'):
+        provider.get_token('https://erp')
+    assert provider.get_token('https://erp') == 'token-1'
+
+def test_process_wide_provider():
+    """Test that the process-wide provider is shared and uses the settings"""
+    provider = get_erp_token_provider()
+    assert provider is get_erp_token_provider()
+    assert provider.cache_alias == 'erp_tokens'
@@ -0,0 +1,84 @@
+""" api/tests/unit/test_http_client.py """
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from api.http_client import PooledSession, create_session
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler that replays the server's queued responses"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """Answer with the next queued response, or 200 when there are none left"""
+        self.server.client_ports.append(self.client_address[1])
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status_code, headers = (
+            self.server.responses.pop(0) if self.server.responses else (200, {})
+        )
+        body = b'{"ok": true}'
+        self.send_response(status_code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        """Keep the test output quiet"""
+
+@pytest.fixture(name='stub_server')
+def stub_server_fixture():
+    """Fixture to run a local HTTP server in a background thread"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.client_ports = []
+    server.responses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def stub_url(server):
+    """Helper function to build the URL of the stub server"""
+    return f'http://127.0.0.1:{server.server_address[1]}/'
+
+def test_session_reuses_connections(stub_server):
+    """Test that consecutive requests are sent over one kept-alive connection"""
+    session = create_session()
+    for _ in range(5):
+        assert session.get(stub_url(stub_server)).json() == {'ok': True}
+
+    assert len(stub_server.client_ports) == 5
+    assert len(set(stub_server.client_ports)) == 1
+
+def test_session_retries_rate_limited_request(stub_server, settings):
+    """Test that a 429 response is retried after the Retry-After delay"""
+    settings.HTTP_BACKOFF_FACTOR = 0
+    stub_server.responses = [(429, {'Retry-After': '0'}), (503, {})]
+
+    response = create_session().post(stub_url(stub_server), json={})
+
+    assert response.status_code == 200
+    assert len(stub_server.client_ports) == 3
+
+def test_session_returns_last_response_when_retries_run_out(stub_server, settings):
+    """Test that the error response is returned once the retries are used up"""
+    settings.HTTP_MAX_RETRIES = 1
+    settings.HTTP_BACKOFF_FACTOR = 0
+    stub_server.responses = [(500, {}), (502, {})]
+
+    response = create_session().get(stub_url(stub_server))
+
+    assert response.status_code == 502
+    assert len(stub_server.client_ports) == 2
+
+def test_session_uses_per_host_timeouts():
+    """Test that the timeout is picked by host unless the caller passes one"""
+    session = PooledSession(30, {'translator.example.com': 10})
+    assert session.get_timeout('https://translator.example.com/translate') == 10
+    assert session.get_timeout('https://erp.example.com/data/Projects') == 30
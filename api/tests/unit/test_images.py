@@ -0,0 +1,162 @@
+""" api/tests/unit/test_images.py """
+
+import io
+import pytest
+from PIL import Image, ImageCms
+
+from api.images import (
+    InvalidImageError,
+    get_variant_blob_name,
+    process_image,
+    process_images,
+    render_variant
+)
+
+def make_image(width, height, image_format='PNG', mode='RGB'):
+    """Helper function to encode a blank test image"""
+    output = io.BytesIO()
+    Image.new(mode, (width, height)).save(output, format=image_format)
+    return output.getvalue()
+
+def test_render_variant_scales_down_keeping_aspect_ratio():
+    """Test that a variant is scaled to the requested width"""
+    variant = render_variant(make_image(4000, 3000), 320, 'jpeg', 80)
+    with Image.open(io.BytesIO(variant)) as image:
+        assert image.format == 'JPEG'
+        assert image.size == (320, 240)
+
+def test_render_variant_does_not_scale_up():
+    """Test that images narrower than the requested width keep their size"""
+    variant = render_variant(make_image(100, 50), 320, 'webp', 80)
+    with Image.open(io.BytesIO(variant)) as image:
+        assert image.format == 'WEBP'
+        assert image.size == (100, 50)
+
+def test_render_variant_converts_transparent_images_to_jpeg():
+    """Test that images with an alpha channel can be rendered as JPEG"""
+    variant = render_variant(make_image(640, 480, mode='RGBA'), None, 'jpeg', 80)
+    with Image.open(io.BytesIO(variant)) as image:
+        assert image.mode == 'RGB'
+        assert image.size == (640, 480)
+
+def test_render_variant_shrinks_payload():
+    """Test that a thumbnail is an order of magnitude smaller than the original"""
+    original = make_image(2000, 1500, image_format='BMP')
+    assert len(render_variant(original, 320, 'webp', 80)) * 10 < len(original)
+
+def test_render_variant_rejects_corrupt_images():
+    """Test that truncated and oversized images raise InvalidImageError"""
+    with pytest.raises(InvalidImageError):
+        render_variant(make_image(640, 480, image_format='JPEG')[:300], 320, 'jpeg', 80)
+
+    with pytest.raises(InvalidImageError):
+        render_variant(b'not an image', 320, 'jpeg', 80)
+
+    Image.MAX_IMAGE_PIXELS, max_image_pixels = 1000, Image.MAX_IMAGE_PIXELS
+    try:
+        with pytest.raises(InvalidImageError):
+            render_variant(make_image(640, 480), 320, 'jpeg', 80)
+    finally:
+        Image.MAX_IMAGE_PIXELS = max_image_pixels
+
+def test_get_variant_blob_name():
+    """Test that variants are stored under names derived from the original blob"""
+    assert get_variant_blob_name('images/abc_photo.jpg', 320, 'webp') == (
+        'variants/images/abc_photo.jpg/w320.webp'
+    )
+    assert get_variant_blob_name('images/abc_photo.jpg', None, 'jpeg') == (
+        'variants/images/abc_photo.jpg/full.jpeg'
+    )
+
+def make_photo(width, height, exif=None):
+    """Helper function to encode a camera-like JPEG at high quality"""
+    image = Image.effect_noise((width, height), 40).convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=98, exif=exif or Image.Exif())
+    return output.getvalue()
+
+def test_process_image_strips_exif_and_applies_orientation():
+    """Test that camera metadata is removed after rotating the image upright"""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+    exif[0x010F] = 'Camera maker'
+
+    processed = process_image(make_photo(400, 300, exif), 'photo.jpg', 2560, 82)
+
+    with Image.open(io.BytesIO(processed)) as image:
+        assert image.size == (300, 400)
+        assert not image.getexif()
+
+def test_process_image_caps_dimensions_and_recompresses():
+    """Test that large photos are scaled down and stored smaller"""
+    original = make_photo(3000, 2000)
+    processed = process_image(original, 'photo.jpeg', 1500, 82)
+
+    with Image.open(io.BytesIO(processed)) as image:
+        assert image.size == (1500, 1000)
+    assert len(processed) < len(original) / 2
+
+def test_process_image_keeps_smaller_original():
+    """Test that an image is not stored larger than uploaded when there is nothing to strip"""
+    output = io.BytesIO()
+    Image.effect_noise((400, 300), 40).convert('RGB').save(output, format='JPEG', quality=20)
+    original = output.getvalue()
+    assert process_image(original, 'photo.jpg', 2560, 82) == original
+
+    # Metadata is always stripped, even if the recompressed image is larger
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    output = io.BytesIO()
+    Image.effect_noise((400, 300), 40).convert('RGB').save(
+        output, format='JPEG', quality=20, exif=exif
+    )
+    with Image.open(io.BytesIO(process_image(output.getvalue(), 'photo.jpg', 2560, 82))) as image:
+        assert not image.getexif()
+
+def test_process_image_keeps_icc_profile_of_matching_color_space():
+    """Test that an ICC profile is kept only while the pixels stay in its color space"""
+    profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+
+    output = io.BytesIO()
+    Image.new('RGB', (400, 300), 'red').save(output, format='JPEG', icc_profile=profile)
+    with Image.open(io.BytesIO(process_image(output.getvalue(), 'photo.jpg', 200, 82))) as image:
+        assert image.info.get('icc_profile') == profile
+
+    # CMYK photos are stored as RGB, which their CMYK profile does not describe
+    output = io.BytesIO()
+    Image.new('CMYK', (400, 300)).save(output, format='JPEG', icc_profile=profile)
+    with Image.open(io.BytesIO(process_image(output.getvalue(), 'photo.jpg', 200, 82))) as image:
+        assert image.mode == 'RGB'
+        assert 'icc_profile' not in image.info
+
+def test_process_image_accepts_bilevel_png():
+    """Test that black and white PNGs, which cannot be quantized, are accepted"""
+    original = make_image(200, 100, mode='1')
+    assert process_image(original, 'scan.png', 2560, 82) == original
+
+def test_process_image_rejects_spoofed_content():
+    """Test that files are checked by their content, not only their name"""
+    with pytest.raises(InvalidImageError):
+        process_image(b'<html>not an image</html>', 'photo.jpg', 2560, 82)
+
+    with pytest.raises(InvalidImageError):
+        process_image(make_image(10, 10), 'photo.jpg', 2560, 82)
+
+def test_process_image_rejects_corrupt_image():
+    """Test that an image with a valid header but broken data is rejected"""
+    with pytest.raises(InvalidImageError):
+        process_image(make_photo(400, 300)[:200], 'photo.jpg', 2560, 82)
+
+def test_process_image_keeps_gif_as_is():
+    """Test that GIFs are validated but not re-encoded"""
+    gif = make_image(20, 10, image_format='GIF', mode='P')
+    assert process_image(gif, 'animation.gif', 2560, 82) == gif
+
+def test_process_images_names_the_invalid_file():
+    """Test that the error of a batch names the first invalid file"""
+    with pytest.raises(InvalidImageError) as exc_info:
+        process_images([
+            (make_image(10, 10), 'first.png'),
+            (b'not an image', 'second.png'),
+        ])
+    assert str(exc_info.value) == 'Invalid image content for second.png.'
@@ -1,14 +1,20 @@
 """ api/tests/unit/test_middleware.py """
-# pylint: disable=attribute-defined-outside-init
+# pylint: disable=attribute-defined-outside-init, no-member
 
 import json
+import time
 from unittest.mock import patch
 import pytest
 import jwt
 from django.http import JsonResponse
 from django.test import RequestFactory
 from django.conf import settings
-from api.middleware.access_token_middleware import AccessTokenMiddleware
+from api.middleware.access_token_middleware import (
+    AccessTokenMiddleware,
+    VerifiedTokenCache,
+    verified_tokens,
+    verify_token
+)
 
 @pytest.mark.django_db
 class TestAccessTokenMiddleware:
@@ -67,3 +73,63 @@ class TestAccessTokenMiddleware:
 
         assert response.status_code == 200
         assert json.loads(response.content) == {'success': True}
+
+    def test_valid_token_attaches_claims(self):
+        """Test that the verified claims are attached to the request"""
+        token = jwt.encode({'user_id': 'abc'}, settings.SECRET_KEY, algorithm='HS256')
+        request = self.factory.post('/some-url/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.middleware(request)
+        assert request.tts_claims == {'user_id': 'abc'}
+
+    def test_verified_token_is_cached(self):
+        """Test that a verified token is decoded only once"""
+        token = jwt.encode({'user_id': 'abc'}, settings.SECRET_KEY, algorithm='HS256')
+
+        with patch('jwt.decode', wraps=jwt.decode) as mock_decode:
+            for _ in range(3):
+                request = self.factory.post('/some-url/', HTTP_AUTHORIZATION=f'Bearer {token}')
+                assert self.middleware(request).status_code == 200
+
+        assert mock_decode.call_count == 1
+
+    def test_get_with_invalid_token(self):
+        """Test that safe requests pass through without claims when the token is invalid"""
+        request = self.factory.get('/some-url/', HTTP_AUTHORIZATION='Bearer invalid-token')
+
+        response = self.middleware(request)
+        assert response.status_code == 200
+        assert request.tts_claims is None
+
+class TestVerifiedTokenCache:
+    """Tests for VerifiedTokenCache"""
+
+    def test_least_recently_used_token_is_evicted(self):
+        """Test that the cache keeps at most max_size tokens"""
+        cache = VerifiedTokenCache(max_size=2)
+        cache.set('a', {'user_id': 'a'})
+        cache.set('b', {'user_id': 'b'})
+        cache.get('a')
+        cache.set('c', {'user_id': 'c'})
+
+        assert cache.get('a') == {'user_id': 'a'}
+        assert cache.get('b') is None
+        assert cache.get('c') == {'user_id': 'c'}
+
+    def test_expired_token_is_dropped(self):
+        """Test that a token is not served from the cache after its exp claim"""
+        cache = VerifiedTokenCache(max_size=2)
+        cache.set('a', {'user_id': 'a', 'exp': time.time() + 60})
+        cache.set('b', {'user_id': 'b', 'exp': time.time() - 1})
+
+        assert cache.get('a') is not None
+        assert cache.get('b') is None
+
+    def test_expired_token_is_rejected_after_caching(self):
+        """Test that a cached token is verified again, and rejected, once it expires"""
+        claims = {'user_id': 'abc', 'exp': int(time.time()) - 1}
+        token = jwt.encode(claims, settings.SECRET_KEY, algorithm='HS256')
+        verified_tokens.set(token, claims)
+
+        with pytest.raises(jwt.ExpiredSignatureError):
+            verify_token(token)
@@ -2,12 +2,14 @@
 
 import pytest
 import pytz
+from django.db.models import Max
 from django.test import RequestFactory
 from django.urls import reverse
 from api.serializers import (
     ProjectSerializer, ProjectListSerializer,
     SurveySerializer, SurveyNestedSerializer,
     RiskNoteSerializer, SignInSerializer)
+from api.models import Project
 
 pytestmark = pytest.mark.django_db
 
@@ -114,6 +116,22 @@ def test_project_list_serializer_last_survey_date_exists(create_project, create_
 
     assert str(serializer.data['last_survey_date']) == expected_date
 
+def test_project_list_serializer_last_survey_date_annotated(
+    create_project_with_surveys, django_assert_num_queries
+):
+    """Test ProjectListSerializer uses the annotated last survey date without querying"""
+    project = Project.objects.annotate(
+        last_survey_created_at=Max('surveys__created_at')
+    ).get(pk=create_project_with_surveys.pk)
+    rf = RequestFactory()
+    request = rf.get('/')
+
+    serializer = ProjectListSerializer(project, context={'request': request})
+    with django_assert_num_queries(0):
+        last_survey_date = serializer.data['last_survey_date']
+
+    assert last_survey_date == project.last_survey_created_at
+
 def test_survey_serializer(create_survey):
     """Test SurveySerializer for serialization"""
     survey = create_survey
@@ -0,0 +1,66 @@
+""" api/tests/unit/test_storage.py """
+
+import threading
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+import pytest
+from django.urls import reverse
+
+from api.storage import get_container_client, reset_container_client
+
+FACTORY = 'api.tests.unit.test_storage.create_local_container_client'
+
+# Number of container clients built by the local factory
+created_clients = []
+
+def create_local_container_client():
+    """Local stand-in for the Azure container client factory"""
+    container_client = MagicMock()
+    blob_client = container_client.get_blob_client.return_value
+    blob_client.download_blob.return_value.chunks.side_effect = lambda: iter([b'binary_image_data'])
+    blob_client.download_blob.return_value.size = 17
+    blob_client.download_blob.return_value.properties.etag = '"0x8DD5AF1E2B3C4D5"'
+    blob_client.download_blob.return_value.properties.last_modified = datetime.now(timezone.utc)
+    created_clients.append(container_client)
+    return container_client
+
+@pytest.fixture(autouse=True)
+def local_container_client(settings):
+    """Fixture to swap the shared container client for the local stand-in"""
+    settings.AZURE_BLOB_CONTAINER_CLIENT_FACTORY = FACTORY
+    created_clients.clear()
+    reset_container_client()
+    yield
+    reset_container_client()
+
+def test_container_client_is_created_once():
+    """Test that all threads share one lazily created container client"""
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(get_container_client()))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created_clients) == 1
+    assert all(client is created_clients[0] for client in clients)
+
+def test_reset_container_client():
+    """Test that a reset makes the next call build a new client"""
+    first = get_container_client()
+    reset_container_client()
+    assert get_container_client() is not first
+    assert len(created_clients) == 2
+
+def test_image_views_share_container_client(client):
+    """Test that image requests reuse the container client instead of building new ones"""
+    url = reverse('retrieve_image')
+    for _ in range(3):
+        response = client.get(url, {'blob_name': 'images/test.jpg'})
+        assert response.status_code == 200
+        assert b''.join(response.streaming_content) == b'binary_image_data'
+
+    assert len(created_clients) == 1
@@ -0,0 +1,150 @@
+""" api/tests/unit/test_transcription.py """
+
+import io
+import threading
+from unittest.mock import patch, MagicMock
+import pytest
+from azure.cognitiveservices.speech import ResultReason
+from azure.cognitiveservices.speech.audio import PushAudioInputStream
+from pydub import AudioSegment
+
+from api.transcription import (
+    AzureSpeechRecognizer,
+    TranscriptionError,
+    convert_to_pcm,
+    create_audio_config,
+    recognize_speech,
+    transcription_cache
+)
+
+@patch('pydub.AudioSegment.from_file')
+def test_convert_to_pcm_resamples_in_memory(mock_from_file):
+    """Test that audio is resampled to 16 kHz mono 16-bit PCM"""
+    stereo = AudioSegment.silent(duration=500, frame_rate=44100).set_channels(2)
+    mock_from_file.return_value = stereo
+    audio_file = io.BytesIO(b"fake audio content")
+
+    pcm_data = convert_to_pcm(audio_file)
+
+    mock_from_file.assert_called_once_with(audio_file)
+    # 0.5 seconds * 16000 samples per second * 2 bytes per sample
+    assert len(pcm_data) == 16000
+
+@patch('api.transcription.AudioConfig')
+def test_create_audio_config_uses_push_stream(mock_audio_config):
+    """Test that the recognizer reads audio from a push stream instead of a file"""
+    create_audio_config(b"\x00\x00" * 160)
+    _, kwargs = mock_audio_config.call_args
+    assert isinstance(kwargs['stream'], PushAudioInputStream)
+    assert 'filename' not in kwargs
+
+class BarrierRecognizer:
+    """Recognizer whose recognitions only finish if they run at the same time"""
+
+    def __init__(self):
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def transcribe(self, pcm_data, recognition_language): # pylint: disable=unused-argument
+        """Wait for the translation to start before returning"""
+        self.barrier.wait()
+        return "Transcription"
+
+    def translate(self, pcm_data, recognition_language, target_languages): # pylint: disable=unused-argument
+        """Wait for the transcription to start before returning"""
+        self.barrier.wait()
+        return {language: "Translation" for language in target_languages}
+
+def test_recognize_speech_runs_recognitions_concurrently():
+    """Test that transcription and translation run at the same time"""
+    transcription, translations = recognize_speech(
+        b'', 'fi-FI', ['en'], recognizer=BarrierRecognizer()
+    )
+    assert transcription == "Transcription"
+    assert translations == {'en': "Translation"}
+
+def test_recognize_speech_transcription_error_takes_precedence():
+    """Test that a failed transcription is reported even if the translation also fails"""
+    recognizer = MagicMock()
+    recognizer.transcribe.return_value = "error: No speech could be recognized"
+    recognizer.translate.return_value = "error: No speech could be recognized"
+    with pytest.raises(TranscriptionError) as exc_info:
+        recognize_speech(b'', 'fi-FI', ['en'], recognizer=recognizer)
+    assert exc_info.value.error == "Failed to transcribe the audio"
+
+def test_recognize_speech_single_recognition(settings):
+    """Test that the transcription is taken from the translation recognizer"""
+    settings.TRANSCRIPTION_SINGLE_RECOGNITION = True
+    recognizer = MagicMock()
+    recognizer.transcribe_and_translate.return_value = ("Transcription", {'en': "Translation"})
+
+    result = recognize_speech(b'', 'fi-FI', ['en'], recognizer=recognizer)
+
+    assert result == ("Transcription", {'en': "Translation"})
+    recognizer.transcribe.assert_not_called()
+    recognizer.translate.assert_not_called()
+
+def test_recognize_speech_single_recognition_error(settings):
+    """Test that a failed single recognition is reported as a transcription failure"""
+    settings.TRANSCRIPTION_SINGLE_RECOGNITION = True
+    recognizer = MagicMock()
+    recognizer.transcribe_and_translate.return_value = "error: No speech could be recognized"
+
+    with pytest.raises(TranscriptionError) as exc_info:
+        recognize_speech(b'', 'fi-FI', ['en'], recognizer=recognizer)
+
+    assert exc_info.value.error == "Failed to transcribe the audio"
+    assert exc_info.value.returnvalue == "error: No speech could be recognized"
+
+def test_recognize_speech_single_recognition_without_targets(settings):
+    """Test that single recognition falls back to transcription when nothing is translated"""
+    settings.TRANSCRIPTION_SINGLE_RECOGNITION = True
+    recognizer = MagicMock()
+    recognizer.transcribe.return_value = "Transcription"
+    recognizer.translate.return_value = {}
+
+    assert recognize_speech(b'', 'fi-FI', [], recognizer=recognizer) == (
+        "Transcription", {}
+    )
+    recognizer.transcribe_and_translate.assert_not_called()
+
+@patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
+@patch('api.transcription.AudioConfig')
+def test_azure_transcribe_and_translate(mock_audio_config, mock_recognizer): # pylint: disable=unused-argument
+    """Test that the source text and translations come from one recognition"""
+    mock_result = MagicMock()
+    mock_result.reason = ResultReason.TranslatedSpeech
+    mock_result.text = "Tämä on litterointi."
+    mock_result.translations = {'en': 'This is a translation.'}
+    mock_recognizer.return_value.recognize_once_async.return_value.get.return_value = mock_result
+
+    result = AzureSpeechRecognizer().transcribe_and_translate(b'', 'fi-FI', ['en'])
+
+    assert result == ("Tämä on litterointi.", {'en': 'This is a translation.'})
+    mock_recognizer.assert_called_once()
+
+def test_transcription_cache_key_ignores_target_language_order():
+    """Test that cached results are found regardless of the target language order"""
+    transcription_cache.set('digest', 'fi-FI', ['sv', 'en'], ("Transcription", {}))
+    assert transcription_cache.get('digest', 'fi-FI', ['en', 'sv']) == ("Transcription", {})
+    assert transcription_cache.get('digest', 'en-US', ['en', 'sv']) is None
+    assert transcription_cache.stats() == {'hits': 1, 'misses': 1}
+
+def test_transcription_cache_evicts_least_recently_used(settings):
+    """Test that the cache is bounded and evicts the least recently used entries"""
+    settings.CACHES = {
+        **settings.CACHES,
+        'transcriptions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'transcriptions-eviction-test',
+            'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4},
+        },
+    }
+    transcription_cache.set('first', 'fi-FI', [], ("First", {}))
+    transcription_cache.set('second', 'fi-FI', [], ("Second", {}))
+    transcription_cache.get('first', 'fi-FI', [])
+    transcription_cache.set('third', 'fi-FI', [], ("Third", {}))
+    transcription_cache.set('fourth', 'fi-FI', [], ("Fourth", {}))
+
+    second_key = transcription_cache.make_key('second', 'fi-FI', [])
+    assert transcription_cache.cache.get(second_key) is None
+    assert transcription_cache.get('first', 'fi-FI', []) == ("First", {})
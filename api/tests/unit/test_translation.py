@@ -0,0 +1,24 @@
+""" api/tests/unit/test_translation.py """
+
+from api.translation import chunk_texts, hash_text
+
+def test_chunk_texts_respects_text_limit():
+    """Test that a chunk never holds more texts than the request limit"""
+    chunks = list(chunk_texts(['text'] * 250, 1, 100, 50000))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert [position for chunk in chunks for position in chunk] == list(range(250))
+
+def test_chunk_texts_respects_character_limit():
+    """Test that characters are counted once per target language"""
+    chunks = list(chunk_texts(['a' * 10, 'b' * 10, 'c' * 10], 2, 100, 45))
+    assert chunks == [[0, 1], [2]]
+
+def test_chunk_texts_keeps_oversized_text_alone():
+    """Test that a text over the character limit gets a chunk of its own"""
+    chunks = list(chunk_texts(['short', 'x' * 100, 'short'], 1, 100, 50))
+    assert chunks == [[0], [1], [2]]
+
+def test_hash_text_normalizes_whitespace_and_unicode():
+    """Test that trivially different texts share a translation memory entry"""
+    assert hash_text('Hyvää  päivää\n') == hash_text('Hyvää päivää')
+    assert hash_text('Hyvää päivää') != hash_text('Hyvää yötä')
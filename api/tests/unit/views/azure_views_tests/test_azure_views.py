@@ -2,24 +2,42 @@
 # pylint: disable=attribute-defined-outside-init
 
 import io
+import threading
+from datetime import datetime, timezone as dt_timezone
 from unittest.mock import patch, MagicMock
 import pytest
+from azure.core import MatchConditions
 from azure.core.exceptions import (
     AzureError,
     HttpResponseError,
-    ResourceNotFoundError
+    ResourceNotFoundError,
+    ResourceNotModifiedError
 )
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 from requests.exceptions import RequestException
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from api.models import TranslationMemoryEntry
 from api.views import RetrieveImage
 
 pytestmark = pytest.mark.django_db
 
+ETAG = '"0x8DD5AF1E2B3C4D5"'
+LAST_MODIFIED = datetime(2025, 3, 4, 10, 30, tzinfo=dt_timezone.utc)
+
+def make_image_file(name, size=(64, 48), image_format='JPEG'):
+    """Helper function to create an uploadable image file"""
+    file = io.BytesIO()
+    Image.new('RGB', size).save(file, format=image_format)
+    file.seek(0)
+    file.name = name
+    return file
+
 class TestUploadImagesView(TestCase):
     """Tests UploadImage view"""
 
@@ -34,13 +52,10 @@ class TestUploadImagesView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data['message'], 'No image files provided.')
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_invalid_image_type(self, mock_blob_service_client):
+    @patch('api.views.azure_views.get_container_client')
+    def test_invalid_image_type(self, mock_get_container_client):
         """Test case where an invalid file type is provided."""
-        mock_blob_service = MagicMock()
-        mock_container_client = MagicMock()
-        mock_blob_service_client.return_value = mock_blob_service
-        mock_blob_service.get_container_client.return_value = mock_container_client
+        mock_get_container_client.return_value = MagicMock()
 
         file = io.BytesIO(b"fake image data")
         file.name = 'test.txt'
@@ -52,19 +67,16 @@ class TestUploadImagesView(TestCase):
             f'Invalid file type for {file.name}. Only images are allowed.'
         )
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_successful_image_upload(self, mock_blob_service_client):
+    @patch('api.views.azure_views.get_container_client')
+    def test_successful_image_upload(self, mock_get_container_client):
         """Test successful image upload."""
-        mock_blob_service = MagicMock()
         mock_container_client = MagicMock()
         mock_blob_client = MagicMock()
 
-        mock_blob_service_client.return_value = mock_blob_service
-        mock_blob_service.get_container_client.return_value = mock_container_client
+        mock_get_container_client.return_value = mock_container_client
         mock_container_client.get_blob_client.return_value = mock_blob_client
 
-        file = io.BytesIO(b"fake image data")
-        file.name = 'test.jpg'
+        file = make_image_file('test.jpg')
 
         response = self.client.post(self.url, {'image': file}, format='multipart')
 
@@ -72,21 +84,17 @@ class TestUploadImagesView(TestCase):
         self.assertIn('urls', response.data)
         mock_blob_client.upload_blob.assert_called_once()
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_successful_multiple_image_upload(self, mock_blob_service_client):
+    @patch('api.views.azure_views.get_container_client')
+    def test_successful_multiple_image_upload(self, mock_get_container_client):
         """Test successful multiple image upload."""
-        mock_blob_service = MagicMock()
         mock_container_client = MagicMock()
         mock_blob_client = MagicMock()
 
-        mock_blob_service_client.return_value = mock_blob_service
-        mock_blob_service.get_container_client.return_value = mock_container_client
+        mock_get_container_client.return_value = mock_container_client
         mock_container_client.get_blob_client.return_value = mock_blob_client
 
-        file1 = io.BytesIO(b"fake image data 1")
-        file1.name = 'test1.jpg'
-        file2 = io.BytesIO(b"fake image data 2")
-        file2.name = 'test2.jpg'
+        file1 = make_image_file('test1.jpg')
+        file2 = make_image_file('test2.jpg')
 
         response = self.client.post(
             self.url,
@@ -100,56 +108,133 @@ class TestUploadImagesView(TestCase):
         self.assertEqual(len(response.data['urls']), 2)
         self.assertEqual(mock_blob_client.upload_blob.call_count, 2)
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_http_error_during_upload(self, mock_blob_service_client):
-        """Test HTTP error during image upload to Azure Blob Storage."""
-        mock_blob_service = MagicMock()
-        mock_blob_service.get_container_client.side_effect = HttpResponseError("HTTP error")
-        mock_blob_service_client.return_value = mock_blob_service
+    @patch('api.views.azure_views.get_container_client')
+    def test_invalid_file_prevents_all_uploads(self, mock_get_container_client):
+        """Test case where one invalid file stops the upload before any file is sent."""
+        mock_container_client = MagicMock()
+        mock_get_container_client.return_value = mock_container_client
+
+        file1 = make_image_file('test1.jpg')
+        file2 = io.BytesIO(b"fake text data")
+        file2.name = 'test2.txt'
 
+        response = self.client.post(
+            self.url,
+            {'image1': file1, 'image2': file2},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_container_client.get_blob_client.assert_not_called()
+
+    @patch('api.views.azure_views.get_container_client')
+    def test_invalid_image_content(self, mock_get_container_client):
+        """Test case where a file has an image extension but other content."""
         file = io.BytesIO(b"fake image data")
         file.name = 'test.jpg'
 
         response = self.client.post(self.url, {'image': file}, format='multipart')
 
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Invalid image content for test.jpg.')
+        mock_get_container_client.assert_not_called()
+
+    @patch('api.views.azure_views.get_container_client')
+    def test_images_upload_in_parallel(self, mock_get_container_client):
+        """Test that the images are uploaded at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        mock_blob_client = MagicMock()
+        mock_blob_client.upload_blob.side_effect = lambda *args, **kwargs: barrier.wait()
+        mock_get_container_client.return_value.get_blob_client.return_value = mock_blob_client
+
+        file1 = make_image_file('test1.jpg')
+        file2 = make_image_file('test2.jpg')
+
+        response = self.client.post(
+            self.url,
+            {'image1': file1, 'image2': file2},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [result['file'] for result in response.data['results']],
+            ['test1.jpg', 'test2.jpg']
+        )
+        args, kwargs = mock_blob_client.upload_blob.call_args
+        self.assertEqual(kwargs['length'], len(args[0]))
+        self.assertEqual(kwargs['content_settings'].content_type, 'image/jpeg')
+        self.assertEqual(kwargs['max_concurrency'], settings.AZURE_BLOB_UPLOAD_MAX_CONCURRENCY)
+
+    @patch('api.views.azure_views.get_container_client')
+    def test_partial_upload_failure(self, mock_get_container_client):
+        """Test that a failed upload is reported per file next to the successful ones."""
+        successful_blob_client = MagicMock()
+        failing_blob_client = MagicMock()
+        failing_blob_client.upload_blob.side_effect = AzureError("Azure error")
+        mock_get_container_client.return_value.get_blob_client.side_effect = lambda name: (
+            failing_blob_client if name.endswith('test2.jpg') else successful_blob_client
+        )
+
+        file1 = make_image_file('test1.jpg')
+        file2 = make_image_file('test2.jpg')
+
+        response = self.client.post(
+            self.url,
+            {'image1': file1, 'image2': file2},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data['message'], 'Azure Blob Storage error: Azure error')
+        self.assertEqual(len(response.data['urls']), 1)
+        self.assertEqual(
+            [(result['file'], result['status']) for result in response.data['results']],
+            [('test1.jpg', 'success'), ('test2.jpg', 'error')]
+        )
+
+    @patch('api.views.azure_views.get_container_client')
+    def test_http_error_during_upload(self, mock_get_container_client):
+        """Test HTTP error during image upload to Azure Blob Storage."""
+        mock_get_container_client.side_effect = HttpResponseError("HTTP error")
+
+        file = make_image_file('test.jpg')
+
+        response = self.client.post(self.url, {'image': file}, format='multipart')
+
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
         self.assertEqual(
             response.data['message'],
             'HTTP error during Azure Blob Storage operation: HTTP error'
         )
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_azure_error_during_upload(self, mock_blob_service_client):
+    @patch('api.views.azure_views.get_container_client')
+    def test_azure_error_during_upload(self, mock_get_container_client):
         """Test Azure SDK error during image upload."""
-        mock_blob_service = MagicMock()
-        mock_blob_service.get_container_client.side_effect = AzureError("Azure error")
-        mock_blob_service_client.return_value = mock_blob_service
+        mock_get_container_client.side_effect = AzureError("Azure error")
 
-        file = io.BytesIO(b"fake image data")
-        file.name = 'test.jpg'
+        file = make_image_file('test.jpg')
 
         response = self.client.post(self.url, {'image': file}, format='multipart')
 
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
         self.assertEqual(response.data['message'], 'Azure Blob Storage error: Azure error')
 
-class TestRetrieveImageView(APITestCase):
+class TestRetrieveImageView(APITestCase): # pylint: disable=too-many-public-methods
     """Tests RetrieveImage view"""
 
     def setUp(self):
         """Setup method"""
         self.url = reverse('retrieve_image')
-        self.blob_name = 'test_image.jpg'
+        self.blob_name = 'images/test_image.jpg'
 
-        self.blob_service_patcher = patch('api.views.azure_views.BlobServiceClient')
-        self.mock_blob_service = self.blob_service_patcher.start()
+        self.container_client_patcher = patch('api.views.azure_views.get_container_client')
+        self.mock_get_container_client = self.container_client_patcher.start()
 
         self.mock_container_client = MagicMock()
-        self.mock_blob_service.return_value.get_container_client.return_value = (
-            self.mock_container_client
-        )
+        self.mock_get_container_client.return_value = self.mock_container_client
 
-        self.addCleanup(self.blob_service_patcher.stop)
+        self.addCleanup(self.container_client_patcher.stop)
 
     def test_missing_blob_name(self):
         """Test case where no blob name is provided"""
@@ -163,7 +248,7 @@ class TestRetrieveImageView(APITestCase):
 
     def test_container_not_found(self):
         """Test container not found"""
-        self.mock_blob_service.side_effect = ResourceNotFoundError("Container not found")
+        self.mock_get_container_client.side_effect = ResourceNotFoundError("Container not found")
 
         response = self.client.get(self.url, {'blob_name': self.blob_name})
 
@@ -173,9 +258,9 @@ class TestRetrieveImageView(APITestCase):
             'message': 'Container not found.'
         })
 
-    def test_http_response_error_during_blob_service_client_creation(self):
-        """Test case for handling HTTP response error during BlobServiceClient creation"""
-        self.mock_blob_service.side_effect = HttpResponseError("HTTP error")
+    def test_http_response_error_during_container_client_creation(self):
+        """Test case for handling HTTP response error during container client creation"""
+        self.mock_get_container_client.side_effect = HttpResponseError("HTTP error")
 
         response = self.client.get(self.url, {'blob_name': self.blob_name})
 
@@ -197,12 +282,8 @@ class TestRetrieveImageView(APITestCase):
             'message': 'HTTP error: HTTP error'
         })
 
-    @patch('api.views.azure_views.BlobServiceClient.get_container_client')
-    def test_blob_not_found(self, mock_get_container_client):
+    def test_blob_not_found(self):
         """Test blob not found"""
-        workaround = mock_get_container_client
-        lint = workaround
-        mock_get_container_client = lint
         mock_blob_client = MagicMock()
         mock_blob_client.download_blob.side_effect = ResourceNotFoundError("Blob not found")
         self.mock_container_client.get_blob_client.return_value = mock_blob_client
@@ -215,28 +296,247 @@ class TestRetrieveImageView(APITestCase):
             'message': 'Image not found.'
         })
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_successful_blob_retrieval(self, mock_blob_service_class):
-        """Test case where blob retrieval succeeds"""
-        mock_container_client = MagicMock()
+    def mock_download(self, content, offset=0, blob_size=None):
+        """Helper method to mock a started download of part of a blob"""
+        blob_size = len(content) if blob_size is None else blob_size
         mock_blob_client = MagicMock()
-
-        mock_blob_client.download_blob.return_value.readall.return_value = b'binary_image_data'
-        mock_container_client.get_blob_client.return_value = mock_blob_client
-        mock_blob_service_class.return_value.get_container_client.return_value = (
-            mock_container_client
+        downloader = mock_blob_client.download_blob.return_value
+        downloader.chunks.return_value = iter([content[:8], content[8:]])
+        downloader.size = len(content)
+        downloader.properties.content_range = (
+            f'bytes {offset}-{offset + len(content) - 1}/{blob_size}'
         )
+        downloader.properties.etag = ETAG
+        downloader.properties.last_modified = LAST_MODIFIED
+        mock_blob_client.get_blob_properties.return_value.size = blob_size
+        self.mock_container_client.get_blob_client.return_value = mock_blob_client
+        return mock_blob_client
+
+    def test_successful_blob_retrieval(self):
+        """Test case where blob retrieval succeeds"""
+        mock_blob_client = self.mock_download(b'binary_image_data')
 
         response = self.client.get(self.url, {'blob_name': self.blob_name})
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.content, b'binary_image_data')
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), b'binary_image_data')
         self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], '17')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], ETAG)
+        self.assertEqual(response['Last-Modified'], 'Tue, 04 Mar 2025 10:30:00 GMT')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        mock_blob_client.download_blob.assert_called_once_with(offset=None, length=None)
+        mock_blob_client.download_blob.return_value.readall.assert_not_called()
+
+    def test_if_none_match_not_modified(self):
+        """Test case where the client's cached copy matches the image ETag"""
+        mock_blob_client = self.mock_download(b'binary_image_data')
+        mock_blob_client.download_blob.side_effect = ResourceNotModifiedError("Not modified")
+
+        response = self.client.get(
+            self.url, {'blob_name': self.blob_name}, HTTP_IF_NONE_MATCH=ETAG
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], ETAG)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        mock_blob_client.download_blob.assert_called_once_with(
+            offset=None, length=None, etag=ETAG, match_condition=MatchConditions.IfModified
+        )
+
+    def test_if_modified_since_not_modified(self):
+        """Test case where the image has not changed since the client's copy"""
+        mock_blob_client = self.mock_download(b'binary_image_data')
+        mock_blob_client.download_blob.side_effect = ResourceNotModifiedError("Not modified")
+
+        response = self.client.get(
+            self.url,
+            {'blob_name': self.blob_name},
+            HTTP_IF_MODIFIED_SINCE='Tue, 04 Mar 2025 10:30:00 GMT'
+        )
+
+        self.assertEqual(response.status_code, 304)
+        mock_blob_client.download_blob.assert_called_once_with(
+            offset=None, length=None, if_modified_since=LAST_MODIFIED
+        )
+
+    def test_if_none_match_takes_precedence(self):
+        """Test case where both conditional headers are sent"""
+        mock_blob_client = self.mock_download(b'binary_image_data')
+
+        response = self.client.get(
+            self.url,
+            {'blob_name': self.blob_name},
+            HTTP_IF_NONE_MATCH='"0x8DD5B00000000"',
+            HTTP_IF_MODIFIED_SINCE='Tue, 04 Mar 2025 10:30:00 GMT'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_blob_client.download_blob.assert_called_once_with(
+            offset=None,
+            length=None,
+            etag='"0x8DD5B00000000"',
+            match_condition=MatchConditions.IfModified
+        )
+
+    def test_range_retrieval(self):
+        """Test case where a byte range of the image is requested"""
+        mock_blob_client = self.mock_download(b'image_data', offset=7, blob_size=100)
+
+        response = self.client.get(
+            self.url, {'blob_name': self.blob_name}, HTTP_RANGE='bytes=7-16'
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'image_data')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Content-Range'], 'bytes 7-16/100')
+        mock_blob_client.download_blob.assert_called_once_with(offset=7, length=10)
+
+    def test_open_ended_range_retrieval(self):
+        """Test case where the rest of the image is requested to resume a download"""
+        mock_blob_client = self.mock_download(b'image_data', offset=90, blob_size=100)
+
+        response = self.client.get(
+            self.url, {'blob_name': self.blob_name}, HTTP_RANGE='bytes=90-'
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+        mock_blob_client.download_blob.assert_called_once_with(offset=90, length=None)
 
-    @patch('api.views.azure_views.BlobServiceClient')
-    def test_azure_service_error(self, mock_blob_service_class):
+    def test_suffix_range_retrieval(self):
+        """Test case where the last bytes of the image are requested"""
+        mock_blob_client = self.mock_download(b'image_data', offset=90, blob_size=100)
+
+        response = self.client.get(
+            self.url, {'blob_name': self.blob_name}, HTTP_RANGE='bytes=-10'
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+        mock_blob_client.download_blob.assert_called_once_with(offset=90, length=None)
+
+    def test_invalid_range_is_ignored(self):
+        """Test case where a malformed or multi-part range falls back to the whole image"""
+        for header in ['bytes=5-2', 'bytes=0-1,5-6', 'items=0-1', 'bytes=-']:
+            mock_blob_client = self.mock_download(b'binary_image_data')
+
+            response = self.client.get(self.url, {'blob_name': self.blob_name}, HTTP_RANGE=header)
+
+            self.assertEqual(response.status_code, 200)
+            mock_blob_client.download_blob.assert_called_once_with(offset=None, length=None)
+
+    def test_range_not_satisfiable(self):
+        """Test case where the requested range starts past the end of the image"""
+        mock_blob_client = self.mock_download(b'', blob_size=100)
+        error = HttpResponseError("The range specified is invalid")
+        error.status_code = 416
+        mock_blob_client.download_blob.side_effect = error
+
+        response = self.client.get(
+            self.url, {'blob_name': self.blob_name}, HTTP_RANGE='bytes=200-'
+        )
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_variant_retrieval(self):
+        """Test case where an already rendered variant is streamed from its own blob"""
+        self.mock_download(b'thumbnail_data')
+
+        response = self.client.get(
+            self.url, {'blob_name': self.blob_name, 'width': '320', 'image_format': 'webp'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'thumbnail_data')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.mock_container_client.get_blob_client.assert_called_once_with(
+            'variants/images/test_image.jpg/w320.webp'
+        )
+
+    def test_variant_rendered_on_first_request(self):
+        """Test case where a missing variant is rendered from the original and stored"""
+        original = io.BytesIO()
+        Image.new('RGB', (1280, 960)).save(original, format='JPEG')
+        original_blob_client = MagicMock()
+        original_blob_client.download_blob.return_value.readall.return_value = (
+            original.getvalue()
+        )
+        variant_blob_client = self.mock_download(b'thumbnail_data')
+        variant_blob_client.download_blob.side_effect = [
+            ResourceNotFoundError("Blob not found"),
+            variant_blob_client.download_blob.return_value
+        ]
+        self.mock_container_client.get_blob_client.side_effect = lambda name: (
+            original_blob_client if name == self.blob_name else variant_blob_client
+        )
+
+        response = self.client.get(self.url, {'blob_name': self.blob_name, 'width': '160'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        variant_blob_client.upload_blob.assert_called_once()
+        args, kwargs = variant_blob_client.upload_blob.call_args
+        with Image.open(io.BytesIO(args[0])) as image:
+            self.assertEqual(image.size, (160, 120))
+        self.assertEqual(kwargs['content_settings'].content_type, 'image/jpeg')
+
+    def test_variant_of_corrupt_image(self):
+        """Test case where the original image is truncated and no variant can be rendered"""
+        original = io.BytesIO()
+        Image.new('RGB', (1280, 960)).save(original, format='JPEG')
+        original_blob_client = MagicMock()
+        original_blob_client.download_blob.return_value.readall.return_value = (
+            original.getvalue()[:300]
+        )
+        variant_blob_client = MagicMock()
+        variant_blob_client.download_blob.side_effect = ResourceNotFoundError("Blob not found")
+        self.mock_container_client.get_blob_client.side_effect = lambda name: (
+            original_blob_client if name == self.blob_name else variant_blob_client
+        )
+
+        response = self.client.get(self.url, {'blob_name': self.blob_name, 'width': '160'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Image could not be processed.')
+        variant_blob_client.upload_blob.assert_not_called()
+
+    def test_variant_of_variant(self):
+        """Test case where a variant of a variant or of a blob outside images/ is refused"""
+        for blob_name in ('variants/images/test_image.jpg/w160.jpeg', 'other/photo.jpg'):
+            response = self.client.get(self.url, {'blob_name': blob_name, 'width': '160'})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(
+                response.json()['message'],
+                'Variants can only be requested for uploaded images.'
+            )
+        self.mock_container_client.get_blob_client.assert_not_called()
+
+    def test_invalid_variant_parameters(self):
+        """Test case where an unsupported width or format is requested"""
+        response = self.client.get(self.url, {'blob_name': self.blob_name, 'width': '333'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['message'],
+            'Invalid width. Allowed widths are 160, 320, 640, 1280.'
+        )
+
+        response = self.client.get(self.url, {'blob_name': self.blob_name, 'image_format': 'tiff'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['message'],
+            'Invalid format. Allowed formats are jpeg and webp.'
+        )
+
+    def test_azure_service_error(self):
         """Test case with Azure service error"""
-        mock_blob_service_class.side_effect = AzureError("Generic Azure Error")
+        self.mock_get_container_client.side_effect = AzureError("Generic Azure Error")
 
         response = self.client.get(self.url, {'blob_name': self.blob_name})
 
@@ -268,6 +568,7 @@ class TestRetrieveImageView(APITestCase):
         self.assertEqual(view.get_content_type('image.jpeg'), 'image/jpeg')
         self.assertEqual(view.get_content_type('image.png'), 'image/png')
         self.assertEqual(view.get_content_type('image.gif'), 'image/gif')
+        self.assertEqual(view.get_content_type('image.webp'), 'image/webp')
         self.assertEqual(view.get_content_type('image.txt'), 'application/octet-stream')
 
 class TestRetrieveParamsView:
@@ -315,7 +616,7 @@ class TestTranslateTextView:
             'to': ['fr', 'es']
         }
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_translate_text_success(self, mock_post):
         """Test TranslateText view with valid payload"""
         mock_response = {
@@ -352,7 +653,14 @@ class TestTranslateTextView:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json() == {'error': 'Invalid or missing "text" parameter'}
 
-    @patch('requests.post')
+    def test_translate_text_not_a_string(self):
+        """Test TranslateText view with a 'text' parameter that is not a string"""
+        for text in (42, None, ['Hei']):
+            response = self.client.post(self.url, {'to': ['en'], 'text': text}, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.json() == {'error': 'Invalid or missing "text" parameter'}
+
+    @patch('requests.Session.post')
     def test_translate_text_request_exception(self, mock_post):
         """Test TranslateText view handling request exception"""
         mock_post.side_effect = RequestException("Request error")
@@ -369,3 +677,155 @@ class TestTranslateTextView:
         response = self.client.post(self.url, self.valid_payload, format='json')
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert response.json() == {'error': 'Internal error'}
+
+    @patch('requests.Session.post')
+    def test_translate_text_remembers_translations(self, mock_post):
+        """Test that a repeated translation is served from the translation memory"""
+        mock_post.return_value.json.return_value = [{
+            'translations': [
+                {'to': 'fr', 'text': 'Bonjour, le monde!'},
+                {'to': 'es', 'text': '¡Hola, mundo!'}
+            ]
+        }]
+        self.client.post(self.url, self.valid_payload, format='json')
+
+        payload = {**self.valid_payload, 'text': '  Hello,\n world! ', 'to': ['es', 'fr']}
+        response = self.client.post(self.url, payload, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'es': '¡Hola, mundo!', 'fr': 'Bonjour, le monde!'}
+        mock_post.assert_called_once()
+
+    @patch('requests.Session.post')
+    def test_translate_text_requests_only_missing_languages(self, mock_post):
+        """Test that only the languages missing from the translation memory are requested"""
+        mock_post.return_value.json.return_value = [{
+            'translations': [{'to': 'fr', 'text': 'Bonjour, le monde!'}]
+        }]
+        self.client.post(self.url, {**self.valid_payload, 'to': ['fr']}, format='json')
+
+        mock_post.return_value.json.return_value = [{
+            'translations': [{'to': 'es', 'text': '¡Hola, mundo!'}]
+        }]
+        response = self.client.post(self.url, self.valid_payload, format='json')
+
+        assert response.json() == {'fr': 'Bonjour, le monde!', 'es': '¡Hola, mundo!'}
+        assert mock_post.call_count == 2
+        assert mock_post.call_args.kwargs['params']['to'] == ['es']
+
+    @patch('requests.Session.post')
+    @override_settings(TRANSLATION_MEMORY_PERSISTENT=True)
+    def test_translate_text_persistent_memory(self, mock_post):
+        """Test that persisted translations are reused after the cache is cleared"""
+        mock_post.return_value.json.return_value = [{
+            'translations': [
+                {'to': 'fr', 'text': 'Bonjour, le monde!'},
+                {'to': 'es', 'text': '¡Hola, mundo!'}
+            ]
+        }]
+        self.client.post(self.url, self.valid_payload, format='json')
+        caches[settings.TRANSLATION_MEMORY_CACHE_ALIAS].clear()
+
+        response = self.client.post(self.url, self.valid_payload, format='json')
+
+        assert response.json() == {'fr': 'Bonjour, le monde!', 'es': '¡Hola, mundo!'}
+        mock_post.assert_called_once()
+        assert TranslationMemoryEntry.objects.count() == 2
+
+def fake_translator(url, params, headers, json): # pylint: disable=unused-argument, redefined-outer-name
+    """Stand-in for Azure Translator that translates every text to every target language"""
+    response = MagicMock()
+    response.json.return_value = [
+        {
+            'translations': [
+                {'to': language, 'text': f"{item['text']} ({language})"}
+                for language in params['to']
+            ]
+        }
+        for item in json
+    ]
+    return response
+
+@pytest.mark.django_db
+class TestTranslateTextBatchView:
+    """Tests TranslateTextBatch view"""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, client):
+        """Setup method to initialize the API client"""
+        self.client = client
+        self.url = reverse('translate-text-batch')
+
+    @patch('requests.Session.post', side_effect=fake_translator)
+    def test_translate_batch_success(self, mock_post):
+        """Test that the translations are returned keyed by input index"""
+        payload = {'from': 'fi', 'to': ['en', 'sv'], 'texts': ['Yksi', 'Kaksi']}
+        response = self.client.post(self.url, payload, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'translations': {
+                '0': {'en': 'Yksi (en)', 'sv': 'Yksi (sv)'},
+                '1': {'en': 'Kaksi (en)', 'sv': 'Kaksi (sv)'}
+            }
+        }
+        mock_post.assert_called_once()
+
+    @override_settings(TRANSLATOR_MAX_TEXTS_PER_REQUEST=100)
+    @patch('requests.Session.post', side_effect=fake_translator)
+    def test_translate_batch_chunks_requests(self, mock_post):
+        """Test that a large batch is split into requests within the Translator limits"""
+        texts = [f'Riski {index}' for index in range(250)]
+        response = self.client.post(
+            self.url, {'from': 'fi', 'to': ['en'], 'texts': texts}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        translations = response.json()['translations']
+        assert len(translations) == 250
+        assert translations['249'] == {'en': 'Riski 249 (en)'}
+        sizes = sorted(len(call.kwargs['json']) for call in mock_post.call_args_list)
+        assert sizes == [50, 100, 100]
+
+    @patch('requests.Session.post', side_effect=fake_translator)
+    def test_translate_batch_uses_translation_memory(self, mock_post):
+        """Test that only the texts and languages missing from memory are requested"""
+        self.client.post(self.url, {'from': 'fi', 'to': ['en'], 'texts': ['Yksi']}, format='json')
+
+        payload = {'from': 'fi', 'to': ['en', 'sv'], 'texts': ['Yksi', 'Kaksi']}
+        response = self.client.post(self.url, payload, format='json')
+
+        assert response.json()['translations']['0'] == {'en': 'Yksi (en)', 'sv': 'Yksi (sv)'}
+        requested = sorted(
+            (
+                tuple(call.kwargs['params']['to']),
+                tuple(item['text'] for item in call.kwargs['json'])
+            )
+            for call in mock_post.call_args_list[1:]
+        )
+        assert requested == [(('en', 'sv'), ('Kaksi',)), (('sv',), ('Yksi',))]
+
+    def test_translate_batch_invalid_texts(self):
+        """Test TranslateTextBatch view with invalid 'texts' parameter"""
+        for texts in [None, [], 'Yksi', ['Yksi', '']]:
+            payload = {'from': 'fi', 'to': ['en'], 'texts': texts}
+            response = self.client.post(self.url, payload, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.json() == {'error': 'Invalid or missing "texts" parameter'}
+
+    @override_settings(TRANSLATOR_MAX_CHARACTERS_PER_REQUEST=10)
+    def test_translate_batch_text_too_long(self):
+        """Test that a text exceeding the Translator character limit is rejected"""
+        payload = {'from': 'fi', 'to': ['en', 'sv'], 'texts': ['Lyhyt', 'Liian pitkä']}
+        response = self.client.post(self.url, payload, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'error': 'Text at index 1 is too long to translate'}
+
+    @patch('requests.Session.post')
+    def test_translate_batch_request_exception(self, mock_post):
+        """Test TranslateTextBatch view handling request exception"""
+        mock_post.side_effect = RequestException("Request error")
+        payload = {'from': 'fi', 'to': ['en'], 'texts': ['Yksi']}
+        response = self.client.post(self.url, payload, format='json')
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert response.json() == {'error': 'Request error occurred: Request error'}
@@ -0,0 +1,292 @@
+""" api/tests/unit/views/azure_views_tests/test_image_uploads.py """
+# pylint: disable=attribute-defined-outside-init
+
+import base64
+import io
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from urllib.parse import parse_qs, unquote, urlsplit
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobSasPermissions, generate_blob_sas
+from PIL import Image
+from django.urls import reverse
+from rest_framework import status
+
+from api.models import ImageUpload
+from api.storage import generate_upload_url
+
+pytestmark = pytest.mark.django_db
+
+ACCOUNT_KEY = base64.b64encode(b'local test account key').decode()
+
+@pytest.fixture(autouse=True)
+def storage_settings(settings):
+    """Fixture to configure a storage account that exists only for signing"""
+    settings.AZURE_STORAGE_ACCOUNT_NAME = 'testaccount'
+    settings.AZURE_STORAGE_ACCOUNT_KEY = ACCOUNT_KEY
+    settings.AZURE_CONTAINER_NAME = 'images-container'
+
+def test_upload_url_is_signed_for_one_blob():
+    """Test that the SAS token only allows creating the given blob until it expires"""
+    expires_at = datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    url = generate_upload_url('images/abc_photo.jpg', expires_at)
+
+    parts = urlsplit(url)
+    query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+    assert parts.scheme == 'https'
+    assert parts.netloc == 'testaccount.blob.core.windows.net'
+    assert parts.path == '/images-container/images/abc_photo.jpg'
+    assert query['sp'] == 'c'
+    assert query['sr'] == 'b'
+    assert query['spr'] == 'https'
+    assert query['se'] == '2030-01-01T12:00:00Z'
+
+    # The signature is an HMAC of the token fields with the account key
+    expected = generate_blob_sas(
+        account_name='testaccount',
+        container_name='images-container',
+        blob_name='images/abc_photo.jpg',
+        account_key=ACCOUNT_KEY,
+        permission=BlobSasPermissions(create=True),
+        expiry=expires_at,
+        protocol='https'
+    )
+    assert query['sig'] == parse_qs(expected)['sig'][0]
+    other_blob = generate_blob_sas(
+        account_name='testaccount',
+        container_name='images-container',
+        blob_name='images/other_photo.jpg',
+        account_key=ACCOUNT_KEY,
+        permission=BlobSasPermissions(create=True),
+        expiry=expires_at,
+        protocol='https'
+    )
+    assert query['sig'] != parse_qs(other_blob)['sig'][0]
+
+class TestImageUploadUrlsView:
+    """Tests ImageUploadUrls view"""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, client):
+        """Setup method"""
+        self.client = client
+        self.url = reverse('image-upload-urls')
+
+    def test_issue_upload_urls(self):
+        """Test that every file gets its own blob name and upload URL"""
+        response = self.client.post(
+            self.url, {'files': ['photo1.jpg', 'photo2.png']}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        uploads = response.data['uploads']
+        assert [upload['file'] for upload in uploads] == ['photo1.jpg', 'photo2.png']
+        for upload in uploads:
+            assert upload['blob_name'].startswith('images/')
+            assert upload['blob_name'].endswith(f"_{upload['file']}")
+            assert upload['upload_url'].startswith(upload['url'] + '?')
+            assert upload['expires_at'] <= datetime.now(timezone.utc) + timedelta(minutes=15)
+        assert ImageUpload.objects.filter(status=ImageUpload.STATUS_PENDING).count() == 2
+
+    def test_file_name_cannot_choose_path(self):
+        """Test that directories in the file name are dropped from the blob name"""
+        response = self.client.post(self.url, {'files': ['../../photo.jpg']}, format='json')
+        blob_name = response.data['uploads'][0]['blob_name']
+        assert blob_name.startswith('images/')
+        assert blob_name.count('/') == 1
+
+    def test_special_characters_in_file_name(self):
+        """Test that spaces and '#' in a file name are encoded in the URLs"""
+        response = self.client.post(self.url, {'files': ['site photo #1.jpg']}, format='json')
+
+        upload = response.data['uploads'][0]
+        assert upload['blob_name'].endswith('_site photo #1.jpg')
+        parts = urlsplit(upload['upload_url'])
+        assert parts.fragment == ''
+        assert unquote(parts.path) == f"/images-container/{upload['blob_name']}"
+        assert ' ' not in parts.path
+        assert 'sig' in parse_qs(parts.query)
+        assert upload['url'] == upload['upload_url'].split('?')[0]
+
+    def test_long_file_name(self):
+        """Test that file names are shortened in blob names and rejected beyond the limit"""
+        response = self.client.post(self.url, {'files': [f"{'a' * 200}.jpg"]}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['uploads'][0]['blob_name'].endswith(f"_{'a' * 100}.jpg")
+
+        response = self.client.post(self.url, {'files': [f"{'a' * 300}.jpg"]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['message'] == 'File names can be at most 255 characters long.'
+        assert ImageUpload.objects.count() == 1
+
+    def test_invalid_file_type(self):
+        """Test that no upload URLs are issued if one file is not an image"""
+        response = self.client.post(
+            self.url, {'files': ['photo1.jpg', 'notes.txt']}, format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['message'] == (
+            'Invalid file type for notes.txt. Only images are allowed.'
+        )
+        assert not ImageUpload.objects.exists()
+
+    def test_missing_files(self):
+        """Test that the file names are required"""
+        response = self.client.post(self.url, {}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['message'] == 'Invalid or missing "files" parameter.'
+
+@patch('api.views.azure_views.get_container_client')
+class TestImageUploadConfirmView:
+    """Tests ImageUploadConfirm view"""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, client):
+        """Setup method"""
+        self.client = client
+        self.url = reverse('image-upload-confirm')
+        self.upload = ImageUpload.objects.create(
+            file_name='photo.jpg',
+            blob_name='images/abc_photo.jpg',
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=15)
+        )
+
+    def get_blob_client(self, mock_get_container_client, last_modified=None, size=1024):
+        """Helper method to mock the client of an uploaded blob with its properties"""
+        blob_client = mock_get_container_client.return_value.get_blob_client.return_value
+        properties = blob_client.get_blob_properties.return_value
+        properties.last_modified = last_modified or datetime.now(timezone.utc)
+        properties.size = size
+        properties.etag = '"0x8D"'
+        return blob_client
+
+    def test_confirm_upload(self, mock_get_container_client):
+        """Test that a finished upload is stripped of EXIF data and recorded with its size"""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        photo = io.BytesIO()
+        Image.new('RGB', (64, 48), 'red').save(photo, format='JPEG', exif=exif)
+        blob_client = self.get_blob_client(mock_get_container_client)
+        blob_client.download_blob.return_value.readall.return_value = photo.getvalue()
+
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['urls'] == [
+            'https://testaccount.blob.core.windows.net/images-container/images/abc_photo.jpg'
+        ]
+        stored_image = blob_client.upload_blob.call_args.args[0]
+        # The blob is only replaced if it is still the one that was validated
+        assert blob_client.upload_blob.call_args.kwargs['etag'] == '"0x8D"'
+        with Image.open(io.BytesIO(stored_image)) as image:
+            assert not image.getexif()
+        self.upload.refresh_from_db()
+        assert self.upload.status == ImageUpload.STATUS_COMPLETED
+        assert self.upload.size == len(stored_image)
+        assert self.upload.completed_at is not None
+
+        # Confirming again does not process the image again
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        blob_client.download_blob.assert_called_once()
+
+    def test_confirm_missing_blob(self, mock_get_container_client):
+        """Test that an upload whose blob does not exist is not recorded"""
+        blob_client = self.get_blob_client(mock_get_container_client)
+        blob_client.get_blob_properties.side_effect = ResourceNotFoundError("Blob not found")
+
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['status'] == 'error'
+        self.upload.refresh_from_db()
+        assert self.upload.status == ImageUpload.STATUS_PENDING
+
+    def test_confirm_invalid_content(self, mock_get_container_client):
+        """Test that a blob that is not an image of the expected format is deleted"""
+        blob_client = self.get_blob_client(mock_get_container_client)
+        blob_client.download_blob.return_value.readall.return_value = b'<html></html>'
+
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['message'] == (
+            'Invalid image content for photo.jpg.'
+        )
+        blob_client.delete_blob.assert_called_once()
+        blob_client.upload_blob.assert_not_called()
+        self.upload.refresh_from_db()
+        assert self.upload.status == ImageUpload.STATUS_PENDING
+
+    def test_confirm_expired_upload(self, mock_get_container_client):
+        """Test that a blob written after the upload URL expired is rejected and deleted"""
+        blob_client = self.get_blob_client(
+            mock_get_container_client,
+            last_modified=self.upload.expires_at + timedelta(seconds=1)
+        )
+
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['message'] == 'Upload URL has expired.'
+        blob_client.delete_blob.assert_called_once()
+        blob_client.download_blob.assert_not_called()
+
+    def test_confirm_after_expiry(self, mock_get_container_client):
+        """Test that an upload finished before its URL expired can be confirmed later"""
+        ImageUpload.objects.filter(pk=self.upload.pk).update(
+            expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)
+        )
+        photo = io.BytesIO()
+        Image.new('RGB', (64, 48), 'red').save(photo, format='JPEG')
+        blob_client = self.get_blob_client(
+            mock_get_container_client,
+            last_modified=datetime.now(timezone.utc) - timedelta(minutes=5)
+        )
+        blob_client.download_blob.return_value.readall.return_value = photo.getvalue()
+
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        blob_client.delete_blob.assert_not_called()
+        self.upload.refresh_from_db()
+        assert self.upload.status == ImageUpload.STATUS_COMPLETED
+
+    def test_confirm_oversized_upload(self, mock_get_container_client, settings):
+        """Test that a blob larger than the upload limit is deleted without being downloaded"""
+        settings.IMAGE_UPLOAD_MAX_SIZE = 1024
+        blob_client = self.get_blob_client(mock_get_container_client, size=1025)
+
+        response = self.client.post(
+            self.url, {'upload_ids': [str(self.upload.id)]}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['message'] == 'Image is too large.'
+        blob_client.delete_blob.assert_called_once()
+        blob_client.download_blob.assert_not_called()
+
+    def test_confirm_unknown_upload(self, mock_get_container_client):
+        """Test that unknown or malformed upload ids are rejected"""
+        response = self.client.post(
+            self.url,
+            {'upload_ids': [str(self.upload.id), 'not-a-uuid']},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data['message'] == 'Unknown upload ids: not-a-uuid'
+        mock_get_container_client.assert_not_called()
@@ -6,11 +6,15 @@ from unittest.mock import patch, MagicMock
 from azure.cognitiveservices.speech import ResultReason, CancellationReason
 import pytest
 from django.urls import reverse
+from pydub import AudioSegment
 from rest_framework import status
-from api.views import TranscribeAudio
+from api.transcription import AzureSpeechRecognizer
 
 pytestmark = pytest.mark.django_db
 
+SILENCE = AudioSegment.silent(duration=100, frame_rate=16000)
+PCM_DATA = SILENCE.raw_data
+
 class TestTranscribeAudioView:
     """Test cases for TranscribeAudio view"""
 
@@ -20,7 +24,7 @@ class TestTranscribeAudioView:
         self.url = reverse('transcribe_audio')
         self.mock_file = mock_file
         self.recognition_language = 'en-US'
-        self.transcribe_audio_view = TranscribeAudio()
+        self.recognizer = AzureSpeechRecognizer()
 
     def test_no_file_uploaded(self, client):
         """Test when no audio file is uploaded."""
@@ -28,9 +32,9 @@ class TestTranscribeAudioView:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json() == {"error": "Audio file is required"}
 
-    @patch('api.views.azure_views.AudioConfig')
-    @patch('api.views.azure_views.SpeechRecognizer')
-    @patch('api.views.azure_views.SpeechConfig')
+    @patch('api.transcription.AudioConfig')
+    @patch('api.transcription.SpeechRecognizer')
+    @patch('api.transcription.SpeechConfig')
     def test_successful_transcription(
         self, mock_speech_config, mock_speech_recognizer, mock_audio_config
     ):
@@ -42,8 +46,8 @@ class TestTranscribeAudioView:
         mock_result.reason = ResultReason.RecognizedSpeech
         mock_result.text = "This is a transcription."
         mock_recognizer.recognize_once.return_value = mock_result
-        transcription = self.transcribe_audio_view.transcribe_with_azure(
-            'mock_path.wav', self.recognition_language
+        transcription = self.recognizer.transcribe(
+            PCM_DATA, self.recognition_language
         )
         assert transcription == "This is a transcription."
         mock_speech_config.assert_called_once()
@@ -51,9 +55,9 @@ class TestTranscribeAudioView:
         mock_speech_recognizer.assert_called_once()
         mock_recognizer.recognize_once.assert_called_once()
 
-    @patch('api.views.azure_views.AudioConfig')
-    @patch('api.views.azure_views.SpeechRecognizer')
-    @patch('api.views.azure_views.SpeechConfig')
+    @patch('api.transcription.AudioConfig')
+    @patch('api.transcription.SpeechRecognizer')
+    @patch('api.transcription.SpeechConfig')
     def test_transcription_no_speech_recognized(
         self, mock_speech_config, mock_speech_recognizer, mock_audio_config
     ):
@@ -64,17 +68,17 @@ class TestTranscribeAudioView:
         mock_recognizer.recognize_once.return_value = MagicMock(
             reason=ResultReason.NoMatch
         )
-        transcription = self.transcribe_audio_view.transcribe_with_azure(
-            'mock_path.wav', self.recognition_language
+        transcription = self.recognizer.transcribe(
+            PCM_DATA, self.recognition_language
         )
         assert transcription == "error: No speech could be recognized"
         mock_speech_config.assert_called_once()
         mock_audio_config.assert_called_once()
         mock_recognizer.recognize_once.assert_called_once()
 
-    @patch('api.views.azure_views.AudioConfig')
-    @patch('api.views.azure_views.SpeechRecognizer')
-    @patch('api.views.azure_views.SpeechConfig')
+    @patch('api.transcription.AudioConfig')
+    @patch('api.transcription.SpeechRecognizer')
+    @patch('api.transcription.SpeechConfig')
     def test_transcription_recognition_canceled(
         self, mock_speech_config, mock_speech_recognizer, mock_audio_config
     ):
@@ -86,17 +90,17 @@ class TestTranscribeAudioView:
             reason=ResultReason.Canceled,
             cancellation_details=MagicMock(reason='UserCanceled')
         )
-        transcription = self.transcribe_audio_view.transcribe_with_azure(
-            'mock_path.wav', self.recognition_language
+        transcription = self.recognizer.transcribe(
+            PCM_DATA, self.recognition_language
         )
         assert transcription.startswith("error: Recognition canceled:")
         mock_speech_config.assert_called_once()
         mock_audio_config.assert_called_once()
         mock_recognizer.recognize_once.assert_called_once()
 
-    @patch('api.views.azure_views.AudioConfig')
-    @patch('api.views.azure_views.SpeechRecognizer')
-    @patch('api.views.azure_views.SpeechConfig')
+    @patch('api.transcription.AudioConfig')
+    @patch('api.transcription.SpeechRecognizer')
+    @patch('api.transcription.SpeechConfig')
     def test_transcribe_unexpected_result_reason(
         self, mock_speech_config, mock_speech_recognizer, mock_audio_config
     ):
@@ -108,16 +112,71 @@ class TestTranscribeAudioView:
             reason="UnexpectedReason"
         )
         expected_error_message = "Azure transcription failed: Unexpected result reason"
-        transcription = self.transcribe_audio_view.transcribe_with_azure(
-            'mock_path.wav', self.recognition_language
+        transcription = self.recognizer.transcribe(
+            PCM_DATA, self.recognition_language
         )
         assert transcription == expected_error_message
         mock_speech_config.assert_called_once()
         mock_audio_config.assert_called_once()
         mock_recognizer.recognize_once.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
+    def test_no_files_left_behind(
+        self, mock_transcribe_with_azure, mock_audio_segment, client, settings, tmp_path
+    ): # pylint: disable=unused-argument
+        """Test that the upload is converted in memory without writing files"""
+        settings.BASE_DIR = tmp_path
+        mock_transcribe_with_azure.return_value = "This is a transcription."
+        response = client.post(
+            self.url,
+            {
+                'audio': self.mock_file,
+                'recordingLanguage': self.recognition_language
+            },
+            format='multipart'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert not any(tmp_path.iterdir())
+        audio_file = mock_audio_segment.call_args[0][0]
+        assert audio_file.name == 'test_audio.mp3'
+
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
+    def test_repeated_upload_is_served_from_cache(
+        self, mock_transcribe_with_azure, mock_audio_segment, client, create_superuser
+    ):
+        """Test that resubmitting the same recording skips conversion and recognition"""
+        mock_transcribe_with_azure.return_value = "This is a transcription."
+        responses = []
+        for _ in range(2):
+            self.mock_file.seek(0)
+            responses.append(client.post(
+                self.url,
+                {
+                    'audio': self.mock_file,
+                    'recordingLanguage': self.recognition_language
+                },
+                format='multipart'
+            ))
+        assert responses[0].status_code == status.HTTP_201_CREATED
+        assert responses[1].json() == responses[0].json()
+        mock_audio_segment.assert_called_once()
+        mock_transcribe_with_azure.assert_called_once()
+
+        client.force_authenticate(user=create_superuser)
+        response = client.get(reverse('transcription-cache-stats'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'hits': 1, 'misses': 1}
+
+    def test_cache_stats_requires_admin(self, client, create_user):
+        """Test that the cache counters are only visible to admin users"""
+        client.force_authenticate(user=create_user)
+        response = client.get(reverse('transcription-cache-stats'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     def test_transcription_is_none(self, mock_transcribe_with_azure, mock_audio_segment, client):
         """Test when transcription is None."""
         mock_transcribe_with_azure.return_value = None
@@ -137,8 +196,8 @@ class TestTranscribeAudioView:
         mock_audio_segment.assert_called_once()
         mock_transcribe_with_azure.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_successful_transcription_with_translation(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -173,8 +232,8 @@ class TestTranscribeAudioView:
         mock_transcribe_with_azure.assert_called_once()
         mock_recognizer.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_translation_canceled(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -210,8 +269,8 @@ class TestTranscribeAudioView:
         mock_transcribe_with_azure.assert_called_once()
         mock_audio_segment.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_translation_canceled_but_not_error(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -248,8 +307,8 @@ class TestTranscribeAudioView:
         mock_audio_segment.assert_called_once()
 
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_translation_no_match(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -278,8 +337,8 @@ class TestTranscribeAudioView:
         mock_audio_segment.assert_called_once()
         mock_transcribe_with_azure.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_translation_value_error(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -304,8 +363,8 @@ class TestTranscribeAudioView:
         mock_audio_segment.assert_called_once()
         mock_transcribe_with_azure.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_translation_with_no_valid_translation_languages(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -334,8 +393,8 @@ class TestTranscribeAudioView:
         mock_audio_segment.assert_called_once()
         mock_transcribe_with_azure.assert_called_once()
 
-    @patch('pydub.AudioSegment.from_file')
-    @patch('api.views.azure_views.TranscribeAudio.transcribe_with_azure')
+    @patch('pydub.AudioSegment.from_file', return_value=SILENCE)
+    @patch('api.transcription.AzureSpeechRecognizer.transcribe')
     @patch('azure.cognitiveservices.speech.translation.TranslationRecognizer')
     def test_translation_unexpected_result_reason(
         self, mock_recognizer, mock_transcribe_with_azure, mock_audio_segment, client
@@ -0,0 +1,178 @@
+""" api/tests/unit/views/azure_views_tests/test_transcription_jobs.py """
+# pylint: disable=attribute-defined-outside-init
+
+import json
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import TranscriptionJob
+from api.transcription import TranscriptionJobQueue, TranscriptionQueueFull
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+FAKE_RECOGNIZER = (
+    'api.tests.unit.views.azure_views_tests.test_transcription_jobs.FakeRecognizer'
+)
+FAILING_RECOGNIZER = (
+    'api.tests.unit.views.azure_views_tests.test_transcription_jobs.FailingRecognizer'
+)
+
+class FakeRecognizer:
+    """Local stand-in for the Azure recognizer"""
+
+    def transcribe(self, pcm_data, recognition_language): # pylint: disable=unused-argument
+        """Return a canned transcription"""
+        return f"Transcription in {recognition_language}"
+
+    def translate(self, pcm_data, recognition_language, target_languages): # pylint: disable=unused-argument
+        """Return a canned translation for every target language"""
+        return {language: f"Translation to {language}" for language in target_languages}
+
+class FailingRecognizer(FakeRecognizer):
+    """Local stand-in for the Azure recognizer that fails to translate"""
+
+    def translate(self, pcm_data, recognition_language, target_languages):
+        return "error: No speech could be recognized"
+
+@patch('pydub.AudioSegment.from_file')
+class TestTranscriptionJobViews:
+    """Test cases for TranscriptionJobCreate and TranscriptionJobDetail views"""
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mock_file, settings):
+        """Setup method"""
+        settings.TRANSCRIPTION_RECOGNIZER = FAKE_RECOGNIZER
+        self.settings = settings
+        self.url = reverse('transcription-job-create')
+        self.mock_file = mock_file
+        self.queue = TranscriptionJobQueue(max_workers=1, max_pending=5)
+
+    def post_audio(self, client):
+        """Helper method to post the mock audio file and wait for the job to finish"""
+        with patch('api.views.azure_views.get_job_queue', return_value=self.queue):
+            response = client.post(
+                self.url,
+                {
+                    'audio': self.mock_file,
+                    'recordingLanguage': 'fi-FI',
+                    'translationLanguages': json.dumps(['en', 'sv'])
+                },
+                format='multipart'
+            )
+        self.queue.executor.shutdown(wait=True)
+        return response
+
+    def test_job_completes(self, mock_audio_segment, client):
+        """Test that a queued job is processed and its result can be polled"""
+        response = self.post_audio(client)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == TranscriptionJob.STATUS_PENDING
+        job_id = response.data['job_id']
+        assert response.data['status_url'].endswith(f'/api/transcribe/jobs/{job_id}/')
+
+        response = client.get(reverse('transcription-job-detail', kwargs={'job_id': job_id}))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == TranscriptionJob.STATUS_COMPLETED
+        assert response.data['transcription'] == 'Transcription in fi-FI'
+        assert response.data['translations'] == {
+            'en': 'Translation to en',
+            'sv': 'Translation to sv'
+        }
+        assert response.data['completed_at'] is not None
+        mock_audio_segment.assert_called_once()
+
+    def test_cached_job_completes_immediately(self, mock_audio_segment, client):
+        """Test that a job for an already transcribed recording is not queued"""
+        self.post_audio(client)
+        self.mock_file.seek(0)
+        self.queue = TranscriptionJobQueue(max_workers=1, max_pending=0)
+
+        response = self.post_audio(client)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == TranscriptionJob.STATUS_COMPLETED
+        job = TranscriptionJob.objects.get(pk=response.data['job_id'])
+        assert job.transcription == 'Transcription in fi-FI'
+        mock_audio_segment.assert_called_once()
+
+    def test_job_fails(self, mock_audio_segment, client): # pylint: disable=unused-argument
+        """Test that a failing translation marks the job as failed"""
+        self.settings.TRANSCRIPTION_RECOGNIZER = FAILING_RECOGNIZER
+        response = self.post_audio(client)
+        job = TranscriptionJob.objects.get(pk=response.data['job_id'])
+        assert job.status == TranscriptionJob.STATUS_FAILED
+        assert job.error == 'Failed to translate the audio'
+        assert job.returnvalue == 'error: No speech could be recognized'
+
+    def test_job_conversion_error(self, mock_audio_segment, client):
+        """Test that an audio conversion error marks the job as failed"""
+        mock_audio_segment.side_effect = OSError('ffmpeg not found')
+        response = self.post_audio(client)
+        job = TranscriptionJob.objects.get(pk=response.data['job_id'])
+        assert job.status == TranscriptionJob.STATUS_FAILED
+        assert job.error == 'Failed to process the audio'
+        assert job.returnvalue == 'ffmpeg not found'
+
+    def test_no_file_uploaded(self, mock_audio_segment, client): # pylint: disable=unused-argument
+        """Test when no audio file is uploaded"""
+        response = client.post(self.url, {})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"error": "Audio file is required"}
+
+    def test_queue_full(self, mock_audio_segment, client): # pylint: disable=unused-argument
+        """Test that a full queue rejects the job without leaving it behind"""
+        self.queue = TranscriptionJobQueue(max_workers=1, max_pending=0)
+        response = self.post_audio(client)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert not TranscriptionJob.objects.exists()
+
+    def test_job_not_found(self, mock_audio_segment, client): # pylint: disable=unused-argument
+        """Test polling a job that does not exist"""
+        response = client.get(reverse(
+            'transcription-job-detail',
+            kwargs={'job_id': '00000000-0000-0000-0000-000000000000'}
+        ))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stale_job_fails(self, mock_audio_segment, client): # pylint: disable=unused-argument
+        """Test that a job left processing by a lost worker is reported as failed"""
+        self.settings.TRANSCRIPTION_JOB_TIMEOUT = 600
+        stale_job = TranscriptionJob.objects.create(
+            file_name='stale.m4a',
+            status=TranscriptionJob.STATUS_PROCESSING
+        )
+        TranscriptionJob.objects.filter(pk=stale_job.pk).update(
+            created_at=timezone.now() - timedelta(seconds=601)
+        )
+        recent_job = TranscriptionJob.objects.create(file_name='recent.m4a')
+
+        response = client.get(
+            reverse('transcription-job-detail', kwargs={'job_id': stale_job.pk})
+        )
+        assert response.data['status'] == TranscriptionJob.STATUS_FAILED
+        assert response.data['error'] == 'Transcription job timed out'
+        assert response.data['completed_at'] is not None
+
+        response = client.get(
+            reverse('transcription-job-detail', kwargs={'job_id': recent_job.pk})
+        )
+        assert response.data['status'] == TranscriptionJob.STATUS_PENDING
+
+def test_job_queue_is_bounded():
+    """Test that the job queue rejects jobs beyond its capacity and frees finished slots"""
+    queue = TranscriptionJobQueue(max_workers=1, max_pending=1)
+    release = threading.Event()
+    future = queue.submit(release.wait)
+
+    with pytest.raises(TranscriptionQueueFull):
+        queue.submit(release.wait)
+
+    release.set()
+    future.result()
+    queue.executor.shutdown(wait=True)
+    assert queue.slots.acquire(blocking=False) # pylint: disable=consider-using-with
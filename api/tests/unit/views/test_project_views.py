@@ -5,6 +5,8 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 
+from api.models import Account, Project, Survey
+
 pytestmark = pytest.mark.django_db
 
 class TestProjectListView:
@@ -35,6 +37,19 @@ class TestProjectListView:
             create_project.worker_responsible_personnel_number
         assert response.data[0]['customer_account'] == create_project.customer_account
 
+    def test_project_list_hides_archived_projects(self, client, create_project):
+        """Test that archived projects are only listed when asked for"""
+        Project.objects.filter(pk=create_project.pk).update(is_active=False)
+        active_project = Project.objects.create(**self.project_data | {'project_id': 'active_id'})
+
+        response = client.get(self.url)
+        assert [project['id'] for project in response.data] == [active_project.id]
+
+        response = client.get(self.url, {'include_archived': 'true'})
+        assert {project['id'] for project in response.data} == {
+            create_project.id, active_project.id
+        }
+
     def test_project_create(self, client, create_user):
         """Test ProjectList view with POST request (non-admin user)"""
         client.force_authenticate(user=create_user)
@@ -54,6 +69,75 @@ class TestProjectListView:
         assert response.data['worker_responsible_personnel_number'] == '12345'
         assert response.data['customer_account'] == 'Test Account'
 
+    def test_project_list_last_survey_date(self, client, create_project_with_surveys):
+        """Test ProjectList view returns the latest survey date from the annotation"""
+        project = create_project_with_surveys
+        latest = project.surveys.order_by('-created_at').first()
+        response = client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['last_survey_date'] == latest.created_at
+
+    @pytest.mark.parametrize('project_count', [1, 100, 5000])
+    def test_project_list_query_count(self, client, django_assert_num_queries, project_count):
+        """Test ProjectList view query count does not grow with the number of projects"""
+        creator = Account.objects.create(user_id='creator_id', username='creatoruser')
+        projects = Project.objects.bulk_create([
+            Project(
+                project_id=f'{i}-00-00',
+                data_area_id='area',
+                project_name=f'Project {i}',
+                dimension_display_value='Dimension',
+                worker_responsible_personnel_number='12345',
+                customer_account='Account'
+            )
+            for i in range(project_count)
+        ])
+        Survey.objects.bulk_create([
+            Survey(
+                project=project,
+                creator=creator,
+                description='Description',
+                task=['Task'],
+                scaffold_type=['Scaffold'],
+                access_code=f'{i:06d}'
+            )
+            for i, project in enumerate(projects[:50])
+        ])
+
+        with django_assert_num_queries(1):
+            response = client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == project_count
+
+    def test_project_list_cursor_pagination(self, client):
+        """Test ProjectList view follows cursor links through all projects"""
+        Project.objects.bulk_create([
+            Project(project_id=f'{i}-00-00', project_name=f'Project {i}')
+            for i in range(5)
+        ])
+
+        response = client.get(self.url, {'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['previous'] is None
+        project_ids = [project['project_id'] for project in response.data['results']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            assert len(response.data['results']) <= 2
+            project_ids += [project['project_id'] for project in response.data['results']]
+
+        assert project_ids == [f'{i}-00-00' for i in range(5)]
+
+    def test_project_list_page_size_is_capped(self, client):
+        """Test ProjectList view caps the client-requested page size"""
+        Project.objects.bulk_create([
+            Project(project_id=f'{i}-00-00', project_name=f'Project {i}')
+            for i in range(201)
+        ])
+        response = client.get(self.url, {'page_size': 1000})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 200
+        assert response.data['next'] is not None
+
 class TestProjectDetailView:
     """Tests ProjectDetail view"""
 
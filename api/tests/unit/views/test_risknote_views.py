@@ -50,6 +50,20 @@ class TestRiskNoteCreateView:
         assert response.data[0]['description'] == self.risknote.description
         assert response.data[0]['status'] == self.risknote.status
 
+    def test_get_risk_notes_paginated(self, client):
+        """Test RiskNoteCreate view with GET request and cursor pagination"""
+        for i in range(3):
+            RiskNote.objects.create(survey=self.survey, note=f'Risk Note {i}')
+
+        response = client.get(self.url, {'page_size': 3})
+        assert response.status_code == status.HTTP_200_OK
+        notes = [risk_note['note'] for risk_note in response.data['results']]
+        assert notes == ['Test Risk Note', 'Risk Note 0', 'Risk Note 1']
+
+        response = client.get(response.data['next'])
+        assert [risk_note['note'] for risk_note in response.data['results']] == ['Risk Note 2']
+        assert response.data['next'] is None
+
     def test_post_single_risk_note(self, client):
         """Test RiskNoteCreate view with POST request for single RiskNote"""
         response = client.post(self.url, self.valid_risknote_data, format='json')
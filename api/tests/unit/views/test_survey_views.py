@@ -7,10 +7,11 @@ import jwt
 import pytest
 from django.urls import reverse
 from django.conf import settings
+from django.test import override_settings
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from api.models import AccountSurvey, Survey, Project, Account
+from api.models import AccountSurvey, Survey, Project, Account, RiskNote
 
 pytestmark = pytest.mark.django_db
 
@@ -85,7 +86,7 @@ class TestSurveyListView:
             data=json.dumps(self.survey_data),
             content_type='application/json'
         )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
         assert response.data['error'] == "Authorization header is required"
 
@@ -97,7 +98,7 @@ class TestSurveyListView:
             data=json.dumps(self.survey_data),
             content_type='application/json'
         )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
         assert response.data['error'] == "Authorization header is required"
 
@@ -118,7 +119,7 @@ class TestSurveyListView:
             data=json.dumps(self.survey_data),
             content_type='application/json'
         )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
         assert response.data['error'] == "Token has expired"
 
@@ -135,10 +136,48 @@ class TestSurveyListView:
             data=json.dumps(self.survey_data),
             content_type='application/json'
         )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
         assert response.data['error'] == "Invalid token"
 
+    def test_survey_list_query_count(self, client, django_assert_num_queries):
+        """Test SurveyList view query count does not grow with the number of surveys"""
+        for i in range(20):
+            survey = Survey.objects.create(
+                project=self.project,
+                creator=self.survey.creator,
+                description=f'Description {i}',
+                task=['Task'],
+                scaffold_type=['Scaffold']
+            )
+            RiskNote.objects.create(survey=survey, note=f'Risk note {i}')
+
+        # Surveys with project and creator, then the prefetched risk notes
+        with django_assert_num_queries(2):
+            response = client.get(self.survey_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 21
+
+    def test_survey_list_paginated(self, client):
+        """Test SurveyList view returns newest surveys first with cursor pagination"""
+        for i in range(2):
+            Survey.objects.create(
+                project=self.project,
+                creator=self.survey.creator,
+                description=f'Description {i}',
+                task=['Task'],
+                scaffold_type=['Scaffold']
+            )
+
+        response = client.get(self.survey_url, {'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        descriptions = [survey['description'] for survey in response.data['results']]
+        assert descriptions == ['Description 1', 'Description 0']
+
+        response = client.get(response.data['next'])
+        assert [survey['id'] for survey in response.data['results']] == [self.survey.id]
+        assert response.data['next'] is None
+
 
 class TestSurveyDetailView:
     """Tests SurveyDetail view"""
@@ -232,6 +271,60 @@ class TestFilledSurveysView:
         assert filled_survey['project_id'] == self.project.project_id
         assert filled_survey['project_name'] == self.project.project_name
 
+    def test_filled_surveys_query_count(self, client, django_assert_num_queries):
+        """Test filled surveys are serialized with a constant number of queries"""
+        for i in range(20):
+            survey = Survey.objects.create(
+                project=self.project,
+                creator=self.survey.creator,
+                description=f'Description {i}',
+                task=['Task'],
+                scaffold_type=['Scaffold']
+            )
+            RiskNote.objects.create(survey=survey, note=f'Risk note {i}')
+            AccountSurvey.objects.create(account=self.account, survey=survey)
+
+        token_payload = {
+            "username": self.account.username,
+            "user_id": self.account.user_id
+        }
+        token = jwt.encode(token_payload, settings.SECRET_KEY, algorithm="HS256")
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        # Account lookup, surveys with project and creator, prefetched risk notes
+        with django_assert_num_queries(3):
+            response = client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['filled_surveys']) == 21
+        # Most recently filled survey comes first
+        assert response.data['filled_surveys'][0]['description'] == 'Description 19'
+        assert response.data['filled_surveys'][-1]['id'] == self.survey.id
+
+    def test_filled_surveys_paginated(self, client):
+        """Test retrieving filled surveys page by page"""
+        survey = Survey.objects.create(
+            project=self.project,
+            creator=self.survey.creator,
+            description='Newer survey',
+            task=['Task'],
+            scaffold_type=['Scaffold']
+        )
+        AccountSurvey.objects.create(account=self.account, survey=survey)
+        token_payload = {
+            "username": self.account.username,
+            "user_id": self.account.user_id
+        }
+        token = jwt.encode(token_payload, settings.SECRET_KEY, algorithm="HS256")
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        response = client.get(self.url, {'page_size': 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert [s['id'] for s in response.data['filled_surveys']] == [survey.id]
+
+        response = client.get(response.data['next'])
+        assert [s['id'] for s in response.data['filled_surveys']] == [self.survey.id]
+        assert response.data['next'] is None
+
     def test_missing_authorization_header(self, client):
         """Test request with missing Authorization header"""
         response = client.get(self.url)
@@ -350,8 +443,8 @@ class TestValidateSurveyView:
         response = self.client.post(
             reverse('validate-survey', args=[self.survey.access_code])
         )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert response.data == {"error": "Authorization header is required."}
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data == {"error": "Authorization header is required"}
 
     def test_validate_survey_invalid_token(self):
         """Test joining a survey with an invalid token"""
@@ -360,7 +453,7 @@ class TestValidateSurveyView:
             HTTP_AUTHORIZATION="Bearer invalidtoken"
         )
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
-        assert response.data == {"error": "Invalid token."}
+        assert response.data == {"error": "Invalid token"}
 
     def test_validate_survey_expired_token(self):
         """Test joining a survey with an expired token"""
@@ -370,7 +463,21 @@ class TestValidateSurveyView:
                 HTTP_AUTHORIZATION="Bearer sometoken"
             )
             assert response.status_code == 401
-            assert response.data == {"error": "Token has expired."}
+            assert response.data == {"error": "Token has expired"}
+
+    def test_validate_survey_decodes_token_once(self):
+        """Test that the view reads the claims verified by AccessTokenMiddleware"""
+        middleware = settings.MIDDLEWARE + [
+            'api.middleware.access_token_middleware.AccessTokenMiddleware'
+        ]
+        with override_settings(MIDDLEWARE=middleware):
+            with patch('jwt.decode', wraps=jwt.decode) as mock_decode:
+                response = self.client.post(
+                    reverse('validate-survey', args=[self.survey.access_code]),
+                    HTTP_AUTHORIZATION=self.auth_header
+                )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert mock_decode.call_count == 1
 
 @pytest.mark.django_db
 class TestAccountsBySurveyView:
@@ -448,3 +555,14 @@ class TestAccountsBySurveyView:
         )
         assert response.status_code == status.HTTP_200_OK
         assert response.data['accounts'] == []
+
+    def test_get_accounts_by_survey_paginated(self):
+        """Test retrieving accounts linked to a survey page by page"""
+        url = reverse('survey-accounts', args=[self.survey.id])
+        response = self.client.get(url, {'page_size': 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['accounts'][0]['account']['user_id'] == 'user1'
+
+        response = self.client.get(response.data['next'])
+        assert response.data['accounts'][0]['account']['user_id'] == 'user2'
+        assert response.data['next'] is None
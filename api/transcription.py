@@ -0,0 +1,385 @@
+""" api/transcription.py """
+
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from azure.cognitiveservices.speech import (
+    AudioConfig,
+    CancellationReason,
+    ResultReason,
+    SpeechConfig,
+    SpeechRecognizer,
+    translation
+)
+from azure.cognitiveservices.speech.audio import AudioStreamFormat, PushAudioInputStream
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from pydub import AudioSegment
+
+from api.models import TranscriptionJob
+
+# The Speech SDK expects 16 kHz, mono, 16-bit PCM audio
+SAMPLE_RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2
+
+class TranscriptionError(Exception):
+    """Raised when the audio could not be transcribed or translated"""
+    def __init__(self, error, returnvalue):
+        super().__init__(error)
+        self.error = error
+        self.returnvalue = returnvalue
+
+class TranscriptionQueueFull(Exception):
+    """Raised when the transcription job queue has no free slots"""
+
+class AzureSpeechRecognizer:
+    """Class for transcribing and translating WAV files using Azure Speech SDK"""
+
+    def transcribe(self, pcm_data, recognition_language):
+        """Method for transcribing speech to text written in the same language"""
+        try:
+            # Initialize the Azure Speech SDK
+            speech_key = settings.SPEECH_KEY
+            service_region = settings.SPEECH_SERVICE_REGION
+            speech_config = SpeechConfig(subscription=speech_key, region=service_region)
+            speech_config.speech_recognition_language = recognition_language
+
+            # Feed the PCM audio to the recognizer through a push stream
+            audio_config = create_audio_config(pcm_data)
+
+            # Initialize the recognizer
+            recognizer = SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+
+            # Perform the transcription
+            result = recognizer.recognize_once()
+
+            # Check the result and return the transcription text
+            if result.reason == ResultReason.RecognizedSpeech:
+                return result.text
+            if result.reason == ResultReason.NoMatch:
+                return "error: No speech could be recognized"
+            if result.reason == ResultReason.Canceled:
+                return f"error: Recognition canceled: {result.cancellation_details.reason}"
+            raise ValueError("Unexpected result reason")
+
+        except ValueError as e:
+            return f"Azure transcription failed: {e}"
+
+    def translate(self, pcm_data, recognition_language, target_languages):
+        """Method for translating speech to text in the target languages"""
+        if target_languages == []:
+            return {}
+        result = self.transcribe_and_translate(
+            pcm_data,
+            recognition_language,
+            target_languages
+        )
+        if isinstance(result, str):
+            return result
+        return result[1]
+
+    def transcribe_and_translate(self, pcm_data, recognition_language, target_languages):
+        """
+        Method for transcribing and translating speech with a single recognition.
+        Returns a (transcription, translations) tuple, or an error string.
+        """
+        try:
+            speech_key = settings.SPEECH_KEY
+            service_region = settings.SPEECH_SERVICE_REGION
+            speech_translation_config = translation.SpeechTranslationConfig(
+                subscription=speech_key,
+                region=service_region
+            )
+
+            speech_translation_config.speech_recognition_language = recognition_language
+            for language in target_languages:
+                speech_translation_config.add_target_language(language)
+
+            audio_config = create_audio_config(pcm_data)
+
+            translation_recognizer = translation.TranslationRecognizer(
+                translation_config=speech_translation_config,
+                audio_config=audio_config
+            )
+
+            translation_recognition_result = translation_recognizer.recognize_once_async().get()
+
+            # Handle the result based on the outcome
+            if translation_recognition_result.reason == ResultReason.TranslatedSpeech:
+                translations = {}
+                for language in target_languages:
+                    translations[language] = str(
+                        translation_recognition_result.translations[language]
+                    )
+
+                # Return the recognized and translated text
+                return translation_recognition_result.text, translations
+
+            if translation_recognition_result.reason == ResultReason.NoMatch:
+                return "error: No speech could be recognized"
+
+            if translation_recognition_result.reason == ResultReason.Canceled:
+                cancellation_details = translation_recognition_result.cancellation_details
+                err = f"error: Speech Recognition canceled: {cancellation_details.reason}"
+                if cancellation_details.reason == CancellationReason.Error:
+                    return f"{err}, details: {cancellation_details.error_details}"
+                return err
+            raise ValueError("Unexpected result reason")
+
+        except ValueError as e:
+            return f"Translation failed: {e}"
+
+def get_recognizer():
+    """Helper function to instantiate the recognizer configured in settings"""
+    return import_string(settings.TRANSCRIPTION_RECOGNIZER)()
+
+def convert_to_pcm(audio_file):
+    """
+    Helper function to decode an audio file-like object with pydub and resample it
+    to the raw PCM format the Speech SDK expects. Nothing is written to disk.
+    """
+    segment = AudioSegment.from_file(audio_file)
+    segment = segment.set_frame_rate(SAMPLE_RATE).set_channels(CHANNELS)
+    return segment.set_sample_width(SAMPLE_WIDTH).raw_data
+
+def create_audio_config(pcm_data):
+    """Helper function to create an AudioConfig that reads PCM data from a push stream"""
+    stream_format = AudioStreamFormat(
+        samples_per_second=SAMPLE_RATE,
+        bits_per_sample=SAMPLE_WIDTH * 8,
+        channels=CHANNELS
+    )
+    stream = PushAudioInputStream(stream_format=stream_format)
+    stream.write(pcm_data)
+    stream.close()
+    return AudioConfig(stream=stream)
+
+def spool_upload(file):
+    """
+    Helper function to copy an uploaded file into an anonymous buffer that stays in
+    memory up to TRANSCRIPTION_SPOOL_MAX_MEMORY_SIZE bytes, so it outlives the request.
+    """
+    buffer = tempfile.SpooledTemporaryFile( # pylint: disable=consider-using-with
+        max_size=settings.TRANSCRIPTION_SPOOL_MAX_MEMORY_SIZE
+    )
+    for chunk in file.chunks():
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+def recognize_speech(pcm_data, recognition_language, target_languages, recognizer=None):
+    """
+    Transcribe PCM audio and translate it to the target languages.
+
+    The transcription and the translation are independent recognitions of the
+    same audio, so they run concurrently. With TRANSCRIPTION_SINGLE_RECOGNITION
+    enabled the transcription is instead taken from the translation recognizer.
+
+    Returns:
+        tuple: The transcription and a dict of translations keyed by language.
+
+    Raises:
+        TranscriptionError: If the transcription or the translation fails.
+    """
+    recognizer = recognizer or get_recognizer()
+
+    if settings.TRANSCRIPTION_SINGLE_RECOGNITION and target_languages:
+        result = recognizer.transcribe_and_translate(
+            pcm_data,
+            recognition_language,
+            target_languages
+        )
+        if isinstance(result, str):
+            raise TranscriptionError("Failed to transcribe the audio", result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='recognition') as executor:
+        transcription_future = executor.submit(
+            recognizer.transcribe,
+            pcm_data,
+            recognition_language
+        )
+        translation_future = executor.submit(
+            recognizer.translate,
+            pcm_data,
+            recognition_language,
+            target_languages
+        )
+        transcription = transcription_future.result()
+        translations = translation_future.result()
+
+    if transcription is None or transcription.startswith('error'):
+        raise TranscriptionError("Failed to transcribe the audio", transcription)
+
+    if isinstance(translations, str):
+        raise TranscriptionError("Failed to translate the audio", translations)
+
+    return transcription, translations
+
+def hash_audio(audio_file):
+    """Helper function to compute the SHA-256 hex digest of an uploaded audio file"""
+    digest = hashlib.sha256()
+    for chunk in audio_file.chunks():
+        digest.update(chunk)
+    audio_file.seek(0)
+    return digest.hexdigest()
+
+class TranscriptionCache:
+    """
+    Cache of transcription results keyed by the audio content and languages.
+
+    Entries live in the Django cache configured by TRANSCRIPTION_CACHE_ALIAS, which
+    takes care of expiry and size-bounded eviction. The cache is shared by the worker
+    processes only if its backend is, like the database cache in the settings. Hit
+    and miss counters are kept in the same cache. The database cache increments them
+    with a read and a write, so concurrent requests may lose a count.
+    """
+    HITS_KEY = 'transcription:stats:hits'
+    MISSES_KEY = 'transcription:stats:misses'
+
+    @property
+    def cache(self):
+        """The Django cache backing the transcription cache"""
+        return caches[settings.TRANSCRIPTION_CACHE_ALIAS]
+
+    def make_key(self, audio_digest, recognition_language, target_languages):
+        """Method for building the cache key for an audio file and its languages"""
+        languages = ','.join(sorted(target_languages))
+        return f"transcription:{audio_digest}:{recognition_language}:{languages}"
+
+    def get(self, audio_digest, recognition_language, target_languages):
+        """Method for looking up a cached (transcription, translations) tuple"""
+        result = self.cache.get(
+            self.make_key(audio_digest, recognition_language, target_languages)
+        )
+        self.increment(self.HITS_KEY if result is not None else self.MISSES_KEY)
+        return result
+
+    def set(self, audio_digest, recognition_language, target_languages, result):
+        """Method for storing a (transcription, translations) tuple"""
+        self.cache.set(
+            self.make_key(audio_digest, recognition_language, target_languages),
+            result
+        )
+
+    def increment(self, key):
+        """Method for incrementing a counter, creating it if needed"""
+        self.cache.add(key, 0, timeout=None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # The counter was evicted between add and incr
+            self.cache.set(key, 1, timeout=None)
+
+    def stats(self):
+        """Method for reading the hit and miss counters"""
+        counters = self.cache.get_many([self.HITS_KEY, self.MISSES_KEY])
+        return {
+            'hits': counters.get(self.HITS_KEY, 0),
+            'misses': counters.get(self.MISSES_KEY, 0),
+        }
+
+transcription_cache = TranscriptionCache()
+
+class TranscriptionJobQueue:
+    """
+    Bounded pool of background workers for transcription jobs.
+
+    At most `max_workers` jobs run at the same time and at most `max_pending`
+    jobs are accepted (running or waiting) before submit raises TranscriptionQueueFull.
+    """
+    def __init__(self, max_workers, max_pending):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='transcription'
+        )
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args):
+        """Method for submitting a job to the pool"""
+        if not self.slots.acquire(blocking=False): # pylint: disable=consider-using-with
+            raise TranscriptionQueueFull("Transcription queue is full")
+        try:
+            future = self.executor.submit(fn, *args)
+        except RuntimeError:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+_JOB_QUEUE = None
+_JOB_QUEUE_LOCK = threading.Lock()
+
+def get_job_queue():
+    """Helper function to get the process-wide transcription job queue"""
+    global _JOB_QUEUE # pylint: disable=global-statement
+    with _JOB_QUEUE_LOCK:
+        if _JOB_QUEUE is None:
+            _JOB_QUEUE = TranscriptionJobQueue(
+                max_workers=settings.TRANSCRIPTION_MAX_WORKERS,
+                max_pending=settings.TRANSCRIPTION_MAX_PENDING_JOBS
+            )
+        return _JOB_QUEUE
+
+def fail_stale_jobs(jobs):
+    """
+    Helper function to mark jobs as failed when they have been pending or processing
+    for longer than TRANSCRIPTION_JOB_TIMEOUT seconds. Jobs run in the threads of a
+    web worker, so a job whose worker was killed or restarted would otherwise never finish.
+
+    Returns:
+        int: The number of jobs marked as failed.
+    """
+    now = timezone.now()
+    return jobs.filter(
+        status__in=[TranscriptionJob.STATUS_PENDING, TranscriptionJob.STATUS_PROCESSING],
+        created_at__lt=now - timedelta(seconds=settings.TRANSCRIPTION_JOB_TIMEOUT)
+    ).update(
+        status=TranscriptionJob.STATUS_FAILED,
+        error="Transcription job timed out",
+        completed_at=now
+    )
+
+def process_transcription_job(job_id, audio_file):
+    """Convert, transcribe and translate the audio of a job in a background worker"""
+    try:
+        job = TranscriptionJob.objects.get(pk=job_id)
+        job.status = TranscriptionJob.STATUS_PROCESSING
+        job.save(update_fields=['status'])
+
+        try:
+            job.transcription, job.translations = recognize_speech(
+                convert_to_pcm(audio_file),
+                job.recognition_language,
+                job.target_languages
+            )
+            job.status = TranscriptionJob.STATUS_COMPLETED
+            if job.audio_digest:
+                transcription_cache.set(
+                    job.audio_digest,
+                    job.recognition_language,
+                    job.target_languages,
+                    (job.transcription, job.translations)
+                )
+        except TranscriptionError as e:
+            job.status = TranscriptionJob.STATUS_FAILED
+            job.error = e.error
+            job.returnvalue = e.returnvalue
+        except Exception as e: # pylint: disable=broad-exception-caught
+            # A failed job must never be left in the processing state
+            job.status = TranscriptionJob.STATUS_FAILED
+            job.error = "Failed to process the audio"
+            job.returnvalue = str(e)
+
+        job.completed_at = timezone.now()
+        job.save()
+    finally:
+        audio_file.close()
+        # Worker threads open their own database connection
+        connection.close()
@@ -0,0 +1,111 @@
+""" api/translation.py """
+
+import hashlib
+import unicodedata
+from django.conf import settings
+from django.core.cache import caches
+
+from api.models import TranslationMemoryEntry
+
+def normalize_text(text):
+    """Helper function to normalize text so that trivially different inputs share entries"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+def hash_text(text):
+    """Helper function to compute the SHA-256 hex digest of normalized text"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+def chunk_texts(texts, target_count, max_texts, max_characters):
+    """
+    Helper function to split texts into chunks that fit in one Translator request.
+
+    Translator limits both the number of texts in a request and the total number
+    of characters, which counts every text once per target language. Yields lists
+    of positions in `texts`, keeping the input order.
+    """
+    chunk = []
+    characters = 0
+    for position, text in enumerate(texts):
+        size = len(text) * target_count
+        if chunk and (len(chunk) == max_texts or characters + size > max_characters):
+            yield chunk
+            chunk = []
+            characters = 0
+        chunk.append(position)
+        characters += size
+    if chunk:
+        yield chunk
+
+class TranslationMemory:
+    """
+    Memory of earlier text translations keyed by (source language, target language,
+    normalized text).
+
+    Entries live in the Django cache configured by TRANSLATION_MEMORY_CACHE_ALIAS,
+    which bounds memory use and evicts the least recently used entries. With
+    TRANSLATION_MEMORY_PERSISTENT enabled they are also stored in the database so
+    the memory survives restarts.
+    """
+
+    @property
+    def cache(self):
+        """The Django cache backing the translation memory"""
+        return caches[settings.TRANSLATION_MEMORY_CACHE_ALIAS]
+
+    def make_key(self, source_language, target_language, text_hash):
+        """Method for building the cache key of a single translation"""
+        return f"translation:{source_language}:{target_language}:{text_hash}"
+
+    def get_many(self, source_language, target_languages, text):
+        """Method for looking up the remembered translations of a text"""
+        text_hash = hash_text(text)
+        keys = {
+            self.make_key(source_language, language, text_hash): language
+            for language in target_languages
+        }
+        found = {
+            keys[key]: translation
+            for key, translation in self.cache.get_many(list(keys)).items()
+        }
+
+        missing = [language for language in target_languages if language not in found]
+        if missing and settings.TRANSLATION_MEMORY_PERSISTENT:
+            stored = dict(
+                TranslationMemoryEntry.objects.filter(
+                    source_language=source_language,
+                    target_language__in=missing,
+                    text_hash=text_hash
+                ).values_list('target_language', 'translation')
+            )
+            # Warm the cache so the next lookup does not hit the database
+            self.cache.set_many({
+                self.make_key(source_language, language, text_hash): translation
+                for language, translation in stored.items()
+            })
+            found.update(stored)
+
+        return found
+
+    def set_many(self, source_language, translations, text):
+        """Method for remembering translations of a text, keyed by target language"""
+        text_hash = hash_text(text)
+        self.cache.set_many({
+            self.make_key(source_language, language, text_hash): translation
+            for language, translation in translations.items()
+        })
+        if settings.TRANSLATION_MEMORY_PERSISTENT:
+            TranslationMemoryEntry.objects.bulk_create(
+                [
+                    TranslationMemoryEntry(
+                        source_language=source_language,
+                        target_language=language,
+                        text_hash=text_hash,
+                        text=normalize_text(text),
+                        translation=translation
+                    )
+                    for language, translation in translations.items()
+                ],
+                ignore_conflicts=True
+            )
+
+translation_memory = TranslationMemory()
@@ -15,10 +15,16 @@ from api.views import (
     UserDetail,
     SignIn,
     TranscribeAudio,
+    TranscriptionCacheStats,
+    TranscriptionJobCreate,
+    TranscriptionJobDetail,
     UploadImages,
+    ImageUploadUrls,
+    ImageUploadConfirm,
     RetrieveImage,
     RetrieveParams,
     TranslateText,
+    TranslateTextBatch,
     SurveyByAccessCode,
     ValidateSurvey,
     AccountsBySurvey,
@@ -96,11 +102,36 @@ urlpatterns = [
         TranscribeAudio.as_view(),
         name='transcribe_audio'
     ),
+    path(
+        'transcribe/jobs/',
+        TranscriptionJobCreate.as_view(),
+        name='transcription-job-create'
+    ),
+    path(
+        'transcribe/jobs/<uuid:job_id>/',
+        TranscriptionJobDetail.as_view(),
+        name='transcription-job-detail'
+    ),
+    path(
+        'transcribe/cache-stats/',
+        TranscriptionCacheStats.as_view(),
+        name='transcription-cache-stats'
+    ),
     path(
         'upload-images/',
         UploadImages.as_view(),
         name='upload_image'
     ),
+    path(
+        'upload-images/sas/',
+        ImageUploadUrls.as_view(),
+        name='image-upload-urls'
+    ),
+    path(
+        'upload-images/confirm/',
+        ImageUploadConfirm.as_view(),
+        name='image-upload-confirm'
+    ),
     path(
         'retrieve-image/',
         RetrieveImage.as_view(),
@@ -116,6 +147,11 @@ urlpatterns = [
         TranslateText.as_view(),
         name='translate-text'
     ),
+    path(
+        'translate/batch/',
+        TranslateTextBatch.as_view(),
+        name='translate-text-batch'
+    ),
     path(
         'filled-surveys/',
         FilledSurveys.as_view(),
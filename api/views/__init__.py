@@ -13,10 +13,16 @@ from .risknote_views import RiskNoteCreate, RiskNoteDetail
 from .user_views import UserList, UserDetail
 from .auth_views import SignIn
 from .azure_views import (
+    ImageUploadConfirm,
+    ImageUploadUrls,
     RetrieveImage,
     RetrieveParams,
     TranscribeAudio,
+    TranscriptionCacheStats,
+    TranscriptionJobCreate,
+    TranscriptionJobDetail,
     TranslateText,
+    TranslateTextBatch,
     UploadImages,
 )
 from .utils_views import api_root
@@ -34,8 +40,14 @@ __all__ = [
     "UserDetail",
     "SignIn",
     "TranscribeAudio",
+    "TranscriptionCacheStats",
+    "TranscriptionJobCreate",
+    "TranscriptionJobDetail",
     "TranslateText",
+    "TranslateTextBatch",
     "UploadImages",
+    "ImageUploadUrls",
+    "ImageUploadConfirm",
     "RetrieveImage",
     "RetrieveParams",
     "FilledSurveys",
@@ -1,35 +1,65 @@
 """ api/views/azure_views.py """
 
 import json
-import os
+import mimetypes
+import re
 import uuid
-import requests
-from azure.cognitiveservices.speech import (
-    AudioConfig,
-    CancellationReason,
-    ResultReason,
-    SpeechConfig,
-    SpeechRecognizer,
-    translation
-)
-from azure.storage.blob import BlobServiceClient
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from azure.core import MatchConditions
 from azure.core.exceptions import (
     AzureError,
     HttpResponseError,
-    ResourceNotFoundError
+    ResourceModifiedError,
+    ResourceNotFoundError,
+    ResourceNotModifiedError
 )
+from azure.storage.blob import ContentSettings
 from django.conf import settings
-from django.http import HttpResponse
-from pydub import AudioSegment
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils import timezone
 from requests.exceptions import (
     HTTPError,
     RequestException,
     Timeout
 )
 from rest_framework import generics, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from api.serializers import AudioUploadSerializer
+from api.http_client import get_session
+from api.images import (
+    VARIANT_FORMATS,
+    InvalidImageError,
+    get_variant_blob_name,
+    is_image_file_name,
+    process_images,
+    render_variant
+)
+from api.models import ImageUpload, TranscriptionJob
+from api.serializers import AudioUploadSerializer, TranscriptionJobSerializer
+from api.storage import (
+    IMAGE_BLOB_PREFIX,
+    generate_upload_url,
+    get_blob_url,
+    get_container_client,
+    get_image_blob_name
+)
+from api.translation import chunk_texts, translation_memory
+from api.transcription import (
+    TranscriptionError,
+    TranscriptionQueueFull,
+    convert_to_pcm,
+    fail_stale_jobs,
+    get_job_queue,
+    hash_audio,
+    process_transcription_job,
+    recognize_speech,
+    spool_upload,
+    transcription_cache
+)
 
 # <POST> /api/transcribe/
 class TranscribeAudio(generics.CreateAPIView):
@@ -39,6 +69,48 @@ class TranscribeAudio(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         # Get the uploaded file from the request
         file = request.FILES.get('audio')
+        recognition_language, target_languages = self.get_languages(request)
+
+        if not file:
+            return Response({"error": "Audio file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Reuse the result of an earlier upload of the same recording
+        audio_digest = hash_audio(file)
+        cached = transcription_cache.get(audio_digest, recognition_language, target_languages)
+        if cached is not None:
+            transcription, translations = cached
+        else:
+            # Convert the upload to 16 kHz mono PCM in memory using pydub
+            pcm_data = convert_to_pcm(file)
+            # Perform transcription and translation using Azure Speech SDK
+            try:
+                transcription, translations = recognize_speech(
+                    pcm_data,
+                    recognition_language,
+                    target_languages
+                )
+            except TranscriptionError as e:
+                return Response(
+                    {"error": e.error, "returnvalue": e.returnvalue},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            transcription_cache.set(
+                audio_digest,
+                recognition_language,
+                target_languages,
+                (transcription, translations)
+            )
+        message = (
+            f"Audio file '{file.name}' successfully converted to WAV, "
+            "transcribed and translated."
+        )
+        return Response(
+            {"message": message, "transcription": transcription, "translations": translations},
+            status=status.HTTP_201_CREATED
+        )
+
+    def get_languages(self, request):
+        """Method for reading the recognition and target languages from the request"""
         recognition_language = request.POST.get('recordingLanguage')
         target_languages = request.POST.get('translationLanguages')
         if target_languages:
@@ -49,205 +121,418 @@ class TranscribeAudio(generics.CreateAPIView):
         if not isinstance(target_languages, list):
             target_languages = []
 
+        return recognition_language, target_languages
+
+# <POST> /api/transcribe/jobs/
+class TranscriptionJobCreate(TranscribeAudio):
+    """
+    Class for queueing audio for transcription in a background worker.
+    Returns 202 with a job id that can be polled from TranscriptionJobDetail.
+    """
+
+    def create(self, request, *args, **kwargs):
+        file = request.FILES.get('audio')
+        recognition_language, target_languages = self.get_languages(request)
+
         if not file:
             return Response({"error": "Audio file is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Define file paths
-        input_path = os.path.join(settings.BASE_DIR, file.name)
-        output_path = os.path.join(settings.BASE_DIR, f"{os.path.splitext(file.name)[0]}.wav")
+        audio_digest = hash_audio(file)
+        cached = transcription_cache.get(audio_digest, recognition_language, target_languages)
+        if cached is not None:
+            # The same recording was already transcribed, so the job is done right away
+            job = TranscriptionJob.objects.create(
+                file_name=file.name,
+                status=TranscriptionJob.STATUS_COMPLETED,
+                recognition_language=recognition_language or '',
+                target_languages=target_languages,
+                transcription=cached[0],
+                translations=cached[1],
+                completed_at=timezone.now()
+            )
+            return self.accepted_response(request, job)
+
+        audio_file = spool_upload(file)
+        job = TranscriptionJob.objects.create(
+            file_name=file.name,
+            recognition_language=recognition_language or '',
+            target_languages=target_languages,
+            audio_digest=audio_digest
+        )
+
+        try:
+            get_job_queue().submit(process_transcription_job, job.id, audio_file)
+        except TranscriptionQueueFull:
+            job.delete()
+            audio_file.close()
+            return Response(
+                {"error": "Too many transcription jobs in progress, try again later"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        return self.accepted_response(request, job)
+
+    def accepted_response(self, request, job):
+        """Method for building the 202 response pointing to the job status"""
+        return Response(
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": request.build_absolute_uri(
+                    reverse('transcription-job-detail', kwargs={'job_id': job.id})
+                )
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+# <GET> /api/transcribe/jobs/<job_id>/
+class TranscriptionJobDetail(generics.RetrieveAPIView):
+    """Class for retrieving the status and result of a transcription job"""
+    queryset = TranscriptionJob.objects.all()
+    serializer_class = TranscriptionJobSerializer
+    lookup_field = 'pk'
+    lookup_url_kwarg = 'job_id'
+
+    def get_object(self):
+        job = super().get_object()
+        if job.status in (TranscriptionJob.STATUS_PENDING, TranscriptionJob.STATUS_PROCESSING):
+            # The worker running the job may have been killed, so don't let clients poll forever
+            if fail_stale_jobs(TranscriptionJob.objects.filter(pk=job.pk)):
+                job.refresh_from_db()
+        return job
+
+# <GET> /api/transcribe/cache-stats/
+class TranscriptionCacheStats(generics.RetrieveAPIView):
+    """Class for retrieving the hit and miss counters of the transcription cache"""
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(transcription_cache.stats(), status=status.HTTP_200_OK)
+
+# <POST> /api/upload-image/
+class UploadImages(generics.CreateAPIView):
+    """Class for uploading images to Azure Blob Storage"""
+
+    def post(self, request, *args, **kwargs):
+        # Collect all files from request.FILES
+        images = [file for key, file in request.FILES.items()]
+        if not images:
+            return Response(
+                {'status': 'error', 'message': 'No image files provided.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Validate every file before uploading any, so a bad file leaves nothing behind
+        for image in images:
+            if not self.validate_image(image):
+                return Response(
+                    {
+                        'status': 'error',
+                        'message': (
+                            f'Invalid file type for {image.name}. '
+                            'Only images are allowed.'
+                        )
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        # Save the uploaded file
-        with open(input_path, 'wb+') as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
+        # Check the content and recompress the images in the shared image pool
+        try:
+            processed_images = process_images(
+                [(image.read(), image.name) for image in images]
+            )
+        except InvalidImageError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Convert to WAV using pydub
-        AudioSegment.from_file(input_path).export(output_path, format="wav")
-        # Perform transcription using Azure Speech SDK
-        transcription = self.transcribe_with_azure(output_path, recognition_language)
-        if transcription is None or transcription.startswith('error'):
+        try:
+            container_client = get_container_client()
+        except (HttpResponseError, AzureError) as e:
             return Response(
-                {"error": "Failed to transcribe the audio", "returnvalue": transcription},
+                {'status': 'error', 'message': self.get_error_message(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        translations = self.transcribe_and_translate(
-            output_path,
-            recognition_language,
-            target_languages
-        )
-        if isinstance(translations, str):
+
+        # Upload the images in parallel
+        with ThreadPoolExecutor(
+            max_workers=min(settings.IMAGE_UPLOAD_MAX_WORKERS, len(images)),
+            thread_name_prefix='image-upload'
+        ) as executor:
+            results = list(executor.map(
+                lambda image, image_data: self.upload_image(container_client, image, image_data),
+                images,
+                processed_images
+            ))
+
+        uploaded_urls = [result['url'] for result in results if result['status'] == 'success']
+        errors = [result['message'] for result in results if result['status'] == 'error']
+        if errors:
             return Response(
-                {"error": "Failed to translate the audio", "returnvalue": translations},
+                {
+                    'status': 'error',
+                    'message': errors[0],
+                    'urls': uploaded_urls,
+                    'results': results
+                },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        message = (
-            f"Audio file '{file.name}' successfully converted to WAV, "
-            "transcribed and translated."
-        )
+
         return Response(
-            {"message": message, "transcription": transcription, "translations": translations},
+            {'status': 'success', 'urls': uploaded_urls, 'results': results},
             status=status.HTTP_201_CREATED
         )
 
-    def transcribe_with_azure(self, wav_file_path, recognition_language):
-        """Method for transcribing speech to text written in the same language"""
-        try:
-            # Initialize the Azure Speech SDK
-            speech_key = settings.SPEECH_KEY
-            service_region = settings.SPEECH_SERVICE_REGION
-            speech_config = SpeechConfig(subscription=speech_key, region=service_region)
-            speech_config.speech_recognition_language = recognition_language
-
-            # Create an AudioConfig instance from the WAV file
-            audio_config = AudioConfig(filename=wav_file_path)
-
-            # Initialize the recognizer
-            recognizer = SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
-
-            # Perform the transcription
-            result = recognizer.recognize_once()
-
-            # Check the result and return the transcription text
-            if result.reason == ResultReason.RecognizedSpeech:
-                return result.text
-            if result.reason == ResultReason.NoMatch:
-                return "error: No speech could be recognized"
-            if result.reason == ResultReason.Canceled:
-                return f"error: Recognition canceled: {result.cancellation_details.reason}"
-            raise ValueError("Unexpected result reason")
+    def upload_image(self, container_client, image, image_data):
+        """
+        Upload one processed image to a uniquely named blob and return the result for
+        the file. Images larger than AZURE_BLOB_MAX_SINGLE_PUT_SIZE are uploaded in
+        blocks, several blocks at a time.
+        """
+        blob_name = get_image_blob_name(image.name)
 
-        except ValueError as e:
-            return f"Azure transcription failed: {e}"
-
-    def transcribe_and_translate(
-        self,
-        wav_file_path,
-        recognition_language,
-        target_languages
-    ):
-        """Translates text using Azure Translator API"""
         try:
-            if target_languages == []:
-                return {}
-            speech_key = settings.SPEECH_KEY
-            service_region = settings.SPEECH_SERVICE_REGION
-            speech_translation_config = translation.SpeechTranslationConfig(
-                subscription=speech_key,
-                region=service_region
+            blob_client = container_client.get_blob_client(blob_name)
+            blob_client.upload_blob(
+                image_data,
+                length=len(image_data),
+                overwrite=True,
+                max_concurrency=settings.AZURE_BLOB_UPLOAD_MAX_CONCURRENCY,
+                content_settings=ContentSettings(
+                    content_type=mimetypes.guess_type(image.name)[0],
+                    cache_control=settings.IMAGE_CACHE_CONTROL
+                )
             )
+        except (HttpResponseError, AzureError) as e:
+            return {'file': image.name, 'status': 'error', 'message': self.get_error_message(e)}
 
-            speech_translation_config.speech_recognition_language = recognition_language
-            for language in target_languages:
-                speech_translation_config.add_target_language(language)
+        return {'file': image.name, 'status': 'success', 'url': get_blob_url(blob_name)}
 
-            audio_config = AudioConfig(filename=wav_file_path)
+    def get_error_message(self, error):
+        """Helper function to describe an Azure Blob Storage error"""
+        if isinstance(error, HttpResponseError):
+            return f'HTTP error during Azure Blob Storage operation: {str(error)}'
+        return f'Azure Blob Storage error: {str(error)}'
 
-            translation_recognizer = translation.TranslationRecognizer(
-                translation_config=speech_translation_config,
-                audio_config=audio_config
-            )
+    def validate_image(self, image):
+        """Validate image file type"""
+        return is_image_file_name(image.name)
 
-            translation_recognition_result = translation_recognizer.recognize_once_async().get()
+# <POST> /api/upload-images/sas/
+class ImageUploadUrls(generics.CreateAPIView):
+    """Class for issuing short-lived URLs for uploading images directly to Azure Blob Storage"""
 
-            # Handle the result based on the outcome
-            if translation_recognition_result.reason == ResultReason.TranslatedSpeech:
-                translations = {}
-                for language in target_languages:
-                    translations[language] = str(
-                        translation_recognition_result.translations[language]
-                    )
+    def create(self, request, *args, **kwargs):
+        file_names = request.data.get('files')
 
-                # Return the recognized and translated text
-                return translations
+        if (
+            not isinstance(file_names, list)
+            or not file_names
+            or not all(isinstance(name, str) and name for name in file_names)
+        ):
+            return Response(
+                {'status': 'error', 'message': 'Invalid or missing "files" parameter.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            if translation_recognition_result.reason == ResultReason.NoMatch:
-                return "error: No speech could be recognized"
+        max_length = ImageUpload._meta.get_field('file_name').max_length
+        for name in file_names:
+            if not is_image_file_name(name):
+                return Response(
+                    {
+                        'status': 'error',
+                        'message': f'Invalid file type for {name}. Only images are allowed.'
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if len(name) > max_length:
+                return Response(
+                    {
+                        'status': 'error',
+                        'message': f'File names can be at most {max_length} characters long.'
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-            if translation_recognition_result.reason == ResultReason.Canceled:
-                cancellation_details = translation_recognition_result.cancellation_details
-                err = f"error: Speech Recognition canceled: {cancellation_details.reason}"
-                if cancellation_details.reason == CancellationReason.Error:
-                    return f"{err}, details: {cancellation_details.error_details}"
-                return err
-            raise ValueError("Unexpected result reason")
+        expires_at = timezone.now() + timedelta(seconds=settings.IMAGE_UPLOAD_SAS_EXPIRY)
+        uploads = ImageUpload.objects.bulk_create([
+            ImageUpload(
+                file_name=name,
+                blob_name=get_image_blob_name(name),
+                expires_at=expires_at
+            )
+            for name in file_names
+        ])
 
-        except ValueError as e:
-            return f"Translation failed: {e}"
+        return Response(
+            {
+                'status': 'success',
+                'uploads': [
+                    {
+                        'upload_id': upload.id,
+                        'file': upload.file_name,
+                        'blob_name': upload.blob_name,
+                        'upload_url': generate_upload_url(upload.blob_name, expires_at),
+                        'url': get_blob_url(upload.blob_name),
+                        'expires_at': expires_at
+                    }
+                    for upload in uploads
+                ]
+            },
+            status=status.HTTP_201_CREATED
+        )
 
-# <POST> /api/upload-image/
-class UploadImages(generics.CreateAPIView):
-    """Class for uploading images to Azure Blob Storage"""
+# <POST> /api/upload-images/confirm/
+class ImageUploadConfirm(generics.CreateAPIView):
+    """Class for recording images that the client has uploaded with an upload URL"""
 
-    def post(self, request, *args, **kwargs):
-        # Collect all files from request.FILES
-        images = [file for key, file in request.FILES.items()]
-        if not images:
+    def create(self, request, *args, **kwargs):
+        upload_ids = request.data.get('upload_ids')
+
+        if not isinstance(upload_ids, list) or not upload_ids:
             return Response(
-                {'status': 'error', 'message': 'No image files provided.'},
+                {'status': 'error', 'message': 'Invalid or missing "upload_ids" parameter.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        uploaded_urls = []
+        uploads = {
+            str(pk): upload
+            for pk, upload in ImageUpload.objects.in_bulk(
+                [upload_id for upload_id in upload_ids if self.is_uuid(upload_id)]
+            ).items()
+        }
+        missing = [str(upload_id) for upload_id in upload_ids if str(upload_id) not in uploads]
+        if missing:
+            return Response(
+                {'status': 'error', 'message': f'Unknown upload ids: {", ".join(missing)}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         try:
-            blob_service_client = BlobServiceClient(
-                account_url=f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net",
-                credential=settings.AZURE_STORAGE_ACCOUNT_KEY
-            )
-            container_client = blob_service_client.get_container_client(
-                settings.AZURE_CONTAINER_NAME
-            )
-
-            for image in images:
-                if not self.validate_image(image):
-                    return Response(
-                        {
-                            'status': 'error',
-                            'message': (
-                                f'Invalid file type for {image.name}. '
-                                'Only images are allowed.'
-                            )
-                        },
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                # Generate a unique blob name
-                blob_name = f"images/{uuid.uuid4()}_{image.name}"
-
-                # Upload the image to the blob
-                blob_client = container_client.get_blob_client(blob_name)
-                blob_client.upload_blob(image, overwrite=True)
-
-                # Construct the blob URL
-                blob_url = (
-                    f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/"
-                    f"{settings.AZURE_CONTAINER_NAME}/{blob_name}"
-                )
-                uploaded_urls.append(blob_url)
+            container_client = get_container_client()
+            results = [
+                self.confirm_upload(container_client, uploads[str(upload_id)])
+                for upload_id in upload_ids
+            ]
+        except (HttpResponseError, AzureError) as e:
+            return Response(
+                {'status': 'error', 'message': f'Azure Blob Storage error: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
+        uploaded_urls = [result['url'] for result in results if result['status'] == 'success']
+        if len(uploaded_urls) < len(results):
             return Response(
-                {'status': 'success', 'urls': uploaded_urls},
-                status=status.HTTP_201_CREATED
+                {
+                    'status': 'error',
+                    'message': 'Some images have not been uploaded.',
+                    'urls': uploaded_urls,
+                    'results': results
+                },
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        except (HttpResponseError, AzureError) as e:
-            if isinstance(e, HttpResponseError):
-                error_message = 'HTTP error during Azure Blob Storage operation: '
-            else:
-                error_message = 'Azure Blob Storage error: '
+        return Response(
+            {'status': 'success', 'urls': uploaded_urls, 'results': results},
+            status=status.HTTP_200_OK
+        )
 
-            return Response(
-                {'status': 'error', 'message': error_message + str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    def is_uuid(self, value):
+        """Helper function to check that an upload id is a well-formed UUID"""
+        try:
+            uuid.UUID(str(value))
+            return True
+        except ValueError:
+            return False
+
+    def confirm_upload(self, container_client, upload):
+        """
+        Check the blob of an upload and mark the upload as completed. The blob
+        is validated and recompressed like images sent to UploadImages, so it is
+        stripped of EXIF data. Invalid, oversized and late uploads are deleted.
+        """
+        if upload.status == ImageUpload.STATUS_COMPLETED:
+            return self.upload_result(upload)
+
+        blob_client = container_client.get_blob_client(upload.blob_name)
+        try:
+            processed_image, error_message = self.process_blob(upload, blob_client)
+        except ResourceNotFoundError:
+            return self.upload_result(upload, 'Image not found.')
+        except ResourceModifiedError:
+            return self.upload_result(upload, 'Image changed during confirmation.')
+
+        if error_message is not None:
+            self.delete_blob(blob_client)
+            return self.upload_result(upload, error_message)
+
+        upload.status = ImageUpload.STATUS_COMPLETED
+        upload.size = len(processed_image)
+        upload.completed_at = timezone.now()
+        upload.save(update_fields=['status', 'size', 'completed_at'])
+        return self.upload_result(upload)
+
+    def process_blob(self, upload, blob_client):
+        """
+        Helper method to validate and recompress the blob of an upload through
+        this server. Blobs written after the upload URL expired and blobs larger
+        than IMAGE_UPLOAD_MAX_SIZE are rejected before they are downloaded.
+        The blob is read and replaced only while its ETag is unchanged.
+        Returns the stored image, or an error message if the blob must be deleted.
+        """
+        properties = blob_client.get_blob_properties()
+        if properties.last_modified > upload.expires_at:
+            return None, 'Upload URL has expired.'
+        if properties.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            return None, 'Image is too large.'
+
+        unchanged = {'etag': properties.etag, 'match_condition': MatchConditions.IfNotModified}
+        image_data = blob_client.download_blob(**unchanged).readall()
+        try:
+            processed_image = process_images([(image_data, upload.file_name)])[0]
+        except InvalidImageError as e:
+            return None, str(e)
+
+        if processed_image != image_data:
+            blob_client.upload_blob(
+                processed_image,
+                overwrite=True,
+                content_settings=ContentSettings(
+                    content_type=mimetypes.guess_type(upload.file_name)[0],
+                    cache_control=settings.IMAGE_CACHE_CONTROL
+                ),
+                **unchanged
             )
+        return processed_image, None
 
-    def validate_image(self, image):
-        """Validate image file type"""
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.gif']
-        ext = os.path.splitext(image.name)[1].lower()
-        return ext in valid_extensions
+    def upload_result(self, upload, error_message=None):
+        """Helper function to build the result for one confirmed upload"""
+        if error_message is not None:
+            return {
+                'upload_id': upload.id,
+                'file': upload.file_name,
+                'status': 'error',
+                'message': error_message
+            }
+        return {
+            'upload_id': upload.id,
+            'file': upload.file_name,
+            'status': 'success',
+            'url': get_blob_url(upload.blob_name)
+        }
+
+    def delete_blob(self, blob_client):
+        """Helper function to delete the blob of a rejected upload, if it was written"""
+        try:
+            blob_client.delete_blob()
+        except ResourceNotFoundError:
+            pass
 
-# <GET> /api/retrieve-image/?blob_name=<blob_name>/
+# Range header with a single byte range, e.g. "bytes=0-499", "bytes=500-" or "bytes=-500"
+BYTE_RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# <GET> /api/retrieve-image/?blob_name=<blob_name>&width=<width>&image_format=<format>
 class RetrieveImage(generics.RetrieveAPIView):
     """Class for retrieving images from Azure Blob Storage"""
 
@@ -260,58 +545,211 @@ class RetrieveImage(generics.RetrieveAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create BlobServiceClient
         try:
-            blob_service_client = BlobServiceClient(
-                account_url=f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net",
-                credential=settings.AZURE_STORAGE_ACCOUNT_KEY
-            )
-            container_client = blob_service_client.get_container_client(
-                settings.AZURE_CONTAINER_NAME
-            )
-        except (ResourceNotFoundError, HttpResponseError, AzureError) as e:
-            if isinstance(e, ResourceNotFoundError):
-                error_message = 'Container not found.'
-                error_status = status.HTTP_404_NOT_FOUND
-            elif isinstance(e, HttpResponseError):
-                error_message = f'HTTP error: {str(e)}'
-                error_status = status.HTTP_400_BAD_REQUEST
-            else:
-                error_message = f'Azure service error: {str(e)}'
-                error_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+            variant = self.get_variant(request)
+        except ValueError as e:
             return Response(
-                {'status': 'error', 'message': error_message},
-                status=error_status
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Get the shared container client
         try:
-            # Get the Blob Client for the image
-            blob_client = container_client.get_blob_client(blob_name)
-
-            # Download the image content
-            blob_data = blob_client.download_blob()
-            image_data = blob_data.readall()  # Read the content of the blob as binary
+            container_client = get_container_client()
+        except (ResourceNotFoundError, HttpResponseError, AzureError) as e:
+            return self.error_response(e, 'Container not found.')
 
-            # Determine the file's content type
-            content_type = self.get_content_type(blob_name)
+        byte_range = self.parse_range(request.headers.get('Range'))
+        conditions = self.get_download_conditions(request)
 
-            # Return the image as an HttpResponse with the appropriate content type
-            return HttpResponse(image_data, content_type=content_type)
+        try:
+            # Start the download; the content is streamed to the client in chunks.
+            # Azure answers 304 without a body if the client's copy is still current.
+            downloader, offset = self.start_download(
+                container_client, blob_name, variant, byte_range, conditions
+            )
+            return self.stream_image(downloader, self.get_blob_name(blob_name, variant), offset)
 
-        except (ResourceNotFoundError, HttpResponseError, AzureError) as e:
-            if isinstance(e, ResourceNotFoundError):
-                error_message = 'Image not found.'
-                error_status = status.HTTP_404_NOT_FOUND
-            elif isinstance(e, HttpResponseError):
-                error_message = f'HTTP error: {str(e)}'
-                error_status = status.HTTP_400_BAD_REQUEST
-            else:
-                error_message = f'Azure service error: {str(e)}'
-                error_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+        except InvalidImageError:
+            # Images uploaded directly to storage may be truncated or too large to decode
             return Response(
-                {'status': 'error', 'message': error_message},
-                status=error_status
+                {'status': 'error', 'message': 'Image could not be processed.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except (ResourceNotFoundError, HttpResponseError, AzureError) as e:
+            return self.download_error_response(
+                e, request, container_client, self.get_blob_name(blob_name, variant)
+            )
+
+    def download_error_response(self, error, request, container_client, blob_name):
+        """Helper function to answer a download that Azure did not start"""
+        if isinstance(error, ResourceNotModifiedError):
+            return self.not_modified(request)
+        if (
+            isinstance(error, HttpResponseError)
+            and error.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        ):
+            return self.range_not_satisfiable(container_client.get_blob_client(blob_name))
+        return self.error_response(error, 'Image not found.')
+
+    def error_response(self, error, not_found_message):
+        """Helper function to turn an Azure error into an error response"""
+        if isinstance(error, ResourceNotFoundError):
+            error_message = not_found_message
+            error_status = status.HTTP_404_NOT_FOUND
+        elif isinstance(error, HttpResponseError):
+            error_message = f'HTTP error: {str(error)}'
+            error_status = status.HTTP_400_BAD_REQUEST
+        else:
+            error_message = f'Azure service error: {str(error)}'
+            error_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return Response(
+            {'status': 'error', 'message': error_message},
+            status=error_status
+        )
+
+    def get_variant(self, request):
+        """
+        Helper function to read the requested image variant from the width and
+        image_format query parameters; `format` is taken by the API's renderers.
+        Returns a (width, format) tuple, or None for the original image.
+        """
+        width = request.query_params.get('width')
+        image_format = request.query_params.get('image_format')
+        if width is None and image_format is None:
+            return None
+
+        if width is not None:
+            if not width.isdigit() or int(width) not in settings.IMAGE_VARIANT_WIDTHS:
+                allowed = ', '.join(str(allowed) for allowed in settings.IMAGE_VARIANT_WIDTHS)
+                raise ValueError(f'Invalid width. Allowed widths are {allowed}.')
+            width = int(width)
+
+        image_format = (image_format or 'jpeg').lower().replace('jpg', 'jpeg')
+        if image_format not in VARIANT_FORMATS:
+            raise ValueError('Invalid format. Allowed formats are jpeg and webp.')
+
+        # Variants are only rendered from uploaded originals, never from other variants
+        if not request.query_params['blob_name'].startswith(IMAGE_BLOB_PREFIX):
+            raise ValueError('Variants can only be requested for uploaded images.')
+        return width, image_format
+
+    def get_blob_name(self, blob_name, variant):
+        """Helper function to get the name of the blob that holds the requested image"""
+        if variant is None:
+            return blob_name
+        return get_variant_blob_name(blob_name, *variant)
+
+    def start_download(self, container_client, blob_name, variant, byte_range, conditions):
+        """
+        Helper function to start downloading the requested image. A variant that
+        does not exist yet is rendered from the original image and stored, so
+        later requests download it directly. Returns the downloader and the
+        offset of the requested range.
+        """
+        blob_client = container_client.get_blob_client(self.get_blob_name(blob_name, variant))
+        try:
+            offset, length = self.get_offset_and_length(blob_client, byte_range)
+            return blob_client.download_blob(offset=offset, length=length, **conditions), offset
+        except ResourceNotFoundError:
+            if variant is None:
+                raise
+
+        self.create_variant(container_client, blob_name, blob_client, *variant)
+        offset, length = self.get_offset_and_length(blob_client, byte_range)
+        return blob_client.download_blob(offset=offset, length=length), offset
+
+    def create_variant(self, container_client, blob_name, variant_blob_client, width, image_format):
+        """Helper function to render an image variant and store it in the container"""
+        image_data = container_client.get_blob_client(blob_name).download_blob().readall()
+        variant_data = render_variant(
+            image_data, width, image_format, settings.IMAGE_VARIANT_QUALITY
+        )
+        variant_blob_client.upload_blob(
+            variant_data,
+            overwrite=True,
+            content_settings=ContentSettings(
+                content_type=VARIANT_FORMATS[image_format][1],
+                cache_control=settings.IMAGE_CACHE_CONTROL
+            )
+        )
+
+    def parse_range(self, header):
+        """
+        Helper function to parse a Range header with a single byte range.
+        Returns a (start, end) tuple where end or, for a suffix range, start may
+        be None. Returns None when the whole image should be sent.
+        """
+        match = BYTE_RANGE_PATTERN.match(header.strip()) if header else None
+        if not match or match.groups() == ('', ''):
+            return None
+        start, end = (int(value) if value else None for value in match.groups())
+        if start is not None and end is not None and end < start:
+            return None
+        return start, end
+
+    def get_download_conditions(self, request):
+        """
+        Helper function to pass the client's If-None-Match or If-Modified-Since
+        header on to Azure. If-Modified-Since is ignored when If-None-Match is
+        present, and lists of ETags are not passed on.
+        """
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            if ',' in if_none_match:
+                return {}
+            return {'etag': if_none_match.strip(), 'match_condition': MatchConditions.IfModified}
+
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_modified_since is not None:
+            return {
+                'if_modified_since': datetime.fromtimestamp(if_modified_since, tz=dt_timezone.utc)
+            }
+        return {}
+
+    def get_offset_and_length(self, blob_client, byte_range):
+        """Helper function to convert a byte range to the offset and length of a download"""
+        if byte_range is None:
+            return None, None
+        start, end = byte_range
+        if start is None:
+            # A suffix range asks for the last `end` bytes of the image
+            size = blob_client.get_blob_properties().size
+            return max(size - end, 0), None
+        return start, (end - start + 1 if end is not None else None)
+
+    def stream_image(self, downloader, blob_name, offset):
+        """Helper function to stream a started download as the response"""
+        response = StreamingHttpResponse(
+            downloader.chunks(),
+            status=status.HTTP_200_OK if offset is None else status.HTTP_206_PARTIAL_CONTENT,
+            content_type=self.get_content_type(blob_name)
+        )
+        response['Content-Length'] = str(downloader.size)
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = downloader.properties.etag
+        response['Last-Modified'] = http_date(downloader.properties.last_modified.timestamp())
+        response['Cache-Control'] = settings.IMAGE_CACHE_CONTROL
+        if offset is not None:
+            blob_size = downloader.properties.content_range.rsplit('/', 1)[1]
+            response['Content-Range'] = (
+                f'bytes {offset}-{offset + downloader.size - 1}/{blob_size}'
             )
+        return response
+
+    def not_modified(self, request):
+        """Helper function to tell the client that its cached copy of the image is current"""
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        if request.headers.get('If-None-Match'):
+            response['ETag'] = request.headers['If-None-Match'].strip()
+        response['Cache-Control'] = settings.IMAGE_CACHE_CONTROL
+        return response
+
+    def range_not_satisfiable(self, blob_client):
+        """Helper function to answer a Range request that starts past the end of the image"""
+        response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response['Content-Range'] = f'bytes */{blob_client.get_blob_properties().size}'
+        return response
 
     def get_content_type(self, blob_name):
         """Helper function to determine content type based on file extension"""
@@ -321,6 +759,8 @@ class RetrieveImage(generics.RetrieveAPIView):
             return 'image/png'
         if blob_name.lower().endswith('.gif'):
             return 'image/gif'
+        if blob_name.lower().endswith('.webp'):
+            return 'image/webp'
         return 'application/octet-stream'  # Default binary data type if unknown
 
 # <GET> /api/retrieve_params/
@@ -359,7 +799,7 @@ class TranslateText(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if not text:
+        if not isinstance(text, str) or not text:
             return Response(
                 {'error': 'Invalid or missing "text" parameter'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -373,7 +813,32 @@ class TranslateText(generics.CreateAPIView):
 
     # Helper function to translate text using Azure Translator API
     def translate_text(self, azure_params, source_language, target_languages, text):
-        """Translate text using Azure Translator API"""
+        """
+        Translate text using Azure Translator API. Translations found in the
+        translation memory are reused and only the missing languages are requested.
+        """
+        translations = translation_memory.get_many(source_language, target_languages, text)
+        missing_languages = [
+            language for language in target_languages if language not in translations
+        ]
+        if missing_languages:
+            new_translations = self.request_translations(
+                azure_params, source_language, missing_languages, [text]
+            )[0]
+            translation_memory.set_many(source_language, new_translations, text)
+            translations.update(new_translations)
+
+        return {
+            language: translations[language]
+            for language in target_languages
+            if language in translations
+        }
+
+    def request_translations(self, azure_params, source_language, target_languages, texts):
+        """
+        Request translations of a list of texts from Azure Translator API in one call.
+        Returns a dict of translations keyed by language for each text, in input order.
+        """
         params = {
             'api-version': '3.0',
             'from': source_language,
@@ -387,23 +852,138 @@ class TranslateText(generics.CreateAPIView):
             'X-ClientTraceId': str(uuid.uuid4())
         }
 
-        body = [{'text': text}]
+        body = [{'text': text} for text in texts]
 
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{azure_params['endpoint']}/translate",
                 params=params,
                 headers=headers,
-                json=body,
-                timeout=10
+                json=body
             )
             response.raise_for_status()
             response_data = response.json()
 
-            return {
-                translation['to']: translation['text']
-                for translation in response_data[0]['translations']
-            }
+            return [
+                {
+                    translation['to']: translation['text']
+                    for translation in item['translations']
+                }
+                for item in response_data
+            ]
         except RequestException as e:
             error_message = f'Request error occurred: {str(e)}'
             raise RequestException(error_message) from e
+
+# <POST> /api/translate/batch/
+class TranslateTextBatch(TranslateText):
+    """Class for translating many texts at once using Azure Translator API"""
+    def create(self, request, *args, **kwargs):
+        azure_params = get_azure_translation_params()
+
+        source_language = request.data.get('from', 'fi')
+        target_languages = request.data.get('to', [])
+        texts = request.data.get('texts', None)
+
+        if not isinstance(target_languages, list) or not target_languages:
+            return Response(
+                {'error': 'Invalid or missing "to" parameter'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if (
+            not isinstance(texts, list)
+            or not texts
+            or not all(isinstance(text, str) and text for text in texts)
+        ):
+            return Response(
+                {'error': 'Invalid or missing "texts" parameter'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_characters = settings.TRANSLATOR_MAX_CHARACTERS_PER_REQUEST
+        for index, text in enumerate(texts):
+            if len(text) * len(target_languages) > max_characters:
+                return Response(
+                    {'error': f'Text at index {index} is too long to translate'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        try:
+            translations = self.translate_texts(
+                azure_params, source_language, target_languages, texts
+            )
+            return Response(
+                {'translations': dict(enumerate(translations))},
+                status=status.HTTP_200_OK
+            )
+        except (HTTPError, Timeout, RequestException) as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # Helper function to translate many texts using Azure Translator API
+    def translate_texts(self, azure_params, source_language, target_languages, texts):
+        """
+        Translate a list of texts. Texts missing from the translation memory are
+        packed into as few Translator requests as its limits allow, and the
+        requests are sent in parallel. Returns the translations in input order.
+        """
+        results = [
+            translation_memory.get_many(source_language, target_languages, text)
+            for text in texts
+        ]
+        requests_to_send = self.plan_requests(target_languages, texts, results)
+
+        if requests_to_send:
+            with ThreadPoolExecutor(
+                max_workers=settings.TRANSLATOR_MAX_CONCURRENT_REQUESTS,
+                thread_name_prefix='translation'
+            ) as executor:
+                futures = [
+                    (indexes, executor.submit(
+                        self.request_translations,
+                        azure_params,
+                        source_language,
+                        languages,
+                        [texts[index] for index in indexes]
+                    ))
+                    for languages, indexes in requests_to_send
+                ]
+                for indexes, future in futures:
+                    for index, translations in zip(indexes, future.result()):
+                        translation_memory.set_many(source_language, translations, texts[index])
+                        results[index].update(translations)
+
+        return [
+            {
+                language: result[language]
+                for language in target_languages
+                if language in result
+            }
+            for result in results
+        ]
+
+    def plan_requests(self, target_languages, texts, results):
+        """
+        Plan the Translator requests for the texts whose translations are missing.
+        Returns a list of (target languages, text indexes) pairs, one per request.
+        """
+        # A Translator request has a single list of target languages, so texts
+        # are grouped by the languages they are still missing
+        groups = {}
+        for index, result in enumerate(results):
+            missing_languages = tuple(
+                language for language in target_languages if language not in result
+            )
+            if missing_languages:
+                groups.setdefault(missing_languages, []).append(index)
+
+        return [
+            (list(languages), [indexes[position] for position in chunk])
+            for languages, indexes in groups.items()
+            for chunk in chunk_texts(
+                [texts[index] for index in indexes],
+                len(languages),
+                settings.TRANSLATOR_MAX_TEXTS_PER_REQUEST,
+                settings.TRANSLATOR_MAX_CHARACTERS_PER_REQUEST
+            )
+        ]
@@ -1,11 +1,13 @@
 """ api/views/project_views.py """
 
+from django.db.models import Max
 from rest_framework import filters, generics, permissions
 from rest_framework.permissions import IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
 
 from api.filters import ProjectFilter
 from api.models import Project
+from api.pagination import ProjectCursorPagination
 from api.serializers import ProjectSerializer, ProjectListSerializer
 
 # <GET, POST, HEAD, OPTIONS> /api/projects/
@@ -16,6 +18,17 @@ class ProjectList(generics.ListCreateAPIView):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_class = ProjectFilter
     search_fields = ['project_name', 'project_id']
+    pagination_class = ProjectCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Archived projects are only listed with ?include_archived=true
+        if self.request.query_params.get('include_archived', '').lower() not in ('true', '1'):
+            queryset = queryset.filter(is_active=True)
+        # Annotate the latest survey timestamp so the list is served in one query
+        return queryset.annotate(
+            last_survey_created_at=Max('surveys__created_at')
+        )
 
     def get_permissions(self):
         if self.request.method == 'GET':
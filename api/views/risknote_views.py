@@ -5,6 +5,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 
 from api.models import RiskNote, Survey
+from api.pagination import RiskNoteCursorPagination
 from api.serializers import RiskNoteSerializer
 
 # <GET, POST, HEAD, OPTIONS> /api/surveys/<id>/risk_notes/
@@ -16,6 +17,7 @@ class RiskNoteCreate(generics.ListCreateAPIView):
     Supports a list of RiskNote:s as payload.
     """
     serializer_class = RiskNoteSerializer
+    pagination_class = RiskNoteCursorPagination
 
     def get_queryset(self):
         survey_id = self.kwargs.get('survey_pk') # no need to check if survey_id is None
@@ -1,7 +1,6 @@
 """ api/views/survey_views.py """
 
-import jwt
-from django.conf import settings
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 from rest_framework import (
     generics,
@@ -12,20 +11,36 @@ from rest_framework import (
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from api.models import Account, AccountSurvey, Project, Survey
+from api.authentication import AccountAuthenticationMixin
+from api.models import AccountSurvey, Project, Survey
+from api.pagination import (
+    AccountSurveyCursorPagination,
+    FilledSurveyCursorPagination,
+    SurveyCursorPagination
+)
 from api.serializers import SurveySerializer, AccountSurveySerializer
 
+def get_survey_queryset():
+    """
+    Returns a Survey queryset with the relations used by SurveySerializer
+    loaded up front, so serializing many surveys takes a constant number of queries.
+    """
+    return Survey.objects.select_related(
+        'project', 'creator'
+    ).prefetch_related('risk_notes')
+
 
 # <GET, POST, HEAD, OPTIONS> /api/projects/<id>/surveys/ or /api/surveys/
-class SurveyList(generics.ListCreateAPIView):
+class SurveyList(AccountAuthenticationMixin, generics.ListCreateAPIView):
     """Class for SurveyList"""
     serializer_class = SurveySerializer
+    pagination_class = SurveyCursorPagination
 
     def get_queryset(self):
         project_id = self.kwargs.get('project_pk')
         if project_id:
-            return Survey.objects.filter(project_id=project_id)
-        return Survey.objects.all()
+            return get_survey_queryset().filter(project_id=project_id)
+        return get_survey_queryset()
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -35,19 +50,7 @@ class SurveyList(generics.ListCreateAPIView):
         return context
 
     def perform_create(self, serializer):
-        auth_header = self.request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            raise serializers.ValidationError(
-                {"error": "Authorization header is required"}
-            )
-        token = auth_header.split(' ')[1]
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            user_id = payload.get('user_id')
-        except jwt.ExpiredSignatureError as exc:
-            raise serializers.ValidationError({"error": "Token has expired"}) from exc
-        except jwt.InvalidTokenError as exc:
-            raise serializers.ValidationError({"error": "Invalid token"}) from exc
+        account = self.get_account()
 
         project_id = self.kwargs.get('project_pk')
         if not project_id:
@@ -55,7 +58,6 @@ class SurveyList(generics.ListCreateAPIView):
                 {"project": "A project is required to create a survey."}
             )
 
-        account = get_object_or_404(Account, user_id=user_id)
         project = get_object_or_404(Project, pk=project_id)
 
         survey = serializer.save(project=project, creator=account)
@@ -65,7 +67,7 @@ class SurveyList(generics.ListCreateAPIView):
 # /api/projects/<project_id>/surveys/<survey_id> or /api/surveys/<id>/
 class SurveyDetail(generics.RetrieveUpdateDestroyAPIView):
     """Class for SurveyDetail"""
-    queryset = Survey.objects.all()
+    queryset = get_survey_queryset()
     serializer_class = SurveySerializer
     lookup_field = 'pk'
 
@@ -84,42 +86,29 @@ class SurveyDetail(generics.RetrieveUpdateDestroyAPIView):
         return Response(serializer.data)
 
 # <GET> /api/filled-surveys/
-class FilledSurveys(APIView):
+class FilledSurveys(AccountAuthenticationMixin, APIView):
     """View to retrieve all surveys filled by the currently signed-in account"""
 
     def get(self, request):
         """Retrieve all surveys filled by the currently signed-in account"""
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return Response(
-                {"error": "Authorization header is required"},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
-        try:
-            token = auth_header.split(' ')[1]
-            decoded_token = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            user_id = decoded_token['user_id']
-
-            account = Account.objects.get(user_id=user_id)
+        account = self.get_account()
 
-            account_surveys = AccountSurvey.objects.filter(
-                account=account
-            ).select_related('survey').order_by('-filled_at')
+        filled_surveys = get_survey_queryset().filter(
+            filled_by__account=account
+        ).annotate(filled_at=F('filled_by__filled_at')).order_by('-filled_at')
 
-            filled_surveys_data = []
-            for account_survey in account_surveys:
-                survey = account_survey.survey
-                serializer = SurveySerializer(survey)
-                filled_surveys_data.append(serializer.data)
+        paginator = FilledSurveyCursorPagination()
+        page = paginator.paginate_queryset(filled_surveys, request, view=self)
+        if page is not None:
+            filled_surveys_data = SurveySerializer(page, many=True).data
+            return Response(
+                paginator.get_paginated_data(filled_surveys_data, key='filled_surveys'),
+                status=status.HTTP_200_OK
+            )
 
-            return Response({"filled_surveys": filled_surveys_data}, status=status.HTTP_200_OK)
+        filled_surveys_data = SurveySerializer(filled_surveys, many=True).data
 
-        except jwt.ExpiredSignatureError:
-            return Response({"error": "Token has expired"}, status=status.HTTP_401_UNAUTHORIZED)
-        except jwt.InvalidTokenError:
-            return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
-        except Account.DoesNotExist:
-            return Response({"error": "Account not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"filled_surveys": filled_surveys_data}, status=status.HTTP_200_OK)
 
 # <GET, HEAD, OPTIONS> /api/surveys/code/<access_code>/
 class SurveyByAccessCode(generics.RetrieveAPIView):
@@ -127,30 +116,17 @@ class SurveyByAccessCode(generics.RetrieveAPIView):
     serializer_class = SurveySerializer
     permission_classes = (permissions.AllowAny,)
     lookup_field = 'access_code'
-    queryset = Survey.objects.all()
+    queryset = get_survey_queryset()
 
 # <POST> /api/surveys/validate/<access_code>/
-class ValidateSurvey(APIView):
+class ValidateSurvey(AccountAuthenticationMixin, APIView):
     """Class for validating a survey using access code"""
 
     def post(self, request, access_code, *args, **kwargs):
         """Link the user's account to a survey"""
         survey = get_object_or_404(Survey, access_code=access_code)
 
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return Response({"error": "Authorization header is required."}, status=400)
-
-        token = auth_header.split(' ')[1]
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            user_id = payload.get('user_id')
-        except jwt.ExpiredSignatureError:
-            return Response({"error": "Token has expired."}, status=401)
-        except jwt.InvalidTokenError:
-            return Response({"error": "Invalid token."}, status=401)
-
-        account = get_object_or_404(Account, user_id=user_id)
+        account = self.get_account()
 
         _, created = AccountSurvey.objects.get_or_create(account=account, survey=survey)
 
@@ -172,6 +148,15 @@ class AccountsBySurvey(APIView):
             survey=survey
         ).select_related('account').order_by('filled_at')
 
+        paginator = AccountSurveyCursorPagination()
+        page = paginator.paginate_queryset(survey_accounts, request, view=self)
+        if page is not None:
+            serialized_data = AccountSurveySerializer(page, many=True).data
+            return Response(
+                paginator.get_paginated_data(serialized_data, key='accounts'),
+                status=200
+            )
+
         serialized_data = AccountSurveySerializer(survey_accounts, many=True).data
 
         return Response({'accounts': serialized_data}, status=200)
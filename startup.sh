@@ -3,5 +3,8 @@
 # Install ffmpeg
 apt-get update && apt-get install -y ffmpeg
 
+# Create the tables of the database caches shared by the workers
+python manage.py createcachetable
+
 # Run app
 gunicorn --bind=0.0.0.0 --timeout 600 tts.wsgi
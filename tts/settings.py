@@ -14,6 +14,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 import os
 from pathlib import Path
+from urllib.parse import urlsplit
 import environ
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -28,11 +29,29 @@ environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY', '')
+# Number of verified access tokens kept in memory by AccessTokenMiddleware
+ACCESS_TOKEN_CACHE_MAX_SIZE = int(os.getenv('ACCESS_TOKEN_CACHE_MAX_SIZE', '1024'))
+# Seconds to cache the Account primary key of a user id per process, 0 to disable
+ACCOUNT_CACHE_ALIAS = 'accounts'
+ACCOUNT_CACHE_TTL = int(os.getenv('ACCOUNT_CACHE_TTL', '60'))
 
 # Get speech key and service region from .env
 SPEECH_KEY = os.getenv('SPEECH_KEY')
 SPEECH_SERVICE_REGION = os.getenv('SPEECH_SERVICE_REGION')
 
+# Speech recognizer and background workers for transcription jobs
+TRANSCRIPTION_RECOGNIZER = 'api.transcription.AzureSpeechRecognizer'
+TRANSCRIPTION_MAX_WORKERS = int(os.getenv('TRANSCRIPTION_MAX_WORKERS', '2'))
+TRANSCRIPTION_MAX_PENDING_JOBS = int(os.getenv('TRANSCRIPTION_MAX_PENDING_JOBS', '20'))
+# Jobs still pending or processing after this many seconds are reported as failed
+TRANSCRIPTION_JOB_TIMEOUT = int(os.getenv('TRANSCRIPTION_JOB_TIMEOUT', '1800'))
+# Take the transcription from the translation recognizer instead of a separate recognition
+TRANSCRIPTION_SINGLE_RECOGNITION = env.bool('TRANSCRIPTION_SINGLE_RECOGNITION', default=False)
+# Cache for transcription results, keyed by the audio content and languages
+TRANSCRIPTION_CACHE_ALIAS = 'transcriptions'
+# Queued audio is kept in memory up to this size before spilling to an anonymous temp file
+TRANSCRIPTION_SPOOL_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
@@ -115,6 +134,45 @@ if os.environ.get('GITHUB_WORKFLOW'):
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared by every worker process; the table is created with `manage.py createcachetable`
+    'transcriptions': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'transcription_cache',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 500,
+        },
+    },
+    'translations': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'translations',
+        'TIMEOUT': 60 * 60 * 24 * 7,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    'accounts': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'accounts',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Shared by the web workers and the import_projects command, like 'transcriptions'
+    'erp_tokens': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'erp_token_cache',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -167,11 +225,50 @@ AZURE_STORAGE_ACCOUNT_NAME = os.getenv('AZURE_STORAGE_ACCOUNT_NAME')
 AZURE_STORAGE_ACCOUNT_KEY = os.getenv('AZURE_STORAGE_ACCOUNT_KEY')
 AZURE_CONTAINER_NAME = os.getenv('AZURE_CONTAINER_NAME')
 
+# Blob container client shared by the image views, with its connection pool and timeouts
+AZURE_BLOB_CONTAINER_CLIENT_FACTORY = 'api.storage.create_container_client'
+AZURE_BLOB_POOL_MAXSIZE = int(os.getenv('AZURE_BLOB_POOL_MAXSIZE', '20'))
+AZURE_BLOB_CONNECTION_TIMEOUT = 10
+AZURE_BLOB_READ_TIMEOUT = 60
+
+# Parallel image uploads, and block uploads for large files
+IMAGE_UPLOAD_MAX_WORKERS = int(os.getenv('IMAGE_UPLOAD_MAX_WORKERS', '4'))
+AZURE_BLOB_MAX_SINGLE_PUT_SIZE = 4 * 1024 * 1024
+AZURE_BLOB_MAX_BLOCK_SIZE = 4 * 1024 * 1024
+AZURE_BLOB_UPLOAD_MAX_CONCURRENCY = 4
+
+# Uploaded images are scaled to fit this many pixels and JPEGs are recompressed at this quality
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', '2560'))
+IMAGE_UPLOAD_QUALITY = int(os.getenv('IMAGE_UPLOAD_QUALITY', '82'))
+IMAGE_PROCESSING_MAX_WORKERS = int(os.getenv('IMAGE_PROCESSING_MAX_WORKERS', '2'))
+
+# Lifetime in seconds of the URLs issued for uploading images directly to blob storage
+IMAGE_UPLOAD_SAS_EXPIRY = int(os.getenv('IMAGE_UPLOAD_SAS_EXPIRY', '900'))
+
+# Largest image in bytes accepted from an upload URL; larger blobs are deleted unread
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv('IMAGE_UPLOAD_MAX_SIZE', str(20 * 1024 * 1024)))
+
+# Uploaded images get unique blob names and never change, so clients may cache them for a year
+IMAGE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Image widths and encoding quality of the resized variants served by /api/retrieve-image/
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 1280)
+IMAGE_VARIANT_QUALITY = 80
+
 # Azure text translator settings
 TRANSLATOR_KEY = os.getenv('TRANSLATOR_KEY')
 TRANSLATOR_SERVICE_REGION = os.getenv('TRANSLATOR_SERVICE_REGION')
 TRANSLATOR_ENDPOINT = os.getenv('TRANSLATOR_ENDPOINT')
 
+# Translator limits per request and the number of batch requests sent in parallel
+TRANSLATOR_MAX_TEXTS_PER_REQUEST = 100
+TRANSLATOR_MAX_CHARACTERS_PER_REQUEST = 50000
+TRANSLATOR_MAX_CONCURRENT_REQUESTS = int(os.getenv('TRANSLATOR_MAX_CONCURRENT_REQUESTS', '4'))
+
+# Translation memory for the text translator
+TRANSLATION_MEMORY_CACHE_ALIAS = 'translations'
+TRANSLATION_MEMORY_PERSISTENT = env.bool('TRANSLATION_MEMORY_PERSISTENT', default=False)
+
 # Entra ID settings
 CLIENT_ID = os.getenv('CLIENT_ID')
 TENANT_ID = os.getenv('TENANT_ID')
@@ -182,3 +279,27 @@ ERP_CLIENT_SECRET = os.getenv('ERP_CLIENT_SECRET')
 ERP_TENANT_ID = os.getenv('ERP_TENANT_ID')
 ERP_RESOURCE = os.getenv('ERP_RESOURCE')
 ERP_SANDBOX_RESOURCE = os.getenv('ERP_SANDBOX_RESOURCE')
+# Database cache shared by the processes that use ERP access tokens, and the seconds before
+# expiry when a token is refreshed
+ERP_TOKEN_CACHE_ALIAS = 'erp_tokens'
+ERP_TOKEN_REFRESH_MARGIN = 300
+# Projects requested per ERP page, and projects written per bulk query on import
+ERP_PAGE_SIZE = int(os.getenv('ERP_PAGE_SIZE', '1000'))
+ERP_IMPORT_BATCH_SIZE = 500
+# Companies (data areas) to import projects from, fetched from ERP when empty
+ERP_DATA_AREA_IDS = env.list('ERP_DATA_AREA_IDS', default=[])
+# Companies fetched in parallel, and retries of a page of projects whose fetch fails
+ERP_FETCH_CONCURRENCY = int(os.getenv('ERP_FETCH_CONCURRENCY', '4'))
+ERP_PARTITION_RETRIES = int(os.getenv('ERP_PARTITION_RETRIES', '2'))
+# Last-modified field of the ERP Projects entity, used by import_projects --since
+ERP_MODIFIED_FIELD = os.getenv('ERP_MODIFIED_FIELD', '')
+
+# Outbound HTTP connection pool, retries and timeouts (in seconds)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_DEFAULT_TIMEOUT = 30
+HTTP_HOST_TIMEOUTS = {
+    urlsplit(TRANSLATOR_ENDPOINT).hostname: 10,
+} if TRANSLATOR_ENDPOINT else {}
@@ -6,4 +6,10 @@ MIDDLEWARE = [
     mw for mw in MIDDLEWARE if mw != "api.middleware.access_token_middleware.AccessTokenMiddleware"
 ]
 
+# Keep every cache in memory, so tests without database access can clear them
+CACHES = {
+    alias: {**config, 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    for alias, config in CACHES.items()
+}
+
 # Any other test-specific configurations can go here